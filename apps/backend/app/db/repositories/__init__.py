@@ -0,0 +1,78 @@
+"""
+저장소(Repository) 패키지
+
+서비스 코드는 테이블에 직접 쿼리하지 않고 get_repositories()가 돌려주는 저장소를 사용합니다.
+백엔드는 DB_BACKEND 환경변수로 선택합니다.
+  - supabase (기본값): 호스팅된 Supabase
+  - sqlite: 로컬 SQLite 파일 (SQLITE_DB_PATH, 기본값 blindspot_local.sqlite3)
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .base import (
+    ARTICLE_FIELDS_ALL, ARTICLE_FIELDS_EMBED, ARTICLE_FIELDS_ID, ARTICLE_FIELDS_ISSUE, ARTICLE_FIELDS_LIST,
+    DEFAULT_PAGE_SIZE, ArticleRepository, Cursor, IssueRepository, MediaOutletRepository,
+    decode_cursor, encode_cursor,
+)
+
+SUPPORTED_BACKENDS = ("supabase", "sqlite")
+
+
+@dataclass
+class Repositories:
+    articles: ArticleRepository
+    issues: IssueRepository
+    media_outlets: MediaOutletRepository
+
+
+_repositories: Dict[str, Repositories] = {}
+
+if hasattr(os, "register_at_fork"):
+    # fork된 자식 프로세스는 부모가 만든 저장소(연결 상태 포함)를 물려받지 않고 새로 만듦
+    os.register_at_fork(after_in_child=_repositories.clear)
+
+
+def get_backend_name() -> str:
+    backend = os.getenv("DB_BACKEND", "supabase").lower()
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"지원하지 않는 DB_BACKEND입니다: {backend} (지원: {', '.join(SUPPORTED_BACKENDS)})")
+    return backend
+
+
+def get_repositories(backend: Optional[str] = None) -> Repositories:
+    """백엔드별 저장소 묶음을 반환합니다 (프로세스 안에서 재사용)."""
+    backend = backend or get_backend_name()
+    if backend not in _repositories:
+        if backend == "sqlite":
+            from .sqlite_repository import (
+                SQLiteArticleRepository, SQLiteIssueRepository, SQLiteMediaOutletRepository,
+            )
+            repos = Repositories(SQLiteArticleRepository(), SQLiteIssueRepository(), SQLiteMediaOutletRepository())
+        else:
+            from .supabase_repository import (
+                SupabaseArticleRepository, SupabaseIssueRepository, SupabaseMediaOutletRepository,
+            )
+            repos = Repositories(SupabaseArticleRepository(), SupabaseIssueRepository(), SupabaseMediaOutletRepository())
+        _repositories[backend] = repos
+    return _repositories[backend]
+
+
+__all__ = [
+    'ARTICLE_FIELDS_ALL',
+    'ARTICLE_FIELDS_EMBED',
+    'ARTICLE_FIELDS_ID',
+    'ARTICLE_FIELDS_ISSUE',
+    'ARTICLE_FIELDS_LIST',
+    'DEFAULT_PAGE_SIZE',
+    'Cursor',
+    'decode_cursor',
+    'encode_cursor',
+    'ArticleRepository',
+    'IssueRepository',
+    'MediaOutletRepository',
+    'Repositories',
+    'get_backend_name',
+    'get_repositories',
+]
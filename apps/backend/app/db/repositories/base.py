@@ -0,0 +1,144 @@
+import base64
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+# 집계(group_counts)를 허용하는 articles 컬럼
+ARTICLE_GROUP_COLUMNS = ("category", "media_id", "bias")
+COUNT_METHODS = ("exact", "estimated")
+
+# 용도별 articles 조회 컬럼 (content_full은 정말 필요한 곳에서만 가져옴)
+ARTICLE_FIELDS_ID = ("id", "title", "published_at", "category")
+ARTICLE_FIELDS_LIST = (
+    "id", "title", "url", "category", "bias", "media_id", "image_url", "author", "published_at",
+)
+ARTICLE_FIELDS_EMBED = ("id", "title", "content_full", "published_at", "category")
+ARTICLE_FIELDS_ISSUE = ("id", "title", "content_full", "bias", "image_url")
+ARTICLE_FIELDS_ALL = ("*",)
+
+# keyset 페이지네이션 정렬 컬럼 (항상 id와 함께 (column, id) 순서로 정렬)
+# created_at은 증분 임베딩의 워터마크 조회에 사용
+KEYSET_COLUMNS = ("published_at", "created_at")
+DEFAULT_PAGE_SIZE = 500
+
+# (정렬 컬럼 값, id) - 마지막으로 읽은 행 위치
+Cursor = Tuple[Optional[str], str]
+
+
+def with_keyset_fields(fields: Sequence[str], order_column: str) -> List[str]:
+    """keyset 페이지네이션에 필요한 정렬 컬럼과 id를 조회 컬럼에 포함시킵니다."""
+    if "*" in fields:
+        return ["*"]
+    columns = list(fields)
+    for column in (order_column, "id"):
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def encode_cursor(cursor: Optional[Cursor]) -> Optional[str]:
+    """API 응답용 불투명 커서 문자열"""
+    if cursor is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(cursor)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Cursor]:
+    if not token:
+        return None
+    value, last_id = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    return value, last_id
+
+
+class ArticleRepository(ABC):
+    """articles 테이블 접근 인터페이스"""
+
+    @abstractmethod
+    def find_existing_urls(self, urls: Iterable[str]) -> Set[str]:
+        """주어진 URL 중 이미 저장된 URL 집합을 반환합니다."""
+
+    @abstractmethod
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """기사들을 일괄 저장하고 저장된 행을 반환합니다."""
+
+    @abstractmethod
+    def fetch_page(
+        self,
+        fields: Sequence[str] = ARTICLE_FIELDS_LIST,
+        filters: Optional[Dict[str, Any]] = None,
+        after: Optional[Cursor] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        order_column: str = "published_at",
+        descending: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+        """(order_column, id) 기준 keyset 페이지 하나를 조회합니다.
+
+        filters: 컬럼=값 동등 조건 (값이 None이면 IS NULL)
+        after: 이전 페이지가 돌려준 커서. 다음 페이지가 없으면 커서는 None입니다.
+        NULL 정렬 값은 가장 앞에 옵니다. descending이면 정확히 반대 순서(최신 먼저, NULL은 가장 뒤)입니다.
+        """
+
+    def iter_pages(
+        self,
+        fields: Sequence[str] = ARTICLE_FIELDS_LIST,
+        filters: Optional[Dict[str, Any]] = None,
+        after: Optional[Cursor] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        order_column: str = "published_at",
+        descending: bool = False,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """조건에 맞는 기사를 페이지 단위로 끝까지 순회합니다."""
+        while True:
+            rows, after = self.fetch_page(fields, filters, after, page_size, order_column, descending)
+            if rows:
+                yield rows
+            if after is None:
+                return
+
+    @abstractmethod
+    def get_by_ids(self, ids: List[str], fields: Sequence[str] = ARTICLE_FIELDS_ALL) -> List[Dict[str, Any]]:
+        """id 목록에 해당하는 기사들을 조회합니다."""
+
+    @abstractmethod
+    def set_issue_id(self, ids: List[str], issue_id: str) -> int:
+        """기사들의 issue_id를 갱신하고 갱신된 행 수를 반환합니다."""
+
+    @abstractmethod
+    def count(self, method: str = "exact", filters: Optional[Dict[str, Any]] = None) -> int:
+        """기사 수를 반환합니다.
+
+        method: "exact"(정확한 COUNT) | "estimated"(통계/메타데이터 기반 추정치)
+        filters: 컬럼=값 동등 조건 (예: {"category": "경제"})
+        """
+
+    @abstractmethod
+    def group_counts(self, column: str) -> Dict[Optional[str], int]:
+        """column(category / media_id / bias) 값별 기사 수를 반환합니다."""
+
+
+class IssueRepository(ABC):
+    """issues 테이블 접근 인터페이스"""
+
+    @abstractmethod
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """이슈를 저장하고 저장된 행을 반환합니다."""
+
+    @abstractmethod
+    def exists(self, issue_id: str) -> bool:
+        """이슈가 존재하는지 확인합니다."""
+
+
+class MediaOutletRepository(ABC):
+    """media_outlets 테이블 접근 인터페이스"""
+
+    @abstractmethod
+    def get_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """언론사 이름으로 id, bias를 조회합니다."""
+
+    @abstractmethod
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """언론사를 저장하고 저장된 행을 반환합니다."""
+
+    @abstractmethod
+    def list_all(self) -> List[Dict[str, Any]]:
+        """전체 언론사(id, name, bias)를 조회합니다."""
@@ -0,0 +1,285 @@
+"""
+로컬 SQLite 저장소 백엔드
+
+docs/schema.md의 issues / media_outlets / articles 스키마를 SQLite로 구현합니다.
+호스팅된 Supabase 없이 크롤링→클러스터링→이슈 생성 파이프라인을 한 대의 머신에서
+부하 테스트하거나 벤치마크할 때 사용합니다 (DB_BACKEND=sqlite).
+"""
+
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .base import (
+    ARTICLE_FIELDS_ALL, ARTICLE_FIELDS_LIST, ARTICLE_GROUP_COLUMNS, COUNT_METHODS, DEFAULT_PAGE_SIZE,
+    KEYSET_COLUMNS, ArticleRepository, Cursor, IssueRepository, MediaOutletRepository, with_keyset_fields,
+)
+
+DEFAULT_SQLITE_PATH = "blindspot_local.sqlite3"
+
+# SQLite 바인딩 파라미터 개수 제한(구버전 999)을 넘지 않도록 in 목록을 나눔
+IN_CHUNK_SIZE = 500
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS issues (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  summary TEXT NOT NULL,
+  image_url TEXT,
+  image_swipe_url TEXT,
+  bias_left_pct REAL DEFAULT 0,
+  bias_center_pct REAL DEFAULT 0,
+  bias_right_pct REAL DEFAULT 0,
+  dominant_bias TEXT CHECK (dominant_bias IN ('left', 'center', 'right')),
+  source_count INTEGER DEFAULT 0,
+  updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS media_outlets (
+  id TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  bias TEXT CHECK (bias IN ('left', 'center', 'right')) NOT NULL,
+  logo_url TEXT
+);
+
+CREATE TABLE IF NOT EXISTS articles (
+  id TEXT PRIMARY KEY,
+  issue_id TEXT REFERENCES issues(id) ON DELETE CASCADE,
+  media_id TEXT REFERENCES media_outlets(id) ON DELETE SET NULL,
+  title TEXT NOT NULL,
+  summary_excerpt TEXT,
+  content_full TEXT,
+  url TEXT UNIQUE NOT NULL,
+  bias TEXT,
+  category TEXT,
+  published_at TEXT,
+  author TEXT,
+  image_url TEXT,
+  created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_articles_issue_id ON articles(issue_id);
+CREATE INDEX IF NOT EXISTS idx_articles_category ON articles(category);
+CREATE INDEX IF NOT EXISTS idx_articles_bias ON articles(bias);
+CREATE INDEX IF NOT EXISTS idx_articles_media_id ON articles(media_id);
+CREATE INDEX IF NOT EXISTS idx_articles_published_at_id ON articles(published_at, id);
+CREATE INDEX IF NOT EXISTS idx_articles_unassigned_created_at_id ON articles(created_at, id) WHERE issue_id IS NULL;
+CREATE INDEX IF NOT EXISTS idx_media_outlets_name ON media_outlets(name);
+"""
+
+
+def _chunks(values: List[Any], size: int = IN_CHUNK_SIZE) -> Iterator[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _placeholders(n: int) -> str:
+    return ",".join("?" * n)
+
+
+# 필터/정렬에 쓸 수 있는 articles 컬럼 (SQL 조립 시 식별자 검증용)
+_ARTICLE_FILTER_COLUMNS = ARTICLE_GROUP_COLUMNS + ("issue_id",) + KEYSET_COLUMNS
+
+
+def _where_clause(filters: Optional[Dict[str, Any]]) -> Tuple[List[str], List[Any]]:
+    where, params = [], []
+    for column, value in (filters or {}).items():
+        if column not in _ARTICLE_FILTER_COLUMNS:
+            raise ValueError(f"필터할 수 없는 컬럼입니다: {column}")
+        if value is None:
+            where.append(f"{column} IS NULL")
+        else:
+            where.append(f"{column} = ?")
+            params.append(value)
+    return where, params
+
+
+def _select_list(fields: Sequence[str]) -> str:
+    for field in fields:
+        if field != "*" and not field.replace("_", "").isalnum():
+            raise ValueError(f"잘못된 컬럼 이름입니다: {field}")
+    return ", ".join(fields)
+
+
+class SQLiteDatabase:
+    """프로세스별 SQLite 연결을 관리합니다 (fork 이후에는 새 연결을 엽니다)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self.lock = threading.RLock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        if self._conn is None or self._pid != pid:
+            self.lock = threading.RLock()
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA_SQL)
+            self._conn = conn
+            self._pid = pid
+        return self._conn
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, tuple(params)).fetchall()]
+
+    def execute(self, sql: str, params: Iterable[Any] = ()) -> int:
+        with self.lock:
+            conn = self.conn
+            with conn:
+                return conn.execute(sql, tuple(params)).rowcount
+
+    def insert_rows(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """id가 없으면 uuid4를 채워 넣고 일괄 저장합니다."""
+        if not rows:
+            return []
+        saved = []
+        for row in rows:
+            row = {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in row.items()}
+            row.setdefault("id", str(uuid.uuid4()))
+            saved.append(row)
+        with self.lock:
+            conn = self.conn
+            with conn:
+                # 컬럼 구성이 같은 행끼리 executemany로 묶어서 저장
+                groups: Dict[tuple, List[Dict[str, Any]]] = {}
+                for row in saved:
+                    groups.setdefault(tuple(row.keys()), []).append(row)
+                for columns, group in groups.items():
+                    sql = f"INSERT INTO {table} ({','.join(columns)}) VALUES ({_placeholders(len(columns))})"
+                    conn.executemany(sql, [tuple(row[c] for c in columns) for row in group])
+        return saved
+
+
+_databases: Dict[str, SQLiteDatabase] = {}
+
+
+def get_database(path: Optional[str] = None) -> SQLiteDatabase:
+    path = path or os.getenv("SQLITE_DB_PATH", DEFAULT_SQLITE_PATH)
+    if path not in _databases:
+        _databases[path] = SQLiteDatabase(path)
+    return _databases[path]
+
+
+class SQLiteArticleRepository(ArticleRepository):
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db or get_database()
+
+    def find_existing_urls(self, urls: Iterable[str]) -> Set[str]:
+        existing: Set[str] = set()
+        for chunk in _chunks(list(urls)):
+            rows = self.db.query(f"SELECT url FROM articles WHERE url IN ({_placeholders(len(chunk))})", chunk)
+            existing.update(row["url"] for row in rows)
+        return existing
+
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.db.insert_rows("articles", rows)
+
+    def fetch_page(
+        self,
+        fields: Sequence[str] = ARTICLE_FIELDS_LIST,
+        filters: Optional[Dict[str, Any]] = None,
+        after: Optional[Cursor] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        order_column: str = "published_at",
+        descending: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+        if order_column not in KEYSET_COLUMNS:
+            raise ValueError(f"keyset 정렬에 사용할 수 없는 컬럼입니다: {order_column}")
+        columns = with_keyset_fields(fields, order_column)
+        where, params = _where_clause(filters)
+        if after is not None:
+            value, last_id = after
+            if descending:
+                if value is None:
+                    where.append(f"({order_column} IS NULL AND id < ?)")
+                    params.append(last_id)
+                else:
+                    where.append(f"({order_column} < ? OR ({order_column} = ? AND id < ?) OR {order_column} IS NULL)")
+                    params.extend([value, value, last_id])
+            elif value is None:
+                where.append(f"(({order_column} IS NULL AND id > ?) OR {order_column} IS NOT NULL)")
+                params.append(last_id)
+            else:
+                where.append(f"({order_column} > ? OR ({order_column} = ? AND id > ?))")
+                params.extend([value, value, last_id])
+        # SQLite는 ASC 정렬에서 NULL이 먼저, DESC에서 나중에 오므로 Supabase(nullsfirst / nullslast)와 순서가 같음
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT {_select_list(columns)} FROM articles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order_column} {direction}, id {direction} LIMIT ?"
+        rows = self.db.query(sql, [*params, limit])
+        if len(rows) < limit:
+            return rows, None
+        return rows, (rows[-1].get(order_column), rows[-1]["id"])
+
+    def get_by_ids(self, ids: List[str], fields: Sequence[str] = ARTICLE_FIELDS_ALL) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        for chunk in _chunks(ids):
+            rows.extend(self.db.query(
+                f"SELECT {_select_list(fields)} FROM articles WHERE id IN ({_placeholders(len(chunk))})", chunk,
+            ))
+        return rows
+
+    def set_issue_id(self, ids: List[str], issue_id: str) -> int:
+        updated = 0
+        for chunk in _chunks(ids):
+            updated += self.db.execute(
+                f"UPDATE articles SET issue_id = ? WHERE id IN ({_placeholders(len(chunk))})",
+                [issue_id, *chunk],
+            )
+        return updated
+
+    def count(self, method: str = "exact", filters: Optional[Dict[str, Any]] = None) -> int:
+        if method not in COUNT_METHODS:
+            raise ValueError(f"지원하지 않는 count 방식입니다: {method}")
+        if method == "estimated" and not filters:
+            # rowid 최댓값은 B-tree 끝만 읽으므로 O(log n); 삭제가 없으면 정확한 값과 같음
+            return self.db.query("SELECT COALESCE(MAX(rowid), 0) AS n FROM articles")[0]["n"]
+        where, params = _where_clause(filters)
+        sql = "SELECT COUNT(*) AS n FROM articles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.db.query(sql, params)[0]["n"]
+
+    def group_counts(self, column: str) -> Dict[Optional[str], int]:
+        if column not in ARTICLE_GROUP_COLUMNS:
+            raise ValueError(f"집계할 수 없는 컬럼입니다: {column}")
+        rows = self.db.query(f"SELECT {column} AS value, COUNT(*) AS n FROM articles GROUP BY {column}")
+        return {row["value"]: row["n"] for row in rows}
+
+
+class SQLiteIssueRepository(IssueRepository):
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db or get_database()
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return self.db.insert_rows("issues", [row])[0]
+
+    def exists(self, issue_id: str) -> bool:
+        return bool(self.db.query("SELECT 1 FROM issues WHERE id = ? LIMIT 1", (issue_id,)))
+
+
+class SQLiteMediaOutletRepository(MediaOutletRepository):
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db or get_database()
+
+    def get_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        rows = self.db.query("SELECT id, bias FROM media_outlets WHERE name = ? LIMIT 1", (name,))
+        return rows[0] if rows else None
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return self.db.insert_rows("media_outlets", [row])[0]
+
+    def list_all(self) -> List[Dict[str, Any]]:
+        return self.db.query("SELECT id, name, bias FROM media_outlets")
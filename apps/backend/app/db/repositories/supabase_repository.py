@@ -0,0 +1,142 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ..supabase_client import supabase_client
+from .base import (
+    ARTICLE_FIELDS_ALL, ARTICLE_FIELDS_LIST, ARTICLE_GROUP_COLUMNS, COUNT_METHODS, DEFAULT_PAGE_SIZE,
+    KEYSET_COLUMNS, ArticleRepository, Cursor, IssueRepository, MediaOutletRepository, with_keyset_fields,
+)
+
+# PostgREST는 in_ 필터를 URL 쿼리스트링으로 보내므로 너무 긴 목록은 나눠서 요청
+IN_FILTER_CHUNK_SIZE = 200
+
+
+def _chunks(values: List[Any], size: int = IN_FILTER_CHUNK_SIZE) -> Iterator[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _apply_filters(query, filters: Optional[Dict[str, Any]]):
+    for column, value in (filters or {}).items():
+        query = query.is_(column, "null") if value is None else query.eq(column, value)
+    return query
+
+
+def _quote(value: Any) -> str:
+    # 타임스탬프의 ':' 등 PostgREST 예약 문자를 값으로 쓰기 위해 따옴표로 감쌈
+    return '"' + str(value).replace('"', '\\"') + '"'
+
+
+class _SupabaseRepository:
+    @property
+    def client(self):
+        # 호출마다 가져와야 fork된 자식 프로세스에서 부모의 클라이언트(소켓)를 쓰지 않음
+        return supabase_client.get_client()
+
+
+class SupabaseArticleRepository(_SupabaseRepository, ArticleRepository):
+
+    def find_existing_urls(self, urls: Iterable[str]) -> Set[str]:
+        existing: Set[str] = set()
+        for chunk in _chunks(list(urls)):
+            result = self.client.table("articles").select("url").in_("url", chunk).execute()
+            existing.update(row["url"] for row in result.data)
+        return existing
+
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        result = self.client.table("articles").insert(rows).execute()
+        return result.data or []
+
+    def fetch_page(
+        self,
+        fields: Sequence[str] = ARTICLE_FIELDS_LIST,
+        filters: Optional[Dict[str, Any]] = None,
+        after: Optional[Cursor] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        order_column: str = "published_at",
+        descending: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+        if order_column not in KEYSET_COLUMNS:
+            raise ValueError(f"keyset 정렬에 사용할 수 없는 컬럼입니다: {order_column}")
+        columns = with_keyset_fields(fields, order_column)
+        query = _apply_filters(self.client.table("articles").select(",".join(columns)), filters)
+        if after is not None:
+            value, last_id = after
+            if descending:
+                if value is None:
+                    condition = f"(and({order_column}.is.null,id.lt.{_quote(last_id)}))"
+                else:
+                    condition = (
+                        f"({order_column}.lt.{_quote(value)},and({order_column}.eq.{_quote(value)},"
+                        f"id.lt.{_quote(last_id)}),{order_column}.is.null)"
+                    )
+            elif value is None:
+                condition = f"(and({order_column}.is.null,id.gt.{_quote(last_id)}),{order_column}.not.is.null)"
+            else:
+                condition = f"({order_column}.gt.{_quote(value)},and({order_column}.eq.{_quote(value)},id.gt.{_quote(last_id)}))"
+            # postgrest-py 0.13에는 or_ 빌더가 없어 쿼리 파라미터로 직접 추가
+            query.params = query.params.add("or", condition)
+        # order()를 두 번 부르면 order 파라미터가 중복되므로 복합 정렬을 한 번에 지정
+        order = f"{order_column}.desc.nullslast,id.desc" if descending else f"{order_column}.asc.nullsfirst,id.asc"
+        query.params = query.params.add("order", order)
+        result = query.limit(limit).execute()
+        rows = result.data or []
+        if len(rows) < limit:
+            return rows, None
+        return rows, (rows[-1].get(order_column), rows[-1]["id"])
+
+    def get_by_ids(self, ids: List[str], fields: Sequence[str] = ARTICLE_FIELDS_ALL) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        for chunk in _chunks(ids):
+            result = self.client.table("articles").select(",".join(fields)).in_("id", chunk).execute()
+            rows.extend(result.data or [])
+        return rows
+
+    def set_issue_id(self, ids: List[str], issue_id: str) -> int:
+        updated = 0
+        for chunk in _chunks(ids):
+            result = self.client.table("articles").update({"issue_id": issue_id}).in_("id", chunk).execute()
+            updated += len(result.data) if result.data else 0
+        return updated
+
+    def count(self, method: str = "exact", filters: Optional[Dict[str, Any]] = None) -> int:
+        if method not in COUNT_METHODS:
+            raise ValueError(f"지원하지 않는 count 방식입니다: {method}")
+        # 행 데이터는 1건만 받고 Content-Range 헤더의 전체 개수를 사용
+        query = _apply_filters(self.client.table("articles").select("id", count=method), filters)
+        result = query.limit(1).execute()
+        return result.count or 0
+
+    def group_counts(self, column: str) -> Dict[Optional[str], int]:
+        if column not in ARTICLE_GROUP_COLUMNS:
+            raise ValueError(f"집계할 수 없는 컬럼입니다: {column}")
+        # GROUP BY는 supabase/schema.sql의 article_group_counts 함수로 DB에서 수행
+        result = self.client.rpc("article_group_counts", {"group_column": column}).execute()
+        return {row["value"]: int(row["count"]) for row in (result.data or [])}
+
+
+class SupabaseIssueRepository(_SupabaseRepository, IssueRepository):
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.client.table("issues").insert(row).execute()
+        return result.data[0] if result.data else row
+
+    def exists(self, issue_id: str) -> bool:
+        result = self.client.table("issues").select("id").eq("id", issue_id).execute()
+        return len(result.data) > 0
+
+
+class SupabaseMediaOutletRepository(_SupabaseRepository, MediaOutletRepository):
+
+    def get_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        result = self.client.table("media_outlets").select("id,bias").eq("name", name).execute()
+        return result.data[0] if result.data else None
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.client.table("media_outlets").insert(row).execute()
+        return result.data[0]
+
+    def list_all(self) -> List[Dict[str, Any]]:
+        result = self.client.table("media_outlets").select("id,name,bias").execute()
+        return result.data or []
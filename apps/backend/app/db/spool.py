@@ -0,0 +1,402 @@
+"""
+DB 쓰기 스풀 (장애 대비 로컬 append-only 로그)
+
+DB가 느리거나 내려가 저장이 실패하면, 저장하려던 행을 로컬 JSONL 로그에 덧붙여 둡니다.
+SpoolReplayer가 DB가 돌아온 뒤 로그를 순서대로 읽어 큰 배치로 다시 저장합니다.
+
+레코드 형식 (한 줄에 하나):
+  {"op": "articles.insert", "rows": [...], "ts": "..."}
+  {"op": "issues.insert", "rows": [...], "ts": "..."}
+  {"op": "articles.set_issue", "rows": [{"ids": [...], "issue_id": "..."}], "ts": "..."}
+
+연결 오류, 타임아웃, 5xx처럼 일시적인 오류만 스풀에 보관합니다 (is_transient_error). 제약 조건 위반이나
+잘못된 컬럼처럼 다시 보내도 실패할 오류는 호출한 쪽에 그대로 올라갑니다. 재전송 중 그런 오류가 나면 해당 행을
+dead-letter.jsonl로 옮기고 다음 레코드로 넘어가므로, 한 행 때문에 뒤에 쌓인 레코드가 막히지 않습니다.
+
+파일 구성:
+  pending.jsonl                 새 레코드가 덧붙는 활성 로그
+  replay-<시각>-<pid>.jsonl     재전송을 위해 떼어 낸 로그 (처리 완료 후 삭제)
+  replay-...jsonl.offset        부분 처리된 로그의 다음 읽을 바이트 위치
+  dead-letter.jsonl             재전송해도 실패하는 행 ({"op", "rows", "ts", "error"}, 수동 확인용)
+  replay.lock                   재전송은 한 번에 하나만 (프로세스 사이 파일 락)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPOOL_DIR = "spool"
+DEFAULT_REPLAY_BATCH_SIZE = 1000
+DEFAULT_REPLAY_INTERVAL_SECONDS = 30.0
+
+OP_INSERT_ARTICLES = "articles.insert"
+OP_INSERT_ISSUES = "issues.insert"
+OP_SET_ISSUE = "articles.set_issue"
+SUPPORTED_OPS = (OP_INSERT_ARTICLES, OP_INSERT_ISSUES, OP_SET_ISSUE)
+
+# 연결 끊김/자원 부족/운영자 개입/직렬화 실패 같은 일시적인 PostgreSQL 오류 코드 (접두사)
+TRANSIENT_PG_CODES = ("08", "53", "57P", "40001", "40P01")
+# 잠금 대기 같은 일시적인 SQLite 오류 메시지
+TRANSIENT_SQLITE_MESSAGES = ("database is locked", "database is busy", "disk i/o error")
+
+
+def _transient_status(status: Any) -> bool:
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        return False
+    return status >= 500 or status in (408, 429)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """DB가 돌아오면 다시 보내서 성공할 수 있는 오류인지 (연결 오류, 타임아웃, 5xx/408/429)"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    if httpx is not None:
+        if isinstance(error, httpx.TransportError):
+            return True
+        if isinstance(error, httpx.HTTPStatusError):
+            return _transient_status(error.response.status_code)
+    if isinstance(error, sqlite3.OperationalError):
+        return any(message in str(error).lower() for message in TRANSIENT_SQLITE_MESSAGES)
+    # postgrest APIError: code가 PostgreSQL 오류 코드이거나, JSON이 아닌 응답이면 HTTP 상태 코드
+    code = getattr(error, "code", None)
+    if code is not None:
+        code = str(code)
+        # PostgreSQL 오류 코드는 5자리(예: 23505), HTTP 상태 코드는 3자리
+        if code.isdigit() and len(code) == 3:
+            return _transient_status(code)
+        return code.startswith(TRANSIENT_PG_CODES)
+    return _transient_status(getattr(error, "status_code", None))
+
+
+class WriteSpool:
+    """DB에 쓰지 못한 행을 보관하는 append-only 로그"""
+
+    ACTIVE_FILE = "pending.jsonl"
+    DEAD_LETTER_FILE = "dead-letter.jsonl"
+    REPLAY_LOCK_FILE = "replay.lock"
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or os.getenv("WRITE_SPOOL_DIR", DEFAULT_SPOOL_DIR))
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+
+    @property
+    def active_path(self) -> Path:
+        return self.directory / self.ACTIVE_FILE
+
+    @property
+    def dead_letter_path(self) -> Path:
+        return self.directory / self.DEAD_LETTER_FILE
+
+    def append(self, op: str, rows: List[Dict[str, Any]]):
+        """레코드를 로그 끝에 덧붙이고 디스크에 flush합니다."""
+        if op not in SUPPORTED_OPS:
+            raise ValueError(f"지원하지 않는 스풀 작업입니다: {op}")
+        if not rows:
+            return
+        line = json.dumps(
+            {"op": op, "rows": rows, "ts": datetime.utcnow().isoformat() + "Z"},
+            ensure_ascii=False, default=str,
+        ) + "\n"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            while True:
+                with open(self.active_path, "a", encoding="utf-8") as f:
+                    # 여러 크롤러 프로세스가 같은 스풀에 쓸 수 있으므로 파일 락으로 줄 단위 쓰기를 보장
+                    if fcntl:
+                        fcntl.flock(f, fcntl.LOCK_EX)
+                    try:
+                        # 락을 기다리는 사이 rotate가 파일을 떼어 냈으면 새 활성 로그를 다시 열어서 씀
+                        if not self._is_active(f):
+                            continue
+                        f.write(line)
+                        f.flush()
+                        os.fsync(f.fileno())
+                        break
+                    finally:
+                        if fcntl:
+                            fcntl.flock(f, fcntl.LOCK_UN)
+        logger.warning(f"📥 DB 저장 실패로 {len(rows)}건을 스풀에 보관했습니다 ({op})")
+
+    def _is_active(self, f) -> bool:
+        """열어 둔 파일이 아직 활성 로그 경로의 파일인지 (rename되지 않았는지)"""
+        try:
+            current = os.stat(self.active_path)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(f.fileno())
+        return (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino)
+
+    def rotate(self) -> Optional[Path]:
+        """활성 로그를 재전송용 파일로 떼어 냅니다.
+
+        append와 같은 파일 락을 잡은 채 rename하므로, 다른 프로세스가 이미 열어 둔 파일에 쓰는 중이면 끝날 때까지
+        기다리고, rename 뒤에 락을 얻은 쪽은 새 활성 로그에 씁니다 (append의 inode 확인).
+        """
+        with self._lock:
+            if not self.active_path.exists() or self.active_path.stat().st_size == 0:
+                return None
+            with open(self.active_path, "a", encoding="utf-8") as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    if not self._is_active(f) or os.fstat(f.fileno()).st_size == 0:
+                        return None
+                    stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+                    target = self.directory / f"replay-{stamp}-{os.getpid()}.jsonl"
+                    os.replace(self.active_path, target)
+                    return target
+                finally:
+                    if fcntl:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+
+    def dead_letter(self, op: str, rows: List[Dict[str, Any]], error: BaseException):
+        """다시 보내도 실패하는 행을 dead-letter 로그로 옮깁니다."""
+        line = json.dumps(
+            {"op": op, "rows": rows, "ts": datetime.utcnow().isoformat() + "Z", "error": repr(error)},
+            ensure_ascii=False, default=str,
+        ) + "\n"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        logger.error(f"☠️  재전송할 수 없는 {len(rows)}건을 {self.dead_letter_path}로 옮겼습니다 ({op}): {error}")
+
+    @contextmanager
+    def replay_lock(self) -> Iterator[bool]:
+        """재전송 락. 다른 스레드/프로세스가 재전송 중이면 기다리지 않고 False를 줍니다."""
+        if not self._replay_lock.acquire(blocking=False):
+            yield False
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / self.REPLAY_LOCK_FILE, "a") as f:
+                if fcntl:
+                    try:
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        yield False
+                        return
+                try:
+                    yield True
+                finally:
+                    if fcntl:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+        finally:
+            self._replay_lock.release()
+
+    def segments(self) -> List[Path]:
+        """재전송 대기 중인 로그 파일 (오래된 순)"""
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("replay-*.jsonl"))
+
+    def has_pending(self) -> bool:
+        return bool(self.segments()) or (self.active_path.exists() and self.active_path.stat().st_size > 0)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """아직 재전송되지 않은 레코드를 모두 순회합니다 (읽기 전용)."""
+        paths = self.segments() + ([self.active_path] if self.active_path.exists() else [])
+        for path in paths:
+            for _, record in read_records(path, load_offset(path)):
+                yield record
+
+    def has_pending_issue(self, issue_id: str) -> bool:
+        """스풀에 아직 저장되지 않은 이슈가 있는지 확인합니다."""
+        for record in self.iter_records():
+            if record["op"] == OP_INSERT_ISSUES and any(row.get("id") == issue_id for row in record["rows"]):
+                return True
+        return False
+
+
+def _offset_path(path: Path) -> Path:
+    return path.with_name(path.name + ".offset")
+
+
+def load_offset(path: Path) -> int:
+    offset_path = _offset_path(path)
+    if offset_path.exists():
+        return int(offset_path.read_text().strip() or 0)
+    return 0
+
+
+def save_offset(path: Path, offset: int):
+    tmp = _offset_path(path).with_suffix(".tmp")
+    tmp.write_text(str(offset))
+    os.replace(tmp, _offset_path(path))
+
+
+def read_records(path: Path, offset: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(다음 레코드 시작 위치, 레코드)를 순서대로 돌려줍니다. 잘린 마지막 줄은 무시합니다."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                logger.warning(f"스풀 파일의 마지막 줄이 잘려 있어 건너뜁니다: {path}")
+                return
+            offset += len(raw)
+            try:
+                yield offset, json.loads(raw)
+            except json.JSONDecodeError:
+                logger.error(f"스풀 레코드를 읽을 수 없어 건너뜁니다: {path} @ {offset}")
+
+
+class SpoolReplayer:
+    """스풀을 큰 배치로 DB에 다시 저장합니다."""
+
+    def __init__(self, spool: Optional[WriteSpool] = None, repos=None, batch_size: int = DEFAULT_REPLAY_BATCH_SIZE):
+        self.spool = spool or write_spool
+        self._repos = repos
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def repos(self):
+        if self._repos is None:
+            from .repositories import get_repositories
+            self._repos = get_repositories()
+        return self._repos
+
+    def drain(self) -> Dict[str, int]:
+        """스풀을 비웁니다. 일시적인 DB 오류가 나면 처리한 위치까지 기록하고 예외를 올립니다.
+
+        다른 스레드/프로세스가 이미 재전송 중이면 아무것도 하지 않습니다 (같은 로그를 두 번 보내지 않도록).
+        """
+        applied = {op: 0 for op in SUPPORTED_OPS}
+        with self.spool.replay_lock() as acquired:
+            if not acquired:
+                logger.info("다른 작업이 스풀을 재전송 중이라 건너뜁니다.")
+                return applied
+            self.spool.rotate()
+            for path in self.spool.segments():
+                self._drain_segment(path, applied)
+                os.remove(path)
+                if _offset_path(path).exists():
+                    os.remove(_offset_path(path))
+        if any(applied.values()):
+            logger.info(f"✅ 스풀 재전송 완료: {applied}")
+        return applied
+
+    def _drain_segment(self, path: Path, applied: Dict[str, int]):
+        # 같은 작업이 연속된 레코드끼리 batch_size 행까지 묶어서 저장 (작업 순서는 유지)
+        batch_op: Optional[str] = None
+        batch_rows: List[Dict[str, Any]] = []
+        batch_end = load_offset(path)
+
+        def flush():
+            if batch_rows:
+                applied[batch_op] += self._apply_batch(batch_op, batch_rows)
+                save_offset(path, batch_end)
+
+        for end, record in read_records(path, batch_end):
+            op, rows = record["op"], record["rows"]
+            if batch_rows and (op != batch_op or len(batch_rows) + len(rows) > self.batch_size):
+                flush()
+                batch_rows = []
+            batch_op = op
+            batch_rows.extend(rows)
+            batch_end = end
+        flush()
+
+    def _apply_batch(self, op: str, rows: List[Dict[str, Any]]) -> int:
+        """배치를 저장합니다. 일시적이지 않은 오류면 행 단위로 다시 저장해 실패한 행만 dead-letter로 보냅니다."""
+        try:
+            return self._apply(op, rows)
+        except Exception as e:
+            if is_transient_error(e):
+                raise
+            logger.warning(f"스풀 배치 저장 실패 ({op}, {len(rows)}건), 행 단위로 다시 시도합니다: {e}")
+        saved = 0
+        for row in rows:
+            try:
+                saved += self._apply(op, [row])
+            except Exception as e:
+                if is_transient_error(e):
+                    raise
+                self.spool.dead_letter(op, [row], e)
+        return saved
+
+    def _apply(self, op: str, rows: List[Dict[str, Any]]) -> int:
+        if op == OP_INSERT_ARTICLES:
+            # 재시도 중 일부가 이미 들어갔을 수 있으므로 url 기준으로 중복 제거
+            unique = list({row["url"]: row for row in rows}.values())
+            existing = self.repos.articles.find_existing_urls([row["url"] for row in unique])
+            new_rows = [row for row in unique if row["url"] not in existing]
+            saved = len(self.repos.articles.insert_many(new_rows)) if new_rows else 0
+            if saved:
+                from ..services.stats_service import stats_service
+                stats_service.invalidate()
+            return saved
+        if op == OP_INSERT_ISSUES:
+            saved = 0
+            for row in rows:
+                if not self.repos.issues.exists(row["id"]):
+                    self.repos.issues.insert(row)
+                    saved += 1
+            return saved
+        if op == OP_SET_ISSUE:
+            return sum(self.repos.articles.set_issue_id(row["ids"], row["issue_id"]) for row in rows)
+        raise ValueError(f"지원하지 않는 스풀 작업입니다: {op}")
+
+    def start_background(self, interval: float = DEFAULT_REPLAY_INTERVAL_SECONDS) -> threading.Thread:
+        """interval초마다 스풀을 비우는 데몬 스레드를 시작합니다."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                if self.spool.has_pending():
+                    try:
+                        self.drain()
+                    except Exception as e:
+                        logger.warning(f"스풀 재전송 실패 (다음 주기에 재시도): {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name="spool-replayer", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, final_drain: bool = True):
+        """백그라운드 재전송을 멈춥니다. final_drain이면 마지막으로 한 번 더 비웁니다."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if final_drain and self.spool.has_pending():
+            try:
+                self.drain()
+            except Exception as e:
+                logger.warning(f"스풀 재전송 실패 (스풀에 남겨 둠): {e}")
+
+
+# 싱글톤 인스턴스
+write_spool = WriteSpool()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    result = SpoolReplayer().drain()
+    print(f"스풀 재전송 결과: {result}")
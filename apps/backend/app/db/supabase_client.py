@@ -1,22 +1,156 @@
 import os
+import threading
+from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
+
 from dotenv import load_dotenv
-from supabase import create_client, Client
 
-# .env 파일 로드
-load_dotenv()
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+@dataclass
+class HttpPoolConfig:
+    """PostgREST 요청에 사용하는 HTTP 커넥션 풀 설정"""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 10.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "HttpPoolConfig":
+        """SUPABASE_HTTP_* 환경변수에서 설정을 읽습니다 (없으면 기본값)."""
+        defaults = cls()
+        return cls(
+            max_connections=_env_int("SUPABASE_HTTP_MAX_CONNECTIONS", defaults.max_connections),
+            max_keepalive_connections=_env_int("SUPABASE_HTTP_MAX_KEEPALIVE", defaults.max_keepalive_connections),
+            keepalive_expiry=_env_float("SUPABASE_HTTP_KEEPALIVE_EXPIRY", defaults.keepalive_expiry),
+            connect_timeout=_env_float("SUPABASE_HTTP_CONNECT_TIMEOUT", defaults.connect_timeout),
+            read_timeout=_env_float("SUPABASE_HTTP_READ_TIMEOUT", defaults.read_timeout),
+            write_timeout=_env_float("SUPABASE_HTTP_WRITE_TIMEOUT", defaults.write_timeout),
+            pool_timeout=_env_float("SUPABASE_HTTP_POOL_TIMEOUT", defaults.pool_timeout),
+            http2=os.getenv("SUPABASE_HTTP2", "").lower() in ("1", "true", "yes"),
+        )
+
 
 class SupabaseClient:
-    def __init__(self):
+    """
+    Supabase 클라이언트를 지연 생성하는 래퍼.
+
+    임포트 시점에는 환경변수를 읽거나 연결을 만들지 않고, 첫 get_client() 호출 때
+    클라이언트를 만듭니다. 프로세스 안의 모든 서비스는 같은 클라이언트(같은 HTTP
+    커넥션 풀)를 공유하며, fork된 자식 프로세스에서는 부모의 소켓을 물려받지 않도록
+    클라이언트를 새로 만듭니다.
+    """
+
+    def __init__(self, pool_config: Optional[HttpPoolConfig] = None):
+        self.url: Optional[str] = None
+        self.key: Optional[str] = None
+        self.pool_config = pool_config
+        self.client: Optional["Client"] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _create_client(self) -> "Client":
+        from supabase import create_client
+
+        load_dotenv()
         self.url = os.getenv("SUPABASE_URL")
         self.key = os.getenv("SUPABASE_ANON_KEY")
-        
+
         if not self.url or not self.key:
             raise ValueError("SUPABASE_URL과 SUPABASE_ANON_KEY 환경변수가 필요합니다.")
-        
-        self.client: Client = create_client(self.url, self.key)
-    
-    def get_client(self) -> Client:
+
+        if self.pool_config is None:
+            self.pool_config = HttpPoolConfig.from_env()
+
+        client = create_client(self.url, self.key)
+        self._install_http_pool(client, self.pool_config)
+        return client
+
+    @staticmethod
+    def _install_http_pool(client: "Client", config: HttpPoolConfig):
+        """PostgREST 세션을 커넥션 풀/타임아웃이 설정된 세션으로 교체합니다.
+
+        supabase-py는 인증 상태가 바뀌면 postgrest 클라이언트를 다시 만들기 때문에,
+        세션 교체는 postgrest 생성 함수에 걸어 둡니다.
+        """
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            connect=config.connect_timeout,
+            read=config.read_timeout,
+            write=config.write_timeout,
+            pool=config.pool_timeout,
+        )
+        init_postgrest = client._init_postgrest_client
+
+        def _init_pooled_postgrest_client(**kwargs):
+            postgrest = init_postgrest(**kwargs)
+            session = postgrest.session
+            postgrest.session = type(session)(
+                base_url=session.base_url,
+                headers=session.headers,
+                timeout=timeout,
+                limits=limits,
+                http2=config.http2,
+            )
+            session.close()
+            return postgrest
+
+        client._init_postgrest_client = _init_pooled_postgrest_client
+
+    def get_client(self) -> "Client":
+        pid = os.getpid()
+        if self.client is None or self._pid != pid:
+            with self._lock:
+                if self.client is None or self._pid != pid:
+                    self.client = self._create_client()
+                    self._pid = pid
         return self.client
 
-# 싱글톤 인스턴스
-supabase_client = SupabaseClient() 
\ No newline at end of file
+    def reset(self):
+        """현재 클라이언트를 버립니다. 다음 get_client() 호출 때 새로 생성됩니다.
+
+        multiprocessing 풀의 initializer로 넘기면 워커마다 독립된 클라이언트를 사용합니다.
+        """
+        with self._lock:
+            self.client = None
+            self._pid = None
+
+    def _reset_after_fork(self):
+        # fork 직후 자식 프로세스: 부모의 락/소켓 상태를 물려받지 않도록 초기화
+        self._lock = threading.Lock()
+        self.client = None
+        self._pid = None
+
+
+# 싱글톤 인스턴스 (실제 연결은 첫 get_client() 호출 시 생성)
+supabase_client = SupabaseClient()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=supabase_client._reset_after_fork)
+
+
+def init_worker_client():
+    """워커 프로세스 initializer: 프로세스별 Supabase 클라이언트를 사용하도록 초기화합니다."""
+    supabase_client.reset()
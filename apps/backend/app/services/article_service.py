@@ -1,62 +1,76 @@
-from typing import List, Optional
-from ..db.supabase_client import supabase_client
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from ..db.repositories import (
+    ARTICLE_FIELDS_LIST, DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor, get_repositories,
+)
+from ..db.spool import OP_INSERT_ARTICLES, is_transient_error, write_spool
 from ..models.article import Article
+from .stats_service import stats_service
 import logging
 
 logger = logging.getLogger(__name__)
 
 class ArticleService:
     def __init__(self):
-        self.client = supabase_client.get_client()
+        self.repos = get_repositories()
     
     async def save_articles(self, articles: List[Article]) -> int:
         """기사들을 데이터베이스에 저장"""
         if not articles:
             return 0
         
+        # 기사 데이터 준비 (각 기사의 media_id, bias 사용)
+        articles_data = []
+        from rich import print as rprint
+        for article in articles:
+            article_dict = article.to_dict()
+            # bias가 None/빈값이면 'center'로 강제
+            if not article_dict.get('bias'):
+                article_dict['bias'] = 'center'
+            articles_data.append(article_dict)
+        
         try:
             # 기존 URL 체크를 위한 쿼리
-            urls = [article.url for article in articles]
-            existing_articles = self.client.table("articles").select("url").in_("url", urls).execute()
-            existing_urls = {row["url"] for row in existing_articles.data}
+            urls = [row["url"] for row in articles_data]
+            existing_urls = self.repos.articles.find_existing_urls(urls)
             
             # 중복되지 않은 기사만 필터링
-            new_articles = [article for article in articles if article.url not in existing_urls]
+            new_rows = [row for row in articles_data if row["url"] not in existing_urls]
             
-            if not new_articles:
+            if not new_rows:
                 logger.info("모든 기사가 이미 존재합니다.")
                 return 0
             
-            # 기사 데이터 준비 (각 기사의 media_id, bias 사용)
-            articles_data = []
-            from rich import print as rprint
-            for article in new_articles:
-                article_dict = article.to_dict()
-                # bias가 None/빈값이면 'center'로 강제
-                if not article_dict.get('bias'):
-                    article_dict['bias'] = 'center'
-                rprint(f"[cyan]DB insert 직전 published_at: {article_dict.get('published_at')}[/cyan]")
-                articles_data.append(article_dict)
+            for row in new_rows:
+                rprint(f"[cyan]DB insert 직전 published_at: {row.get('published_at')}[/cyan]")
             # 일괄 삽입
-            result = self.client.table("articles").insert(articles_data).execute()
+            saved_rows = self.repos.articles.insert_many(new_rows)
             
-            saved_count = len(result.data) if result.data else 0
+            saved_count = len(saved_rows)
+            if saved_count:
+                stats_service.invalidate()
             logger.info(f"✅ {saved_count}개 기사 저장 완료")
             
             return saved_count
             
         except Exception as e:
-            logger.error(f"기사 저장 중 오류 발생: {e}")
-            raise
+            if not is_transient_error(e):
+                # 제약 조건 위반/잘못된 값은 다시 보내도 실패하므로 스풀에 넣지 않고 그대로 올림
+                logger.error(f"기사 저장 중 오류 발생: {e}")
+                raise
+            # DB 장애 시 배치를 버리지 않고 로컬 스풀에 보관 (SpoolReplayer가 복구 후 재전송, url 중복은 재전송 때 제거)
+            logger.error(f"기사 저장 중 일시적인 DB 오류 발생, 스풀에 보관합니다: {e}")
+            write_spool.append(OP_INSERT_ARTICLES, articles_data)
+            return 0
     
     async def _get_or_create_chosun_media(self) -> str:
         """조선일보 미디어 정보 가져오기 (없으면 생성)"""
         try:
             # 기존 조선일보 미디어 정보 확인
-            result = self.client.table("media_outlets").select("id").eq("name", "조선일보").execute()
+            media = self.repos.media_outlets.get_by_name("조선일보")
             
-            if result.data:
-                return result.data[0]["id"]
+            if media:
+                return media["id"]
             
             # 없으면 생성
             media_data = {
@@ -65,41 +79,93 @@ class ArticleService:
                 "logo_url": "https://www.chosun.com/favicon.ico"
             }
             
-            result = self.client.table("media_outlets").insert(media_data).execute()
-            return result.data[0]["id"]
+            media = self.repos.media_outlets.insert(media_data)
+            stats_service.invalidate()
+            return media["id"]
             
         except Exception as e:
             logger.error(f"미디어 정보 처리 중 오류: {e}")
             raise
     
-    async def get_articles_by_category(self, category: str, limit: int = 30) -> List[dict]:
-        """카테고리별 기사 조회"""
+    async def get_articles_by_category(self, category: str, limit: int = 30, fields: Sequence[str] = ARTICLE_FIELDS_LIST) -> List[dict]:
+        """카테고리별 최신 기사 조회 (기본적으로 content_full 제외)"""
         try:
-            result = self.client.table("articles").select("*").eq("category", category).limit(limit).execute()
-            return result.data
+            rows, _ = await asyncio.to_thread(
+                self.repos.articles.fetch_page, fields, {"category": category}, None, limit, descending=True,
+            )
+            return rows
         except Exception as e:
             logger.error(f"기사 조회 중 오류: {e}")
             return []
+
+    async def get_articles_page(
+        self,
+        fields: Sequence[str] = ARTICLE_FIELDS_LIST,
+        filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None,
+        limit: int = 30,
+    ) -> Dict[str, Any]:
+        """(published_at, id) keyset 페이지 조회. 응답의 next_cursor로 다음 페이지를 요청합니다."""
+        try:
+            rows, next_cursor = await asyncio.to_thread(
+                self.repos.articles.fetch_page, fields, filters, decode_cursor(cursor), limit,
+            )
+            return {"articles": rows, "next_cursor": encode_cursor(next_cursor)}
+        except Exception as e:
+            logger.error(f"기사 조회 중 오류: {e}")
+            return {"articles": [], "next_cursor": None}
+
+    async def stream_articles(
+        self,
+        fields: Sequence[str] = ARTICLE_FIELDS_LIST,
+        filters: Optional[Dict[str, Any]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        """조건에 맞는 기사를 한 건씩 비동기로 순회합니다.
+
+        한 번에 한 페이지만 메모리에 두고, 현재 페이지를 소비하는 동안 다음 페이지를 미리 가져옵니다.
+        """
+        fetch = self.repos.articles.fetch_page
+        pending = asyncio.ensure_future(asyncio.to_thread(fetch, fields, filters, None, page_size))
+        try:
+            while pending is not None:
+                rows, next_cursor = await pending
+                pending = None
+                if next_cursor is not None:
+                    pending = asyncio.ensure_future(asyncio.to_thread(fetch, fields, filters, next_cursor, page_size))
+                for row in rows:
+                    yield row
+        finally:
+            if pending is not None:
+                pending.cancel()
     
-    async def get_total_articles_count(self) -> int:
-        """전체 기사 수 조회"""
+    async def get_total_articles_count(self, method: str = "exact") -> int:
+        """전체 기사 수 조회 (COUNT 쿼리, TTL 캐시 사용)"""
         try:
-            result = self.client.table("articles").select("id").execute()
-            return len(result.data) if result.data else 0
+            return stats_service.get_article_count(method=method)
         except Exception as e:
             logger.error(f"기사 수 조회 중 오류: {e}")
             return 0 
 
+    async def get_article_stats(self) -> dict:
+        """카테고리/언론사/bias별 기사 수 통계 조회 (TTL 캐시 사용)"""
+        try:
+            return stats_service.get_summary()
+        except Exception as e:
+            logger.error(f"기사 통계 조회 중 오류: {e}")
+            return {}
+
     async def get_or_create_media(self, name: str) -> Optional[dict]:
         """언론사 이름으로 media_outlets의 id, bias를 조회(없으면 생성)"""
         try:
-            result = self.client.table("media_outlets").select("id,bias").eq("name", name).execute()
-            if result.data:
-                return {"id": result.data[0]["id"], "bias": result.data[0]["bias"]}
+            media = self.repos.media_outlets.get_by_name(name)
+            if media:
+                return {"id": media["id"], "bias": media["bias"]}
             # 없으면 생성 (bias는 center로 기본값, logo_url은 빈 문자열)
             media_data = {"name": name, "bias": "center", "logo_url": ""}
-            result = self.client.table("media_outlets").insert(media_data).execute()
-            return {"id": result.data[0]["id"], "bias": result.data[0]["bias"]}
+            media = self.repos.media_outlets.insert(media_data)
+            stats_service.invalidate()
+            return {"id": media["id"], "bias": media["bias"]}
         except Exception as e:
             logger.error(f"미디어 정보 처리 중 오류: {e}")
             return None 
\ No newline at end of file
@@ -0,0 +1,141 @@
+import os
+import sys
+import argparse
+from typing import Dict, List
+from dotenv import load_dotenv
+from rich.console import Console
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
+
+from app.db.spool import write_spool
+from app.services.cluster.embedding_matrix import EmbeddingMatrix
+from app.services.cluster.embedding_store import DEFAULT_STORE_PATH, EmbeddingStore
+from app.services.cluster.issue_index import (
+    DEFAULT_ASSIGN_THRESHOLD,
+    DEFAULT_INDEX_PATH,
+    DEFAULT_MAX_AGE_HOURS,
+    IssueCentroidIndex,
+)
+from app.services.cluster.update_articles import ArticleUpdater
+
+# .env 파일 로드
+load_dotenv()
+
+# rich 콘솔
+console = Console()
+
+class IssueAssigner:
+    """미배정 기사 중 기존 이슈 중심과 충분히 가까운 기사를 그 이슈에 바로 연결합니다.
+
+    배정된 기사는 임베딩 저장소에서 빠지므로 다음 DBSCAN 단계는 남은 기사만 클러스터링하고,
+    기존 이슈는 다시 요약하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_ASSIGN_THRESHOLD,
+        max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+        store_path: str = DEFAULT_STORE_PATH,
+        index_path: str = DEFAULT_INDEX_PATH,
+    ):
+        self.threshold = threshold
+        self.max_age_hours = max_age_hours
+        self.store = EmbeddingStore(store_path)
+        self.index = IssueCentroidIndex(index_path)
+        self.updater = ArticleUpdater()
+
+    def load_index(self, model: str) -> bool:
+        """이슈 인덱스를 읽고 오래된 이슈를 뺍니다. 배정할 이슈가 있으면 True."""
+        try:
+            self.index.load()
+        except Exception as e:
+            console.print(f"[bold red]이슈 인덱스 로드 중 오류 발생 (새로 시작합니다): {e}[/bold red]")
+            self.index.reset(model)
+        if self.index.model is not None and self.index.model != model:
+            console.print(
+                f"[yellow]⚠️  임베딩 모델이 바뀌어({self.index.model} → {model}) 이슈 인덱스를 비웁니다.[/yellow]"
+            )
+            self.index.reset(model)
+        self.index.model = model
+        expired = self.index.expire(self.max_age_hours)
+        if expired:
+            console.print(f"[cyan]{self.max_age_hours:g}시간 동안 갱신되지 않은 이슈 {expired}개를 인덱스에서 뺐습니다.[/cyan]")
+        summary = self.index.summary()
+        console.print(f"[cyan]이슈 인덱스: 이슈 {summary['issues']}개 (누적 기사 {summary['articles']}개)[/cyan]")
+        return len(self.index) > 0
+
+    def link_articles(self, assigned: Dict[str, List[str]]) -> List[str]:
+        """배정 결과를 DB에 반영합니다. 연결되었거나 스풀에 보관된 기사 id 목록을 반환합니다."""
+        linked_ids: List[str] = []
+        missing_issues: List[str] = []
+        for issue_id, article_ids in assigned.items():
+            if self.updater.verify_issue_exists(issue_id):
+                linked = self.updater.update_articles_issue_id(article_ids, issue_id)
+            elif write_spool.has_pending_issue(issue_id):
+                linked = self.updater.spool_issue_link(article_ids, issue_id)
+            else:
+                # DB에서 지워진 이슈는 인덱스에서도 빼고, 그 기사들은 클러스터링으로 넘김
+                missing_issues.append(issue_id)
+                continue
+            if linked:
+                linked_ids.extend(article_ids)
+        if missing_issues:
+            self.index.remove(missing_issues)
+            console.print(f"[yellow]⚠️  DB에 없는 이슈 {len(missing_issues)}개를 인덱스에서 뺐습니다.[/yellow]")
+        return linked_ids
+
+    def run(self) -> int:
+        """기존 이슈 배정을 실행하고 배정된 기사 수를 반환합니다."""
+        console.print("[bold green]=== 기존 이슈 배정 시작 ===[/bold green]")
+        if not self.store.exists():
+            console.print("[yellow]임베딩 저장소가 없어 배정을 건너뜁니다.[/yellow]")
+            return 0
+
+        matrix, meta = EmbeddingMatrix.from_store(self.store)
+        if len(matrix) == 0:
+            console.print("[yellow]배정할 미배정 기사가 없습니다.[/yellow]")
+            return 0
+        if not self.load_index(meta.get('model')):
+            console.print("[yellow]인덱스에 이슈가 없어 모든 기사를 클러스터링으로 넘깁니다.[/yellow]")
+            self.index.save()
+            return 0
+        if matrix.dim != self.index.dim:
+            console.print(
+                f"[yellow]⚠️  임베딩 차원이 달라(저장소 {matrix.dim}, 인덱스 {self.index.dim}) 이슈 인덱스를 비웁니다.[/yellow]"
+            )
+            self.index.reset(meta.get('model'))
+            self.index.save()
+            return 0
+
+        assignments = self.index.assign(matrix.vectors, matrix.ids, self.threshold)
+        assigned = {issue_id: article_ids for issue_id, (article_ids, _) in assignments.items()}
+        linked_ids = self.link_articles(assigned) if assigned else []
+        self.updater.prune_embedding_store(linked_ids)
+        # 연결(또는 스풀 보관)된 기사만 중심에 더함. 실패한 기사는 클러스터링으로 넘어가고 다음 실행에 다시 배정됨
+        linked = set(linked_ids)
+        self.index.add_issues({
+            issue_id: vectors[[article_id in linked for article_id in article_ids]]
+            for issue_id, (article_ids, vectors) in assignments.items()
+            if any(article_id in linked for article_id in article_ids)
+        })
+        self.index.save()
+
+        console.print(f"[bold green]=== 기존 이슈 배정 완료 ===[/bold green]")
+        console.print(
+            f"[cyan]{len(matrix)}개 중 {len(linked_ids)}개 기사를 기존 이슈 {len(assigned)}개에 배정 "
+            f"(유사도 ≥ {self.threshold}), {len(matrix) - len(linked_ids)}개는 클러스터링으로 넘깁니다.[/cyan]"
+        )
+        return len(linked_ids)
+
+def main():
+    parser = argparse.ArgumentParser(description="미배정 기사를 기존 이슈에 배정")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_ASSIGN_THRESHOLD, help='이슈 중심과의 최소 코사인 유사도')
+    parser.add_argument('--max-age-hours', type=float, default=DEFAULT_MAX_AGE_HOURS, help='이 시간 동안 갱신되지 않은 이슈는 배정 대상에서 제외 (0: 제외하지 않음)')
+    args = parser.parse_args()
+
+    assigner = IssueAssigner(threshold=args.threshold, max_age_hours=args.max_age_hours)
+    assigner.run()
+
+if __name__ == "__main__":
+    main()
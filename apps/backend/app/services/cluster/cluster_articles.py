@@ -1,27 +1,122 @@
 import json
+import time
+from dataclasses import asdict
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sklearn.cluster import DBSCAN
 from sklearn.metrics.pairwise import cosine_similarity
 import sys
 import os
 from rich.console import Console
+from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
 import argparse
 import matplotlib.pyplot as plt
-from sklearn.metrics import silhouette_score
 
 # 프로젝트 루트 경로 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
 
+from app.services.cluster.clustering_engines import (
+    DEFAULT_ENGINE,
+    DEFAULT_KNN_K,
+    DEFAULT_LEIDEN_RESOLUTION,
+    SUPPORTED_ENGINES,
+    ClusteringEngine,
+    make_engine,
+)
+from app.services.cluster.cluster_reports import (
+    ann_report,
+    engine_benchmark,
+    kernel_report,
+    quantization_report,
+    reduction_report,
+    search_report,
+    shard_report,
+)
+from app.services.cluster.dimension_reduction import (
+    DEFAULT_REDUCED_DIM,
+    DEFAULT_REDUCER,
+    DEFAULT_REDUCER_PATH,
+    SUPPORTED_REDUCERS,
+    EmbeddingReducer,
+)
+from app.services.cluster.embedding_matrix import EmbeddingMatrix
+from app.services.cluster.eps_estimation import DEFAULT_AUTO_EPS, EpsEstimate, estimate_eps, knee_distance
+from app.services.cluster.embedding_store import DEFAULT_STORE_PATH, EmbeddingStore
+from app.services.cluster.neighbor_index import (
+    DEFAULT_N_PROBE,
+    DEFAULT_NEIGHBOR_METHOD,
+    SUPPORTED_NEIGHBOR_METHODS,
+    k_distances,
+    radius_neighbors_graph,
+)
+from app.services.cluster.sharding import (
+    DEFAULT_BY_CATEGORY,
+    DEFAULT_OVERLAP_HOURS,
+    DEFAULT_SHARD,
+    DEFAULT_WINDOW_HOURS,
+    DEFAULT_WORKERS,
+    cluster_sharded,
+    make_shards,
+)
+from app.services.cluster.parameter_search import (
+    DEFAULT_HALVING_FACTOR,
+    DEFAULT_MIN_SEARCH_ROWS,
+    DEFAULT_SEARCH_METHOD,
+    DEFAULT_SEARCH_TOLERANCE,
+    SUPPORTED_SEARCH_METHODS,
+    adaptive_search,
+)
+from app.services.cluster.quality_metrics import DEFAULT_SAMPLE_SIZE, QUALITY_METRICS, score_labels
+from app.services.cluster.two_tier import MixedTier, mixed_tier_graph
+
 # rich 콘솔
 console = Console()
 
 class ArticleClusterer:
-    def __init__(self, eps: float = 1.2, min_samples: int = 2):
+    def __init__(
+        self,
+        eps: float = 1.2,
+        min_samples: int = 2,
+        neighbors: str = DEFAULT_NEIGHBOR_METHOD,
+        n_probe: int = DEFAULT_N_PROBE,
+        shard: bool = False,
+        window_hours: float = DEFAULT_WINDOW_HOURS,
+        overlap_hours: float = DEFAULT_OVERLAP_HOURS,
+        by_category: bool = False,
+        workers: int = DEFAULT_WORKERS,
+        engine: str = DEFAULT_ENGINE,
+        knn_k: int = DEFAULT_KNN_K,
+        resolution: float = DEFAULT_LEIDEN_RESOLUTION,
+        reducer: str = DEFAULT_REDUCER,
+        reduced_dim: int = DEFAULT_REDUCED_DIM,
+        reducer_path: str = DEFAULT_REDUCER_PATH,
+        auto_eps: bool = DEFAULT_AUTO_EPS,
+    ):
         self.eps = eps
         self.min_samples = min_samples
-        self.clusterer = DBSCAN(eps=eps, min_samples=min_samples, metric='cosine')
+        # eps를 k-distance 곡선의 무릎으로 자동 추정 (auto_select_eps)
+        self.auto_eps = auto_eps
+        # eps 이웃 탐색 방식 (exact: 브루트포스, ivf: 근사 역색인)
+        self.neighbors = neighbors
+        self.n_probe = n_probe
+        # 클러스터링 엔진 (dbscan | hdbscan | knn | leiden)
+        self.engine: ClusteringEngine = make_engine(engine, eps, min_samples, neighbors, n_probe, knn_k, resolution)
+        # published_at 시간 창(+ category)별 분할 클러스터링
+        self.shard = shard
+        self.window_hours = window_hours
+        self.overlap_hours = overlap_hours
+        self.by_category = by_category
+        self.workers = workers
+        # 클러스터링 전 차원 축소 (none | pca | random), 축소기는 reducer_path에 유지
+        self.reducer = reducer
+        self.reduced_dim = reduced_dim
+        self.reducer_path = reducer_path
+        # 2단계 임베딩 저장소면 본문 벡터로 올린 행과 그 행들의 제목 벡터
+        self.mixed_tier: Optional[MixedTier] = None
+        # 읽어 온 저장소의 dtype (양자화 비교 리포트 안내용)과 임베딩 모델 (차원 축소기 호환 확인용)
+        self.source_dtype = 'float32'
+        self.source_model: Optional[str] = None
     
     def load_embeddings(self, filename: str = "article_embeddings.json") -> List[Dict[str, Any]]:
         """저장된 임베딩 데이터를 불러옵니다."""
@@ -37,33 +132,119 @@ class ArticleClusterer:
             console.print(f"[bold red]파일 로드 중 오류 발생: {e}[/bold red]")
             return []
     
-    def prepare_vectors(self, embeddings_data: List[Dict[str, Any]]) -> tuple[np.ndarray, List[str]]:
-        """임베딩 데이터에서 벡터만 추출하여 numpy 배열로 변환합니다."""
-        vectors = []
-        article_ids = []
-        
-        for item in embeddings_data:
-            if 'embedding' in item and item['embedding']:
-                vectors.append(item['embedding'])
-                article_ids.append(item['article_id'])
-        
-        if not vectors:
+    def load_embedding_store(self, filename: str = DEFAULT_STORE_PATH) -> Optional[EmbeddingMatrix]:
+        """.npy 임베딩 저장소를 메모리 매핑으로 열어 EmbeddingMatrix로 불러옵니다 (float16/int8은 저장 dtype 그대로)."""
+        try:
+            store = EmbeddingStore(filename)
+            matrix, meta = EmbeddingMatrix.from_store(store)
+            self.source_dtype = meta['dtype']
+            self.source_model = meta.get('model')
+            console.print(
+                f"[cyan]임베딩 데이터 로드 완료: {len(matrix)}개 기사 "
+                f"({meta['dtype']}, {meta['dim']}차원, 모델 {meta.get('model')})[/cyan]"
+            )
+            if meta.get('two_tier'):
+                full_rows = np.flatnonzero(matrix.column('tier') == 'full')
+                self.mixed_tier = MixedTier(full_rows, store.load_titles(meta))
+                console.print(
+                    f"[cyan]2단계 임베딩: 제목 벡터 {len(matrix) - len(full_rows)}개, 본문 벡터 {len(full_rows)}개[/cyan]"
+                )
+            return matrix
+        except FileNotFoundError:
+            console.print(f"[bold red]파일을 찾을 수 없습니다: {filename}[/bold red]")
+            return None
+        except Exception as e:
+            console.print(f"[bold red]파일 로드 중 오류 발생: {e}[/bold red]")
+            return None
+    
+    def load_vectors(self, filename: str = DEFAULT_STORE_PATH) -> Optional[EmbeddingMatrix]:
+        """임베딩 파일을 읽어 EmbeddingMatrix로 반환합니다 (없거나 비어 있으면 None).
+
+        .json 파일은 기존 방식대로 읽고, 그 외에는 .npy 저장소로 읽습니다.
+        """
+        if filename.endswith('.json'):
+            embeddings_data = self.load_embeddings(filename)
+            if not embeddings_data:
+                return None
+            matrix = self.prepare_vectors(embeddings_data)
+        else:
+            matrix = self.load_embedding_store(filename)
+        if matrix is None or len(matrix) == 0:
+            return None
+        return matrix
+    
+    def prepare_vectors(self, embeddings_data: List[Dict[str, Any]]) -> Optional[EmbeddingMatrix]:
+        """임베딩 데이터(dict 목록)를 EmbeddingMatrix로 변환합니다."""
+        matrix = EmbeddingMatrix.from_records(embeddings_data)
+        if len(matrix) == 0:
             console.print("[bold red]유효한 임베딩 벡터가 없습니다.[/bold red]")
-            return np.array([]), []
-        
-        return np.array(vectors), article_ids
+            return None
+        return matrix
     
-    def perform_clustering(self, vectors: np.ndarray) -> np.ndarray:
-        """DBSCAN 클러스터링을 수행합니다."""
-        if len(vectors) == 0:
+    def reduce_dimensions(self, matrix: EmbeddingMatrix) -> EmbeddingMatrix:
+        """저장된 차원 축소기를 새 기사로 갱신하고 matrix(와 2단계 제목 벡터)를 축소 공간으로 투영합니다.
+
+        축소를 끄거나 아직 기저를 고를 만큼 기사가 없으면 matrix를 그대로 돌려줍니다.
+        """
+        if self.reducer == 'none' or len(matrix) == 0:
+            return matrix
+        reducer = EmbeddingReducer(self.reducer, self.reduced_dim, self.reducer_path)
+        try:
+            reducer.load()
+        except Exception as e:
+            console.print(f"[bold red]차원 축소기 로드 중 오류 발생 (새로 만듭니다): {e}[/bold red]")
+        if self.reduced_dim >= matrix.dim:
+            console.print(f"[yellow]⚠️  축소 차원({self.reduced_dim})이 임베딩 차원({matrix.dim}) 이상이라 축소하지 않습니다.[/yellow]")
+            return matrix
+        started = time.perf_counter()
+        stats = reducer.update(matrix.vectors, matrix.ids, self.source_model)
+        if not reducer.fitted:
+            console.print(
+                f"[yellow]차원 축소기 학습에 기사가 부족해({stats['rows_seen']}/{self.reduced_dim}) 원래 차원으로 클러스터링합니다.[/yellow]"
+            )
+            return matrix
+        reduced = matrix.with_vectors(reducer.transform(matrix.vectors))
+        if self.mixed_tier is not None:
+            self.mixed_tier = MixedTier(self.mixed_tier.full_rows, reducer.transform(self.mixed_tier.title_vectors))
+        reducer.save()
+        console.print(
+            f"[cyan]차원 축소: {reducer.describe()} (새 기사 {stats['new_rows']}개"
+            f"{', 기저 갱신' if stats['refit'] else ''}, {time.perf_counter() - started:.2f}초)[/cyan]"
+        )
+        return reduced
+
+    def auto_select_eps(self, matrix: EmbeddingMatrix) -> Optional[EpsEstimate]:
+        """min_samples번째 이웃의 코사인 k-distance 곡선 무릎으로 eps를 정하고 엔진에 반영합니다.
+
+        차원 축소를 했다면 축소된 matrix로 불러야 클러스터링과 같은 공간의 eps가 됩니다.
+        """
+        if len(matrix) == 0:
+            return None
+        estimate = estimate_eps(matrix.vectors, self.min_samples, self.neighbors, self.n_probe)
+        console.print(f"[cyan]eps 자동 추정: {estimate}[/cyan]")
+        if self.engine.name == 'hdbscan':
+            console.print("[yellow]hdbscan 엔진은 eps를 쓰지 않습니다.[/yellow]")
+        self.eps = self.engine.eps = estimate.eps
+        return estimate
+
+    def perform_clustering(self, matrix: EmbeddingMatrix) -> np.ndarray:
+        """선택한 엔진(기본 DBSCAN)으로 클러스터링을 수행합니다."""
+        if len(matrix) == 0:
             console.print("[bold red]클러스터링할 벡터가 없습니다.[/bold red]")
             return np.array([])
         
-        console.print(f"[cyan]클러스터링 시작: {len(vectors)}개 벡터[/cyan]")
-        console.print(f"[cyan]파라미터: eps={self.eps}, min_samples={self.min_samples}[/cyan]")
+        console.print(f"[cyan]클러스터링 시작: {len(matrix)}개 벡터[/cyan]")
+        console.print(
+            f"[cyan]엔진: {self.engine.name} ({self.engine.describe()}), 이웃 탐색={self.neighbors}"
+            + (f" (n_probe={self.n_probe})" if self.neighbors == 'ivf' else "")
+            + "[/cyan]"
+        )
         
         # 코사인 유사도 기반 클러스터링
-        cluster_labels = self.clusterer.fit_predict(vectors)
+        if self.shard:
+            cluster_labels = self.cluster_shards(matrix)
+        else:
+            cluster_labels = self.engine.fit_predict(matrix.vectors, self.mixed_tier)
         
         # 클러스터 통계
         unique_labels = np.unique(cluster_labels)
@@ -77,27 +258,34 @@ class ArticleClusterer:
         
         return cluster_labels
     
-    def create_cluster_results(self, embeddings_data: List[Dict[str, Any]], cluster_labels: np.ndarray, article_ids: List[str]) -> List[Dict[str, Any]]:
-        """클러스터링 결과를 정리합니다."""
+    def cluster_shards(self, matrix: EmbeddingMatrix) -> np.ndarray:
+        """published_at 시간 창(+ category)별 샤드를 프로세스 풀에서 클러스터링하고 겹친 구간에서 합칩니다."""
+        categories = matrix.column('category') if self.by_category else None
+        shards = make_shards(matrix.column('published_at'), self.window_hours, self.overlap_hours, categories)
+        sizes = [len(shard.rows) for shard in shards]
+        console.print(
+            f"[cyan]분할 클러스터링: 샤드 {len(shards)}개 (창 {self.window_hours:g}시간, 겹침 {self.overlap_hours:g}시간"
+            f"{', 분야별' if self.by_category else ''}), 최대 샤드 {max(sizes, default=0)}개, "
+            f"중복 포함 {sum(sizes)}개 기사, 작업자 {self.workers}개[/cyan]"
+        )
+        return cluster_sharded(matrix.vectors, shards, self.engine.fit, self.min_samples, self.mixed_tier, self.workers)
+    
+    def create_cluster_results(self, matrix: EmbeddingMatrix, cluster_labels: np.ndarray) -> List[Dict[str, Any]]:
+        """클러스터링 결과를 정리합니다 (라벨은 matrix 행 순서)."""
         if len(cluster_labels) == 0:
             return []
         
-        # article_id와 cluster_label 매핑
-        id_to_label = dict(zip(article_ids, cluster_labels))
-        
-        cluster_results = []
-        
-        for item in embeddings_data:
-            article_id = item['article_id']
-            if article_id in id_to_label:
-                cluster_results.append({
-                    'article_id': article_id,
-                    'title': item.get('title', ''),
-                    'cluster_id': int(id_to_label[article_id]),
-                    'text_length': item.get('text_length', 0)
-                })
-        
-        return cluster_results
+        titles = matrix.column('title', '')
+        text_lengths = matrix.column('text_length', 0)
+        return [
+            {
+                'article_id': article_id,
+                'title': titles[row] or '',
+                'cluster_id': int(cluster_labels[row]),
+                'text_length': int(text_lengths[row] or 0)
+            }
+            for row, article_id in enumerate(matrix.ids)
+        ]
     
     def analyze_clusters(self, cluster_results: List[Dict[str, Any]]):
         """클러스터 분석 결과를 출력합니다."""
@@ -141,20 +329,19 @@ class ArticleClusterer:
         except Exception as e:
             console.print(f"[bold red]파일 저장 중 오류 발생: {e}[/bold red]")
 
-def compute_k_distance(vectors: np.ndarray, k: int) -> np.ndarray:
-    from sklearn.neighbors import NearestNeighbors
-    nbrs = NearestNeighbors(n_neighbors=k).fit(vectors)
-    distances, _ = nbrs.kneighbors(vectors)
-    # k번째 이웃 거리만 추출
-    k_distances = np.sort(distances[:, k-1])
-    return k_distances
+def compute_k_distance(vectors: np.ndarray, k: int, neighbors: str = 'exact', n_probe: Optional[int] = None) -> np.ndarray:
+    """점마다 k번째 이웃(자기 자신 포함)까지의 코사인 거리를 오름차순으로 (DBSCAN과 같은 거리)"""
+    return np.sort(k_distances(vectors, k, neighbors, n_probe))
 
-def plot_k_distance(vectors: np.ndarray, k: int, save_path: str):
-    k_distances = compute_k_distance(vectors, k)
+def plot_k_distance(vectors: np.ndarray, k: int, save_path: str, neighbors: str = 'exact', n_probe: Optional[int] = None):
+    k_distances = compute_k_distance(vectors, k, neighbors, n_probe)
+    knee, quantile = knee_distance(k_distances)
     plt.figure(figsize=(10, 5))
     plt.plot(range(1, len(k_distances)+1), k_distances)
+    plt.axhline(knee, color='red', linestyle='--', label=f'knee eps={knee:.4f} ({quantile:.0%})')
+    plt.legend()
     plt.xlabel('Points sorted by distance')
-    plt.ylabel(f'{k}-th Nearest Neighbor Distance')
+    plt.ylabel(f'{k}-th Nearest Neighbor Cosine Distance')
     plt.title(f'k-distance Plot (k={k})')
     plt.grid(True)
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
@@ -162,57 +349,277 @@ def plot_k_distance(vectors: np.ndarray, k: int, save_path: str):
     plt.close()
     console.print(f"[bold green]k-distance plot이 {save_path}에 저장되었습니다.[/bold green]")
 
-def grid_search_dbscan(vectors: np.ndarray, eps_list, min_samples_list) -> tuple:
-    best_score = -1
+class PrecomputedCosine:
+    """grid search의 모든 (eps, min_samples) 조합이 공유하는 최대 eps 희소 이웃 그래프
+
+    DBSCAN(metric='precomputed')은 그래프에서 eps를 넘는 간선을 다시 거르므로 작은 eps도 같은 그래프를 씁니다.
+    품질 지표는 quality_metrics가 클러스터별 벡터 합으로 계산하므로 (n × n) 거리 행렬은 만들지 않습니다.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        max_eps: float,
+        mixed: Optional[MixedTier] = None,
+        neighbors: str = 'exact',
+        n_probe: Optional[int] = None,
+    ):
+        if mixed is not None:
+            self.graph = mixed_tier_graph(vectors, mixed, max_eps, neighbors, n_probe)
+        else:
+            self.graph = radius_neighbors_graph(vectors, max_eps, neighbors, n_probe=n_probe)
+
+    def dbscan(self, eps: float, min_samples: int) -> np.ndarray:
+        return DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed').fit_predict(self.graph)
+
+def grid_search_dbscan(
+    vectors: np.ndarray,
+    eps_list,
+    min_samples_list,
+    mixed: Optional[MixedTier] = None,
+    n_jobs: int = -1,
+    metric: str = 'silhouette',
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    neighbors: str = 'exact',
+    n_probe: Optional[int] = None,
+) -> tuple:
+    """모든 (eps, min_samples) 조합을 실험해 품질 지표(metric)가 가장 높은 조합을 찾습니다.
+
+    코사인 이웃 그래프는 PrecomputedCosine으로 한 번만 만들고, 조합들은 joblib 스레드로 병렬 평가합니다
+    (스레드는 그래프를 복사하지 않고 공유하며, NumPy/DBSCAN 내부 연산은 GIL을 놓음).
+    """
+    from joblib import Parallel, delayed
+
+    started = time.perf_counter()
+    distances = PrecomputedCosine(vectors, max(eps_list), mixed, neighbors, n_probe)
+    prepared_at = time.perf_counter()
+
+    def evaluate_combo(eps, min_samples):
+        labels = distances.dbscan(eps, min_samples)
+        score = score_labels(vectors, labels, metric, sample_size)
+        if score is None:
+            return None
+        n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
+        n_noise = int(np.sum(labels == -1))
+        return score.value, (eps, min_samples, n_clusters, n_noise), labels
+
+    combos = [(eps, min_samples) for eps in eps_list for min_samples in min_samples_list]
+    results = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(evaluate_combo)(eps, min_samples) for eps, min_samples in combos
+    )
+    console.print(
+        f"[cyan]이웃 그래프 계산 {prepared_at - started:.2f}초 (1회), "
+        f"조합 {len(combos)}개 평가 {time.perf_counter() - prepared_at:.2f}초 (지표: {metric})[/cyan]"
+    )
+
+    best_score = -np.inf
     best_params = None
     best_labels = None
-    for eps in eps_list:
-        for min_samples in min_samples_list:
-            clusterer = DBSCAN(eps=eps, min_samples=min_samples, metric='cosine')
-            labels = clusterer.fit_predict(vectors)
-            n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
-            n_noise = list(labels).count(-1)
-            if n_clusters < 2 or n_clusters == len(vectors):
-                continue  # 실루엣 점수 계산 불가
-            try:
-                score = silhouette_score(vectors, labels, metric='cosine')
-            except Exception:
-                score = -1
-            if score > best_score:
-                best_score = score
-                best_params = (eps, min_samples, n_clusters, n_noise)
-                best_labels = labels
+    # 조합 순서대로 비교하므로 병렬 실행이어도 결과가 같음
+    for result in results:
+        if result is None:
+            continue
+        score, params, labels = result
+        if score > best_score:
+            best_score = score
+            best_params = params
+            best_labels = labels
     return best_score, best_params, best_labels
 
+def adaptive_search_dbscan(
+    vectors: np.ndarray,
+    eps_list,
+    min_samples_list,
+    mixed: Optional[MixedTier] = None,
+    n_jobs: int = -1,
+    metric: str = 'silhouette',
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    neighbors: str = 'exact',
+    n_probe: Optional[int] = None,
+    factor: int = DEFAULT_HALVING_FACTOR,
+    min_rows: int = DEFAULT_MIN_SEARCH_ROWS,
+    tolerance: float = DEFAULT_SEARCH_TOLERANCE,
+    save_path: Optional[str] = 'reports/parameter_search.json',
+) -> tuple:
+    """grid_search_dbscan과 같은 후보를 eps 스위프 + successive halving으로 탐색합니다 (반환값 형식도 같음).
+
+    표본 채점으로 후보를 줄이므로 grid search와 다른(근소하게 낮은 점수의) 조합을 고를 수 있습니다.
+
+    이웃 그래프는 grid search처럼 최대 eps로 한 번만 만들고, 실제 DBSCAN은 마지막 단계에 남은 후보만 돌립니다.
+    평가한 모든 점은 save_path에 trace로 저장합니다.
+    """
+    started = time.perf_counter()
+    distances = PrecomputedCosine(vectors, max(eps_list), mixed, neighbors, n_probe)
+    prepared_at = time.perf_counter()
+
+    def score(subset: np.ndarray, labels: np.ndarray) -> Optional[float]:
+        result = score_labels(subset, labels, metric, sample_size)
+        return result.value if result is not None else None
+
+    best, best_labels, trace, sizes = adaptive_search(
+        distances.graph, vectors, eps_list, min_samples_list, score, distances.dbscan, factor, min_rows, n_jobs,
+        tolerance=tolerance,
+    )
+    fits = sum(point.refit for point in trace)
+    n_combos = len(eps_list) * len(min_samples_list)
+    console.print(
+        f"[cyan]이웃 그래프 계산 {prepared_at - started:.2f}초 (1회), 단계별 채점 기사 수 {sizes}, "
+        f"평가 {len(trace)}회 / DBSCAN {fits}회 (grid search는 {n_combos}회), "
+        f"탐색 {time.perf_counter() - prepared_at:.2f}초 (지표: {metric})[/cyan]"
+    )
+
+    table = Table(title=f"적응형 탐색 trace ({len(vectors)}개 벡터, factor={factor})")
+    table.add_column("단계", style="cyan")
+    table.add_column("채점 기사 수", style="cyan")
+    table.add_column("eps")
+    table.add_column("min_samples")
+    table.add_column("클러스터 수")
+    table.add_column("노이즈 수")
+    table.add_column(metric, style="green")
+    table.add_column("다음 단계", style="magenta")
+    for point in trace:
+        table.add_row(
+            str(point.rung),
+            str(point.rows),
+            f"{point.eps:g}",
+            str(point.min_samples),
+            str(point.n_clusters),
+            str(point.n_noise),
+            f"{point.score:.4f}" if point.score is not None else "-",
+            ("최고" if point.refit else "✓") if point.kept else ""
+        )
+    console.print(table)
+
+    if save_path:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        with open(save_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'metric': metric,
+                'eps_list': list(eps_list),
+                'min_samples_list': list(min_samples_list),
+                'factor': factor,
+                'rung_rows': sizes,
+                'evaluations': len(trace),
+                'dbscan_fits': fits,
+                'grid_fits': n_combos,
+                'best': asdict(best) if best is not None else None,
+                'trace': [asdict(point) for point in trace],
+            }, f, ensure_ascii=False, indent=2)
+        console.print(f"[bold green]탐색 trace가 {save_path}에 저장되었습니다.[/bold green]")
+
+    if best is None:
+        return -np.inf, None, None
+    return best.score, (best.eps, best.min_samples, best.n_clusters, best.n_noise), best_labels
+
 def main():
     parser = argparse.ArgumentParser(description="기사 클러스터링")
     parser.add_argument('--eps', type=float, default=0.15, help='DBSCAN eps')
     parser.add_argument('--min_samples', type=int, default=5, help='DBSCAN min_samples')
     parser.add_argument('--grid-search', action='store_true', help='여러 파라미터 조합 실험')
+    parser.add_argument('--search', type=str, choices=SUPPORTED_SEARCH_METHODS, default=DEFAULT_SEARCH_METHOD, help='--grid-search 탐색 방식 (grid: 모든 조합 | adaptive: eps 스위프 + successive halving, 더 빠르지만 grid와 결과가 다를 수 있음)')
+    parser.add_argument('--search-report', action='store_true', help='grid search와 적응형 탐색의 시간/최적 파라미터 비교 리포트 저장')
     parser.add_argument('--k', type=int, default=5, help='k-distance plot용 k')
     parser.add_argument('--plot-k-distance', action='store_true', help='k-distance plot 저장')
-    parser.add_argument('--embeddings', type=str, default='article_embeddings.json', help='임베딩 파일 경로')
+    parser.add_argument('--quantization-report', action='store_true', help='float32/float16/int8 클러스터링 결과 비교 리포트 저장')
+    parser.add_argument('--embeddings', type=str, default=DEFAULT_STORE_PATH, help='임베딩 파일 경로 (.npy 저장소 또는 .json)')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='grid search 병렬 스레드 수 (-1: 모든 코어)')
+    parser.add_argument('--metric', type=str, choices=QUALITY_METRICS, default='silhouette', help='클러스터 품질 지표')
+    parser.add_argument('--sample-size', type=int, default=DEFAULT_SAMPLE_SIZE, help='silhouette-sampled 표본 크기')
+    parser.add_argument('--neighbors', type=str, choices=SUPPORTED_NEIGHBOR_METHODS, default=DEFAULT_NEIGHBOR_METHOD, help='eps 이웃 탐색 방식 (exact | ivf 근사)')
+    parser.add_argument('--n-probe', type=int, default=DEFAULT_N_PROBE, help='ivf에서 점마다 탐색할 리스트 수')
+    parser.add_argument('--ann-report', action='store_true', help='정확한 이웃 그래프와 IVF 근사 그래프의 속도/재현율 비교 리포트 저장')
+    parser.add_argument('--shard', action='store_true', default=DEFAULT_SHARD, help='published_at 시간 창별로 나눠 병렬 클러스터링')
+    parser.add_argument('--window-hours', type=float, default=DEFAULT_WINDOW_HOURS, help='분할 클러스터링 시간 창 (시간)')
+    parser.add_argument('--overlap-hours', type=float, default=DEFAULT_OVERLAP_HOURS, help='인접 창과 겹치는 시간 (시간)')
+    parser.add_argument('--by-category', action='store_true', default=DEFAULT_BY_CATEGORY, help='분할 클러스터링에서 category별로도 나눔')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='분할 클러스터링 프로세스 수')
+    parser.add_argument('--engine', type=str, choices=SUPPORTED_ENGINES, default=DEFAULT_ENGINE, help='클러스터링 엔진')
+    parser.add_argument('--knn-k', type=int, default=DEFAULT_KNN_K, help='knn/leiden 엔진의 이웃 수 k')
+    parser.add_argument('--resolution', type=float, default=DEFAULT_LEIDEN_RESOLUTION, help='leiden 엔진의 해상도')
+    parser.add_argument('--benchmark-engines', nargs='*', choices=SUPPORTED_ENGINES, help='엔진별 시간/메모리/품질 비교 리포트 저장 (엔진을 생략하면 쓸 수 있는 엔진 모두)')
+    parser.add_argument('--reducer', type=str, choices=SUPPORTED_REDUCERS, default=DEFAULT_REDUCER, help='클러스터링 전 차원 축소 (none | pca | random)')
+    parser.add_argument('--reduced-dim', type=int, default=DEFAULT_REDUCED_DIM, help='축소 차원')
+    parser.add_argument('--reduction-report', action='store_true', help='원래 차원과 pca/random 64·128·256차원의 속도/결과 비교 리포트 저장')
+    parser.add_argument('--auto-eps', action='store_true', default=DEFAULT_AUTO_EPS, help='eps를 k(=min_samples)-distance 곡선의 무릎으로 자동 추정 (grid search 없이 한 번만 클러스터링)')
+    parser.add_argument('--kernel-report', action='store_true', help='유사도 커널의 메모리 상한/작업자 수별 시간과 최대 메모리 비교 리포트 저장')
+    parser.add_argument('--shard-report', action='store_true', help='단일 DBSCAN과 분할 클러스터링 결과 비교 리포트 저장')
     args = parser.parse_args()
 
-    clusterer = ArticleClusterer(eps=args.eps, min_samples=args.min_samples)
-    embeddings_data = clusterer.load_embeddings(args.embeddings)
-    if not embeddings_data:
+    try:
+        clusterer = ArticleClusterer(
+            eps=args.eps, min_samples=args.min_samples, neighbors=args.neighbors, n_probe=args.n_probe,
+            shard=args.shard, window_hours=args.window_hours, overlap_hours=args.overlap_hours,
+            by_category=args.by_category, workers=args.workers,
+            engine=args.engine, knn_k=args.knn_k, resolution=args.resolution,
+            reducer=args.reducer, reduced_dim=args.reduced_dim, auto_eps=args.auto_eps
+        )
+    except ImportError as e:
+        console.print(f"[bold red]{e}[/bold red]")
         return
-    vectors, article_ids = clusterer.prepare_vectors(embeddings_data)
-    if len(vectors) == 0:
+    matrix = clusterer.load_vectors(args.embeddings)
+    if matrix is None:
         return
 
+    if args.reduction_report:
+        reduction_report(clusterer, matrix, 'reports/reduction_report.json')
+        return
+
+    matrix = clusterer.reduce_dimensions(matrix)
+    vectors = matrix.vectors
+
     if args.plot_k_distance:
-        plot_k_distance(vectors, args.k, 'reports/k_distance.png')
+        plot_k_distance(vectors, args.k, 'reports/k_distance.png', args.neighbors, args.n_probe)
+        return
+
+    if args.auto_eps and not (args.grid_search or args.search_report):
+        estimate = clusterer.auto_select_eps(matrix)
+        if estimate is not None:
+            args.eps = estimate.eps
+
+    if args.quantization_report:
+        quantization_report(
+            vectors, args.eps, args.min_samples, 'reports/quantization_report.json', clusterer.source_dtype
+        )
+        return
+
+    if args.ann_report:
+        ann_report(vectors, args.eps, args.min_samples, 'reports/ann_report.json')
+        return
+
+    if args.kernel_report:
+        kernel_report(vectors, args.eps, args.min_samples, 'reports/kernel_report.json')
+        return
+
+    if args.benchmark_engines is not None:
+        engine_benchmark(
+            matrix, args.eps, args.min_samples, 'reports/engine_benchmark.json', args.benchmark_engines,
+            args.neighbors, args.n_probe, args.knn_k, args.resolution, clusterer.mixed_tier, args.metric, args.sample_size
+        )
+        return
+
+    if args.shard_report:
+        shard_report(clusterer, matrix, 'reports/shard_report.json')
+        return
+
+    eps_list = [0.10, 0.15, 0.20, 0.25]
+    min_samples_list = [3, 5, 7]
+    if args.search_report:
+        search_report(
+            vectors, {'grid': grid_search_dbscan, 'adaptive': adaptive_search_dbscan}, eps_list, min_samples_list,
+            'reports/search_report.json', clusterer.mixed_tier, args.n_jobs, args.metric, args.sample_size,
+            args.neighbors, args.n_probe
+        )
         return
 
     if args.grid_search:
-        eps_list = [0.10, 0.15, 0.20, 0.25]
-        min_samples_list = [3, 5, 7]
-        best_score, best_params, best_labels = grid_search_dbscan(vectors, eps_list, min_samples_list)
+        search = adaptive_search_dbscan if args.search == 'adaptive' else grid_search_dbscan
+        best_score, best_params, best_labels = search(
+            vectors, eps_list, min_samples_list, clusterer.mixed_tier, args.n_jobs, args.metric, args.sample_size,
+            args.neighbors, args.n_probe
+        )
         if best_params:
             eps, min_samples, n_clusters, n_noise = best_params
-            console.print(f"[bold green]최고 실루엣 점수: {best_score:.4f}")
+            console.print(f"[bold green]최고 {args.metric} 점수: {best_score:.4f}")
             console.print(f"[bold green]최적 파라미터: eps={eps}, min_samples={min_samples}")
             console.print(f"[cyan]클러스터 수: {n_clusters}, 노이즈 수: {n_noise}[/cyan]")
         else:
@@ -220,21 +627,18 @@ def main():
         return
 
     # 일반 클러스터링 실행
-    cluster_labels = clusterer.perform_clustering(vectors)
+    cluster_labels = clusterer.perform_clustering(matrix)
     if len(cluster_labels) == 0:
         return
     n_clusters = len(set(cluster_labels)) - (1 if -1 in cluster_labels else 0)
     n_noise = list(cluster_labels).count(-1)
-    if n_clusters > 1:
-        try:
-            sil_score = silhouette_score(vectors, cluster_labels, metric='cosine')
-        except Exception:
-            sil_score = -1
+    score = score_labels(vectors, cluster_labels, args.metric, args.sample_size)
+    if score is not None:
+        console.print(f"[bold green]품질 지표: {score} ({score.seconds:.2f}초)")
     else:
-        sil_score = -1
-    console.print(f"[bold green]실루엣 점수: {sil_score:.4f}")
+        console.print(f"[yellow]클러스터가 2개 미만이라 {args.metric} 점수를 계산할 수 없습니다.[/yellow]")
     console.print(f"[cyan]클러스터 수: {n_clusters}, 노이즈 비율: {n_noise/len(vectors):.2%}[/cyan]")
-    cluster_results = clusterer.create_cluster_results(embeddings_data, cluster_labels, article_ids)
+    cluster_results = clusterer.create_cluster_results(matrix, cluster_labels)
     clusterer.analyze_clusters(cluster_results)
     clusterer.save_cluster_results(cluster_results)
     console.print("[bold green]=== 클러스터링 완료 ===[/bold green]")
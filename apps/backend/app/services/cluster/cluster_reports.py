@@ -0,0 +1,451 @@
+"""
+클러스터링 비교 리포트 (cluster_articles.py의 --*-report / --benchmark-engines)
+
+리포트마다 설정을 바꿔 가며 같은 기사를 클러스터링하고, 결과 행을 rich 표로 출력한 뒤 reports/*.json에 저장합니다.
+표 출력과 저장은 save_report 하나로 합니다.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from sklearn.cluster import DBSCAN
+from sklearn.metrics import adjusted_rand_score
+
+from app.services.cluster.clustering_engines import (
+    DEFAULT_KNN_K,
+    DEFAULT_LEIDEN_RESOLUTION,
+    available_engines,
+    make_engine,
+    run_dbscan,
+)
+from app.services.cluster.dimension_reduction import EmbeddingReducer
+from app.services.cluster.embedding_matrix import EmbeddingMatrix
+from app.services.cluster.embedding_quantization import QUANTIZED_DTYPES, nbytes, quantize, unit_rows
+from app.services.cluster.neighbor_index import IVFIndex, edge_recall
+from app.services.cluster.quality_metrics import DEFAULT_SAMPLE_SIZE, chunked_silhouette, score_labels
+from app.services.cluster.similarity_kernel import SimilarityKernel, cosine_radius_graph
+from app.services.cluster.two_tier import MixedTier
+
+if TYPE_CHECKING:
+    from app.services.cluster.cluster_articles import ArticleClusterer
+
+console = Console()
+
+# (열 이름, rich 스타일, 행 → 칸 문자열)
+Column = Tuple[str, Optional[str], Callable[[Dict[str, Any]], str]]
+
+
+def save_report(
+    title: str,
+    columns: Sequence[Column],
+    rows: List[Dict[str, Any]],
+    save_path: str,
+    name: str,
+    **fields: Any,
+) -> Dict[str, Any]:
+    """rows를 표로 출력하고 {**fields, 'results': rows}를 save_path에 저장합니다. 저장한 리포트를 반환합니다."""
+    table = Table(title=title)
+    for header, style, _ in columns:
+        table.add_column(header, style=style)
+    for row in rows:
+        table.add_row(*(cell(row) for _, _, cell in columns))
+    console.print(table)
+
+    report = {**fields, 'results': rows}
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    with open(save_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    console.print(f"[bold green]{name} 리포트가 {save_path}에 저장되었습니다.[/bold green]")
+    return report
+
+
+def label_counts(labels: np.ndarray) -> Dict[str, int]:
+    return {
+        'n_clusters': len(set(labels)) - (1 if -1 in labels else 0),
+        'n_noise': int((labels == -1).sum()),
+    }
+
+
+def timed(function: Callable, *args) -> Tuple[Any, float]:
+    """(function(*args), 걸린 초)"""
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def _fixed(key: str, digits: int = 3) -> Callable[[Dict[str, Any]], str]:
+    return lambda row: f"{row[key]:.{digits}f}" if row[key] is not None else "-"
+
+
+def _text(key: str) -> Callable[[Dict[str, Any]], str]:
+    return lambda row: str(row[key]) if row[key] is not None else "-"
+
+
+def quantization_report(
+    vectors: np.ndarray, eps: float, min_samples: int, save_path: str, source_dtype: str = 'float32'
+) -> List[Dict[str, Any]]:
+    """float32 기준 DBSCAN 결과와 float16/int8 양자화 결과를 비교합니다.
+
+    ARI는 기준 라벨과의 일치도(1.0 = 동일), 실루엣은 원래(float32) 벡터 공간에서 각 라벨을 평가한 값입니다.
+    """
+    # int8 코드는 벡터별 scale만 다르므로 코드를 정규화한 단위벡터의 코사인 거리는 복원값과 같음
+    reference = unit_rows(vectors)
+    if source_dtype != 'float32':
+        console.print(f"[yellow]⚠️  저장된 벡터가 {source_dtype}이므로 이를 기준(float32)으로 비교합니다.[/yellow]")
+
+    rows = []
+    reference_labels = None
+    for dtype in ("float32",) + QUANTIZED_DTYPES:
+        quantized, scales = quantize(reference, dtype)
+        labels, elapsed = timed(run_dbscan, quantized, eps, min_samples)
+        if reference_labels is None:
+            reference_labels = labels
+        counts = label_counts(labels)
+        try:
+            score = chunked_silhouette(reference, labels) if counts['n_clusters'] > 1 else -1
+        except Exception:
+            score = -1
+        rows.append({
+            'dtype': dtype,
+            'bytes': nbytes(quantized, scales),
+            'seconds': round(elapsed, 4),
+            **counts,
+            'ari': float(adjusted_rand_score(reference_labels, labels)),
+            'silhouette': float(score),
+        })
+
+    save_report(
+        f"양자화 비교 (eps={eps}, min_samples={min_samples}, {len(vectors)}개 벡터)",
+        [
+            ("dtype", "cyan", _text('dtype')),
+            ("메모리(MB)", "magenta", lambda row: f"{row['bytes'] / 1024 / 1024:.2f}"),
+            ("DBSCAN(초)", "magenta", _fixed('seconds')),
+            ("클러스터 수", None, _text('n_clusters')),
+            ("노이즈 수", None, _text('n_noise')),
+            ("ARI", "green", _fixed('ari', 4)),
+            ("실루엣", "green", _fixed('silhouette', 4)),
+        ],
+        rows, save_path, "양자화 비교", eps=eps, min_samples=min_samples,
+    )
+    return rows
+
+
+def ann_report(
+    vectors: np.ndarray,
+    eps: float,
+    min_samples: int,
+    save_path: str,
+    probes=(1, 2, 4, 8, 16),
+) -> List[Dict[str, Any]]:
+    """정확한 eps 이웃 그래프와 IVF 근사 그래프(n_probe별)의 속도/재현율을 비교합니다.
+
+    재현율은 정확한 그래프의 간선 중 근사 그래프가 찾은 비율, ARI는 정확한 그래프로 돌린 DBSCAN 라벨과의 일치도입니다.
+    """
+    exact, exact_seconds = timed(cosine_radius_graph, vectors, eps)
+    exact_labels = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed').fit_predict(exact)
+    rows = [{
+        'method': 'exact',
+        'n_probe': None,
+        'build_seconds': 0.0,
+        'seconds': round(exact_seconds, 4),
+        'edges': int(exact.nnz),
+        'recall': 1.0,
+        'n_clusters': label_counts(exact_labels)['n_clusters'],
+        'ari': 1.0,
+    }]
+
+    index = IVFIndex(vectors)
+    for n_probe in probes:
+        if n_probe > index.n_lists:
+            break
+        graph, elapsed = timed(index.radius_graph, eps, n_probe)
+        labels = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed').fit_predict(graph)
+        rows.append({
+            'method': 'ivf',
+            'n_probe': n_probe,
+            'build_seconds': round(index.build_seconds, 4),
+            'seconds': round(elapsed, 4),
+            'edges': int(graph.nnz),
+            'recall': edge_recall(graph, exact),
+            'n_clusters': label_counts(labels)['n_clusters'],
+            'ari': float(adjusted_rand_score(exact_labels, labels)),
+        })
+
+    save_report(
+        f"이웃 탐색 비교 (eps={eps}, min_samples={min_samples}, {len(vectors)}개 벡터, 리스트 {index.n_lists}개)",
+        [
+            ("방식", "cyan", _text('method')),
+            ("n_probe", "cyan", _text('n_probe')),
+            ("인덱스(초)", "magenta", _fixed('build_seconds')),
+            ("그래프(초)", "magenta", _fixed('seconds')),
+            ("간선 수", None, _text('edges')),
+            ("클러스터 수", None, _text('n_clusters')),
+            ("재현율", "green", _fixed('recall', 4)),
+            ("ARI", "green", _fixed('ari', 4)),
+        ],
+        rows, save_path, "이웃 탐색 비교", eps=eps, min_samples=min_samples, n_lists=index.n_lists,
+    )
+    return rows
+
+
+def kernel_report(
+    vectors: np.ndarray,
+    eps: float,
+    min_samples: int,
+    save_path: str,
+    memory_limits=(32, 128, 512),
+    workers=(1, 2, 4),
+) -> List[Dict[str, Any]]:
+    """유사도 커널의 메모리 상한/작업자 수별 eps 그래프와 k-distance(top_k) 시간과 최대 메모리를 비교합니다.
+
+    예상 메모리는 커널의 바이트 계산(last_stats), 실측 메모리는 tracemalloc 최고치입니다 (입력 행렬 제외).
+    """
+    rows = []
+    for memory_mb in memory_limits:
+        for n_workers in workers:
+            kernel = SimilarityKernel(memory_mb, n_workers)
+            for operation in ('radius_graph', 'top_k'):
+                tracemalloc.start()
+                if operation == 'radius_graph':
+                    result = kernel.radius_graph(vectors, eps).nnz
+                else:
+                    result = float(kernel.top_k(vectors, min_samples, return_indices=False)[0][:, -1].mean())
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                stats = kernel.last_stats
+                rows.append({
+                    'operation': operation,
+                    'memory_mb': memory_mb,
+                    'workers': n_workers,
+                    'block': [stats.block_rows, stats.block_cols],
+                    'seconds': round(stats.seconds, 4),
+                    'estimated_peak_mb': round(stats.peak_bytes / 1024 / 1024, 2),
+                    'traced_peak_mb': round(peak / 1024 / 1024, 2),
+                    # 설정이 달라도 같아야 하는 값 (간선 수 / 평균 k-distance)
+                    'result': result,
+                })
+
+    save_report(
+        f"유사도 커널 비교 (eps={eps}, k={min_samples}, {len(vectors)}개 벡터)",
+        [
+            ("연산", "cyan", _text('operation')),
+            ("상한(MB)", "cyan", lambda row: f"{row['memory_mb']:g}"),
+            ("작업자", "cyan", _text('workers')),
+            ("블록", None, lambda row: f"{row['block'][0]}×{row['block'][1]}"),
+            ("시간(초)", "magenta", _fixed('seconds')),
+            ("예상 메모리(MB)", "magenta", _fixed('estimated_peak_mb', 1)),
+            ("실측 메모리(MB)", "magenta", _fixed('traced_peak_mb', 1)),
+            ("간선 수 / 평균 k-distance", "green",
+             lambda row: str(row['result']) if row['operation'] == 'radius_graph' else f"{row['result']:.4f}"),
+        ],
+        rows, save_path, "유사도 커널 비교", eps=eps, min_samples=min_samples, n=len(vectors),
+    )
+    return rows
+
+
+def shard_report(clusterer: 'ArticleClusterer', matrix: EmbeddingMatrix, save_path: str) -> Dict[str, Any]:
+    """단일 DBSCAN과 분할 클러스터링의 시간/클러스터 수/ARI를 비교합니다."""
+    single, single_seconds = timed(clusterer.engine.fit_predict, matrix.vectors, clusterer.mixed_tier)
+    sharded, sharded_seconds = timed(clusterer.cluster_shards, matrix)
+    rows = [
+        {'method': 'single', 'seconds': round(single_seconds, 4), **label_counts(single)},
+        {'method': 'sharded', 'seconds': round(sharded_seconds, 4), **label_counts(sharded)},
+    ]
+    ari = float(adjusted_rand_score(single, sharded))
+    changed = int(((single == -1) != (sharded == -1)).sum())
+
+    report = save_report(
+        f"분할 클러스터링 비교 ({len(matrix)}개 벡터)",
+        [
+            ("방식", "cyan", lambda row: "단일" if row['method'] == 'single' else "분할"),
+            ("시간(초)", "magenta", _fixed('seconds')),
+            ("클러스터 수", None, _text('n_clusters')),
+            ("노이즈 수", None, _text('n_noise')),
+        ],
+        rows, save_path, "분할 클러스터링 비교",
+        eps=clusterer.eps,
+        min_samples=clusterer.min_samples,
+        window_hours=clusterer.window_hours,
+        overlap_hours=clusterer.overlap_hours,
+        by_category=clusterer.by_category,
+        workers=clusterer.workers,
+        n=len(matrix),
+        ari=ari,
+        changed_articles=changed,
+    )
+    console.print(f"[green]ARI {ari:.4f}, 노이즈 여부가 바뀐 기사 {changed}개[/green]")
+    return report
+
+
+def engine_benchmark(
+    matrix: EmbeddingMatrix,
+    eps: float,
+    min_samples: int,
+    save_path: str,
+    engines: Optional[List[str]] = None,
+    neighbors: str = 'exact',
+    n_probe: Optional[int] = None,
+    knn_k: int = DEFAULT_KNN_K,
+    resolution: float = DEFAULT_LEIDEN_RESOLUTION,
+    mixed: Optional[MixedTier] = None,
+    metric: str = 'silhouette',
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+) -> List[Dict[str, Any]]:
+    """같은 임베딩 파일에서 엔진별 실행 시간, 최대 메모리(tracemalloc), 품질 지표를 비교합니다.
+
+    최대 메모리는 클러스터링 중 새로 할당된 파이썬/NumPy 메모리의 최고치입니다 (입력 행렬 제외).
+    ARI는 첫 번째 엔진 결과와의 일치도입니다.
+    """
+    engines = engines or available_engines()
+    rows = []
+    reference_labels = None
+    for name in engines:
+        try:
+            engine = make_engine(name, eps, min_samples, neighbors, n_probe, knn_k, resolution)
+        except ImportError as e:
+            console.print(f"[yellow]⚠️  {name} 엔진을 건너뜁니다: {e}[/yellow]")
+            continue
+        tracemalloc.start()
+        labels, elapsed = timed(engine.fit_predict, matrix.vectors, mixed)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if reference_labels is None:
+            reference_labels = labels
+        score = score_labels(matrix.vectors, labels, metric, sample_size)
+        rows.append({
+            'engine': name,
+            'params': engine.describe(),
+            'seconds': round(elapsed, 4),
+            'peak_mb': round(peak / 1024 / 1024, 2),
+            **label_counts(labels),
+            'metric': metric,
+            'score': score.value if score is not None else None,
+            'ari': float(adjusted_rand_score(reference_labels, labels)),
+        })
+
+    save_report(
+        f"클러스터링 엔진 비교 ({len(matrix)}개 벡터, 이웃 탐색={neighbors})",
+        [
+            ("엔진", "cyan", _text('engine')),
+            ("파라미터", None, _text('params')),
+            ("시간(초)", "magenta", _fixed('seconds')),
+            ("최대 메모리(MB)", "magenta", _fixed('peak_mb', 1)),
+            ("클러스터 수", None, _text('n_clusters')),
+            ("노이즈 수", None, _text('n_noise')),
+            (metric, "green", _fixed('score', 4)),
+            (f"ARI ({rows[0]['engine'] if rows else '-'} 기준)", "green", _fixed('ari', 4)),
+        ],
+        rows, save_path, "엔진 비교", eps=eps, min_samples=min_samples, n=len(matrix),
+    )
+    return rows
+
+
+def reduction_report(
+    clusterer: 'ArticleClusterer',
+    matrix: EmbeddingMatrix,
+    save_path: str,
+    methods: Sequence[str] = ('pca', 'random'),
+    dims: Sequence[int] = (64, 128, 256),
+) -> List[Dict[str, Any]]:
+    """원래 차원과 축소 차원(방식 × 차원)의 클러스터링 시간과 결과 차이를 비교합니다.
+
+    축소기는 이 행렬로 새로 학습하고 파일로 저장하지 않습니다. 속도 향상은 클러스터링 시간끼리의 비이고,
+    축소 시간(학습 + 투영)은 따로 적습니다.
+    """
+    full_labels, full_seconds = timed(clusterer.engine.fit_predict, matrix.vectors, clusterer.mixed_tier)
+    rows = [{'method': 'none', 'dim': matrix.dim, 'reduce_seconds': 0.0, 'cluster_seconds': round(full_seconds, 4),
+             'speedup': 1.0, 'explained': None, 'ari': 1.0, 'noise_changed': 0, **label_counts(full_labels)}]
+    for method in methods:
+        for dim in dims:
+            if dim >= matrix.dim:
+                continue
+            reducer = EmbeddingReducer(method, dim, path=None)
+            started = time.perf_counter()
+            reducer.update(matrix.vectors, matrix.ids, clusterer.source_model)
+            if not reducer.fitted:
+                continue
+            vectors = reducer.transform(matrix.vectors)
+            mixed = clusterer.mixed_tier
+            if mixed is not None:
+                mixed = MixedTier(mixed.full_rows, reducer.transform(mixed.title_vectors))
+            reduce_seconds = time.perf_counter() - started
+            labels, cluster_seconds = timed(clusterer.engine.fit_predict, vectors, mixed)
+            rows.append({
+                'method': method,
+                'dim': dim,
+                'reduce_seconds': round(reduce_seconds, 4),
+                'cluster_seconds': round(cluster_seconds, 4),
+                'speedup': round(full_seconds / max(cluster_seconds, 1e-9), 2),
+                'explained': reducer.explained,
+                'ari': float(adjusted_rand_score(full_labels, labels)),
+                'noise_changed': int(((labels == -1) != (full_labels == -1)).sum()),
+                **label_counts(labels),
+            })
+
+    save_report(
+        f"차원 축소 비교 ({len(matrix)}개 벡터, 엔진 {clusterer.engine.name}, {clusterer.engine.describe()})",
+        [
+            ("방식", "cyan", _text('method')),
+            ("차원", "cyan", _text('dim')),
+            ("축소(초)", "magenta", _fixed('reduce_seconds')),
+            ("클러스터링(초)", "magenta", _fixed('cluster_seconds')),
+            ("속도 향상", "magenta", lambda row: f"{row['speedup']:.2f}x"),
+            ("설명 비율", None, lambda row: f"{row['explained']:.1%}" if row['explained'] is not None else "-"),
+            ("클러스터 수", None, _text('n_clusters')),
+            ("노이즈 수", None, _text('n_noise')),
+            ("ARI (원래 차원 기준)", "green", _fixed('ari', 4)),
+            ("노이즈 여부 변경", "green", _text('noise_changed')),
+        ],
+        rows, save_path, "차원 축소",
+        eps=clusterer.eps, min_samples=clusterer.min_samples, engine=clusterer.engine.name, n=len(matrix),
+    )
+    return rows
+
+
+def search_report(
+    vectors: np.ndarray,
+    searches: Dict[str, Callable],
+    eps_list,
+    min_samples_list,
+    save_path: str,
+    mixed: Optional[MixedTier] = None,
+    n_jobs: int = -1,
+    metric: str = 'silhouette',
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    neighbors: str = 'exact',
+    n_probe: Optional[int] = None,
+) -> Dict[str, Any]:
+    """같은 후보로 탐색 방식(이름 → grid_search_dbscan과 같은 형식의 함수)별 시간과 최적 파라미터를 비교합니다."""
+    rows = []
+    for method, search in searches.items():
+        (best_score, best_params, _), seconds = timed(
+            search, vectors, eps_list, min_samples_list, mixed, n_jobs, metric, sample_size, neighbors, n_probe
+        )
+        rows.append({
+            'method': method,
+            'seconds': round(seconds, 4),
+            'score': float(best_score) if best_params else None,
+            'eps': best_params[0] if best_params else None,
+            'min_samples': best_params[1] if best_params else None,
+        })
+    same = len({(row['eps'], row['min_samples']) for row in rows}) == 1
+
+    report = save_report(
+        f"파라미터 탐색 비교 ({len(vectors)}개 벡터, 조합 {len(eps_list) * len(min_samples_list)}개)",
+        [
+            ("방식", "cyan", _text('method')),
+            ("시간(초)", "magenta", _fixed('seconds')),
+            ("eps", None, lambda row: f"{row['eps']:g}" if row['eps'] is not None else "-"),
+            ("min_samples", None, _text('min_samples')),
+            (metric, "green", _fixed('score', 4)),
+        ],
+        rows, save_path, "파라미터 탐색 비교", metric=metric, n=len(vectors), same_best=same,
+    )
+    console.print(f"[green]최적 파라미터 일치: {'예' if same else '아니오'}[/green]")
+    return report
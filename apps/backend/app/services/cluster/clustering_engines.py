@@ -0,0 +1,253 @@
+"""
+클러스터링 엔진
+
+ArticleClusterer는 엔진 이름(--engine)으로 아래 구현 중 하나를 골라 씁니다. 모든 엔진은 정규화된 벡터(와 2단계
+임베딩이면 MixedTier)를 받아 기사별 라벨(노이즈 -1)을 돌려주고, 분할 클러스터링용으로 핵심점 마스크도 줍니다.
+
+  dbscan   전역 eps 반경 DBSCAN (exact | ivf 이웃 그래프)
+  hdbscan  밀도 계층 기반 HDBSCAN (sklearn). eps 없이 min_samples만으로 밀도가 다른 클러스터를 찾음
+  knn      eps 안의 상호(mutual) k-최근접 이웃 그래프의 연결 요소. 이웃 그래프 한 번과 연결 요소 계산뿐이라 가장 빠름
+  leiden   같은 k-최근접 이웃 그래프(유사도 가중)에서 Leiden 커뮤니티 탐지 (igraph, leidenalg 설치 시)
+
+kNN/Leiden 그래프는 eps 반경 그래프에서 행마다 가까운 k개만 남겨 만들므로 neighbor_index의 IVF 근사도 그대로 씁니다.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import DBSCAN
+
+from app.services.cluster.embedding_quantization import unit_rows
+from app.services.cluster.neighbor_index import radius_neighbors_graph
+from app.services.cluster.two_tier import MixedTier, mixed_tier_graph
+
+try:
+    import igraph
+    import leidenalg
+except ImportError:  # pragma: no cover - 선택 의존성
+    igraph = None
+    leidenalg = None
+
+SUPPORTED_ENGINES = ("dbscan", "hdbscan", "knn", "leiden")
+DEFAULT_ENGINE = os.getenv("CLUSTER_ENGINE", "dbscan")
+DEFAULT_KNN_K = int(os.getenv("CLUSTER_KNN_K", "10"))
+DEFAULT_LEIDEN_RESOLUTION = float(os.getenv("CLUSTER_LEIDEN_RESOLUTION", "1.0"))
+
+
+def fit_dbscan(
+    vectors: np.ndarray,
+    eps: float,
+    min_samples: int,
+    mixed: Optional[MixedTier] = None,
+    neighbors: str = 'exact',
+    n_probe: Optional[int] = None,
+) -> DBSCAN:
+    """코사인 DBSCAN. eps 이웃 그래프를 먼저 만들어 DBSCAN(metric='precomputed')에 넣습니다.
+
+    exact는 similarity_kernel이 메모리 상한 안에서 블록 단위로(float16/int8도 그대로) 그래프를 만들고,
+    neighbors='ivf'면 IVF 근사 이웃 그래프를 씁니다. mixed가 있으면(2단계 임베딩) 본문-본문 쌍은
+    본문 벡터로, 나머지 쌍은 제목 벡터로 거리를 잽니다.
+    """
+    if mixed is not None:
+        graph = mixed_tier_graph(vectors, mixed, eps, neighbors, n_probe)
+    else:
+        graph = radius_neighbors_graph(vectors, eps, neighbors, n_probe=n_probe)
+    return DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed').fit(graph)
+
+
+def run_dbscan(
+    vectors: np.ndarray,
+    eps: float,
+    min_samples: int,
+    mixed: Optional[MixedTier] = None,
+    neighbors: str = 'exact',
+    n_probe: Optional[int] = None,
+) -> np.ndarray:
+    """fit_dbscan의 클러스터 라벨"""
+    return fit_dbscan(vectors, eps, min_samples, mixed, neighbors, n_probe).labels_
+
+
+def knn_graph(graph: sparse.csr_matrix, k: int, mutual: bool = True) -> sparse.csr_matrix:
+    """eps 반경 거리 그래프에서 행마다 거리가 가장 가까운 k개 간선만 남깁니다 (자기 자신 제외).
+
+    mutual이면 양쪽 모두의 k개 안에 드는 간선만, 아니면 어느 한쪽이라도 고른 간선을 남깁니다 (대칭 행렬).
+    """
+    coo = graph.tocoo()
+    others = coo.row != coo.col
+    rows, cols, data = coo.row[others], coo.col[others], coo.data[others]
+    # (행, 거리) 순으로 정렬한 뒤 행 안에서의 순위로 자름
+    order = np.lexsort((cols, data, rows))
+    rows, cols, data = rows[order], cols[order], data[order]
+    starts = np.searchsorted(rows, np.arange(graph.shape[0]))
+    rank = np.arange(len(rows)) - starts[rows]
+    keep = rank < k
+    # 0 거리(중복 기사)도 간선으로 남도록 거리 대신 유사도를 저장 (유사도 0 이하는 eps 밖이라 없음)
+    similarity = np.maximum(1.0 - data[keep], 1e-6).astype(np.float32)
+    chosen = sparse.csr_matrix((similarity, (rows[keep], cols[keep])), shape=graph.shape)
+    if mutual:
+        return chosen.minimum(chosen.T).tocsr()
+    return chosen.maximum(chosen.T).tocsr()
+
+
+def labels_from_groups(groups: np.ndarray, min_size: int) -> np.ndarray:
+    """그룹 번호를 클러스터 라벨로 바꿉니다. min_size보다 작은 그룹은 노이즈(-1), 라벨은 첫 행 순서로 0부터."""
+    _, first, inverse, counts = np.unique(groups, return_index=True, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    valid = counts >= min_size
+    relabel = np.full(len(first), -1, dtype=np.int64)
+    kept = np.flatnonzero(valid)
+    relabel[kept[np.argsort(first[kept], kind="stable")]] = np.arange(len(kept))
+    return relabel[inverse]
+
+
+class ClusteringEngine(ABC):
+    """벡터 → 라벨 (노이즈 -1)"""
+
+    name = ""
+
+    def __init__(
+        self,
+        eps: float,
+        min_samples: int,
+        neighbors: str = 'exact',
+        n_probe: Optional[int] = None,
+    ):
+        self.eps = eps
+        self.min_samples = min_samples
+        self.neighbors = neighbors
+        self.n_probe = n_probe
+
+    @abstractmethod
+    def fit(self, vectors: np.ndarray, mixed: Optional[MixedTier] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(라벨, 핵심점 마스크). 핵심점은 분할 클러스터링에서 겹친 구간의 클러스터를 합칠 근거가 되는 기사입니다."""
+
+    def fit_predict(self, vectors: np.ndarray, mixed: Optional[MixedTier] = None) -> np.ndarray:
+        return self.fit(vectors, mixed)[0]
+
+    def describe(self) -> str:
+        return f"eps={self.eps}, min_samples={self.min_samples}"
+
+    def radius_graph(self, vectors: np.ndarray, mixed: Optional[MixedTier]) -> sparse.csr_matrix:
+        if mixed is not None:
+            return mixed_tier_graph(vectors, mixed, self.eps, self.neighbors, self.n_probe)
+        return radius_neighbors_graph(vectors, self.eps, self.neighbors, n_probe=self.n_probe)
+
+
+class DBSCANEngine(ClusteringEngine):
+    name = "dbscan"
+
+    def fit(self, vectors, mixed=None):
+        model = fit_dbscan(vectors, self.eps, self.min_samples, mixed, self.neighbors, self.n_probe)
+        core = np.zeros(len(vectors), dtype=bool)
+        core[model.core_sample_indices_] = True
+        return model.labels_, core
+
+
+class HDBSCANEngine(ClusteringEngine):
+    """sklearn HDBSCAN. 단위벡터의 유클리드 거리는 √(2 × 코사인 거리)로 순서가 같으므로 유클리드로 계산합니다.
+
+    eps는 쓰지 않고 min_samples를 최소 클러스터 크기로도 씁니다. 2단계 임베딩 저장소도 저장된 벡터 그대로 계산합니다.
+    """
+
+    name = "hdbscan"
+
+    def describe(self) -> str:
+        return f"min_cluster_size={self.min_samples}, min_samples={self.min_samples}"
+
+    def fit(self, vectors, mixed=None):
+        from sklearn.cluster import HDBSCAN
+
+        # unit_rows가 새 배열을 만들므로 입력을 복사하지 않음
+        labels = HDBSCAN(
+            min_cluster_size=max(2, self.min_samples), min_samples=self.min_samples, metric='euclidean', copy=False
+        ).fit_predict(unit_rows(vectors))
+        return labels, labels != -1
+
+
+class KNNGraphEngine(ClusteringEngine):
+    """eps 안의 상호 k-최근접 이웃 그래프의 연결 요소. min_samples보다 작은 요소는 노이즈입니다.
+
+    상호 kNN으로 자르면 DBSCAN처럼 경계 기사 하나로 두 사건이 사슬처럼 이어지는 일이 줄어듭니다.
+    """
+
+    name = "knn"
+
+    def __init__(self, eps, min_samples, neighbors='exact', n_probe=None, k: int = DEFAULT_KNN_K):
+        super().__init__(eps, min_samples, neighbors, n_probe)
+        self.k = k
+
+    def describe(self) -> str:
+        return f"eps={self.eps}, k={self.k}, 최소 크기={self.min_samples}"
+
+    def fit(self, vectors, mixed=None):
+        graph = knn_graph(self.radius_graph(vectors, mixed), self.k, mutual=True)
+        _, groups = connected_components(graph, directed=False)
+        labels = labels_from_groups(groups, self.min_samples)
+        return labels, labels != -1
+
+
+class LeidenEngine(KNNGraphEngine):
+    """k-최근접 이웃 그래프(유사도 가중, 한쪽만 골라도 간선)의 Leiden 커뮤니티. igraph와 leidenalg가 필요합니다."""
+
+    name = "leiden"
+
+    def __init__(
+        self, eps, min_samples, neighbors='exact', n_probe=None, k: int = DEFAULT_KNN_K,
+        resolution: float = DEFAULT_LEIDEN_RESOLUTION, random_state: int = 0,
+    ):
+        if leidenalg is None:
+            raise ImportError("leiden 엔진에는 igraph와 leidenalg 패키지가 필요합니다 (pip install igraph leidenalg).")
+        super().__init__(eps, min_samples, neighbors, n_probe, k)
+        self.resolution = resolution
+        self.random_state = random_state
+
+    def describe(self) -> str:
+        return f"eps={self.eps}, k={self.k}, resolution={self.resolution}, 최소 크기={self.min_samples}"
+
+    def fit(self, vectors, mixed=None):
+        graph = sparse.triu(knn_graph(self.radius_graph(vectors, mixed), self.k, mutual=False), k=1).tocoo()
+        network = igraph.Graph(n=len(vectors), edges=list(zip(graph.row.tolist(), graph.col.tolist())))
+        partition = leidenalg.find_partition(
+            network,
+            leidenalg.RBConfigurationVertexPartition,
+            weights=graph.data.tolist(),
+            resolution_parameter=self.resolution,
+            seed=self.random_state,
+        )
+        labels = labels_from_groups(np.asarray(partition.membership), self.min_samples)
+        return labels, labels != -1
+
+
+ENGINES = {
+    "dbscan": DBSCANEngine,
+    "hdbscan": HDBSCANEngine,
+    "knn": KNNGraphEngine,
+    "leiden": LeidenEngine,
+}
+
+
+def available_engines() -> List[str]:
+    """이 환경에서 쓸 수 있는 엔진 (선택 의존성이 없으면 leiden 제외)"""
+    return [name for name in SUPPORTED_ENGINES if name != "leiden" or leidenalg is not None]
+
+
+def make_engine(
+    name: str,
+    eps: float,
+    min_samples: int,
+    neighbors: str = 'exact',
+    n_probe: Optional[int] = None,
+    k: int = DEFAULT_KNN_K,
+    resolution: float = DEFAULT_LEIDEN_RESOLUTION,
+) -> ClusteringEngine:
+    if name not in ENGINES:
+        raise ValueError(f"지원하지 않는 클러스터링 엔진입니다: {name} (지원: {', '.join(SUPPORTED_ENGINES)})")
+    if name == "dbscan" or name == "hdbscan":
+        return ENGINES[name](eps, min_samples, neighbors, n_probe)
+    if name == "knn":
+        return KNNGraphEngine(eps, min_samples, neighbors, n_probe, k)
+    return LeidenEngine(eps, min_samples, neighbors, n_probe, k, resolution)
@@ -0,0 +1,183 @@
+"""
+클러스터링 전 차원 축소
+
+클러스터링의 거리 계산은 모두 임베딩 차원(예: 1536)에 비례하므로, 벡터를 64~256차원으로 줄여 넣으면
+이웃 그래프/DBSCAN이 그만큼 빨라집니다. 축소기는 파일로 유지되어 실행마다 같은 기저로 투영합니다.
+
+  pca     비중심 PCA. 단위벡터의 2차 모멘트 행렬 XᵀX(차원 × 차원)를 새 기사가 들어올 때마다 더하고(증분),
+          고유벡터 상위 dim개로 투영합니다. 중심을 빼지 않으므로 모든 기사가 공유하는 평균 방향도 기저에 남아
+          코사인 구조가 유지됩니다. 기저는 마지막으로 고른 뒤 refit_fraction 이상 새 기사가 쌓였을 때만 다시 고릅니다.
+  random  희소 랜덤 투영 (성분 밀도 1/√차원, 값 ±1). 학습 없이 고정 시드로 한 번 만들어 저장합니다.
+
+투영한 벡터는 다시 L2 정규화하므로 이후 단계는 코사인 거리를 그대로 씁니다. 축소 공간의 코사인 거리는
+원래보다 작아지는 경향이 있어 같은 eps라도 결과가 달라질 수 있습니다 (--reduction-report로 확인).
+
+  embedding_reducer.npz        components (dim × 입력 차원) float32, pca면 moments (입력 차원²) float64
+  embedding_reducer.meta.json  {"method", "model", "input_dim", "dim", "rows_seen", "rows_at_fit", "explained", "seen_ids"}
+
+npz는 저장할 때마다 세대 번호가 붙은 이름(embedding_reducer.g3.npz)으로 쓰고 .meta.json 교체로 커밋하므로 (generation_files),
+moments와 seen_ids가 서로 다른 저장에서 온 조합(같은 기사를 두 번 더한 moments 등)을 읽지 않습니다.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from app.services.cluster.embedding_quantization import unit_rows
+from app.services.cluster.generation_files import GenerationFiles
+
+SUPPORTED_REDUCERS = ("none", "pca", "random")
+DEFAULT_REDUCER = os.getenv("CLUSTER_REDUCER", "none")
+DEFAULT_REDUCED_DIM = int(os.getenv("CLUSTER_REDUCED_DIM", "128"))
+DEFAULT_REFIT_FRACTION = float(os.getenv("CLUSTER_REDUCER_REFIT_FRACTION", "0.2"))
+DEFAULT_REDUCER_PATH = "embedding_reducer.npz"
+SIDECAR_SUFFIX = ".meta.json"
+REDUCE_BLOCK_ROWS = 4096
+RANDOM_SEED = 0
+REDUCER_VERSION = 1
+
+
+class EmbeddingReducer:
+    """임베딩 차원 축소기 (pca | random). path가 None이면 파일로 저장하지 않습니다 (리포트용)."""
+
+    def __init__(
+        self,
+        method: str = "pca",
+        dim: int = DEFAULT_REDUCED_DIM,
+        path: Optional[str] = DEFAULT_REDUCER_PATH,
+        refit_fraction: float = DEFAULT_REFIT_FRACTION,
+    ):
+        if method not in SUPPORTED_REDUCERS or method == "none":
+            raise ValueError(f"지원하지 않는 차원 축소 방식입니다: {method} (지원: pca, random)")
+        if dim <= 0:
+            raise ValueError(f"축소 차원은 0보다 커야 합니다: {dim}")
+        self.method = method
+        self.dim = dim
+        self.path = Path(path) if path else None
+        self.meta_path = self.path.with_name(self.path.stem + SIDECAR_SUFFIX) if self.path else None
+        self.generations = GenerationFiles(self.meta_path, [self.path]) if self.path else None
+        self.refit_fraction = refit_fraction
+        self.reset()
+
+    def reset(self, model: Optional[str] = None, input_dim: int = 0):
+        self.model = model
+        self.input_dim = input_dim
+        self.components: Optional[np.ndarray] = None
+        self.moments = np.zeros((input_dim, input_dim), dtype=np.float64) if self.method == "pca" else None
+        self.rows_seen = 0
+        self.rows_at_fit = 0
+        self.explained: Optional[float] = None
+        self.seen_ids: set = set()
+
+    @property
+    def fitted(self) -> bool:
+        return self.components is not None
+
+    def exists(self) -> bool:
+        return self.path is not None and self.meta_path.exists()
+
+    def load(self) -> "EmbeddingReducer":
+        """저장된 축소기를 읽습니다. 방식/차원이 다르거나 파일이 없으면 빈 상태 그대로입니다."""
+        if not self.exists():
+            return self
+        meta = self.generations.read_meta()
+        path = self.generations.resolve(meta, self.path)
+        if path is None or meta.get("method") != self.method or meta.get("dim") != self.dim:
+            return self
+        with np.load(path) as arrays:
+            self.reset(meta.get("model"), meta["input_dim"])
+            self.components = arrays["components"].astype(np.float32, copy=False)
+            if self.method == "pca":
+                self.moments = arrays["moments"].astype(np.float64, copy=False)
+        self.rows_seen = meta.get("rows_seen", 0)
+        self.rows_at_fit = meta.get("rows_at_fit", 0)
+        self.explained = meta.get("explained")
+        self.seen_ids = set(meta.get("seen_ids", []))
+        return self
+
+    def save(self):
+        """새 세대 파일에 쓴 뒤 메타데이터를 한 번에 교체합니다."""
+        if self.path is None or not self.fitted:
+            return
+        meta = {
+            "version": REDUCER_VERSION,
+            "method": self.method,
+            "model": self.model,
+            "input_dim": self.input_dim,
+            "dim": self.dim,
+            "rows_seen": self.rows_seen,
+            "rows_at_fit": self.rows_at_fit,
+            "explained": self.explained,
+            "seen_ids": sorted(self.seen_ids),
+        }
+        arrays = {"components": self.components}
+        if self.method == "pca":
+            arrays["moments"] = self.moments
+        self.generations.commit(meta, {self.path: lambda f: np.savez(f, **arrays)})
+
+    def update(self, vectors: np.ndarray, ids: Sequence[str], model: Optional[str] = None) -> Dict[str, Any]:
+        """처음 보는 기사로 축소기를 갱신합니다.
+
+        임베딩 모델이나 입력 차원이 바뀌면 처음부터 다시 만듭니다. pca는 새 기사의 2차 모멘트를 더하고,
+        기저가 없거나 마지막으로 고른 뒤 rows_at_fit × refit_fraction개 이상 쌓였으면 기저를 다시 고릅니다.
+        seen_ids는 이번 행렬에 있는 기사로만 유지합니다 (배정되어 저장소에서 빠진 기사는 다시 오지 않음).
+        """
+        input_dim = vectors.shape[1]
+        if self.dim >= input_dim:
+            raise ValueError(f"축소 차원({self.dim})이 입력 차원({input_dim})보다 작아야 합니다.")
+        if model != self.model or input_dim != self.input_dim:
+            self.reset(model, input_dim)
+
+        new_rows = np.fromiter((i for i, article_id in enumerate(ids) if article_id not in self.seen_ids), dtype=np.int64)
+        refit = False
+        if self.method == "pca":
+            for start in range(0, len(new_rows), REDUCE_BLOCK_ROWS):
+                block = unit_rows(vectors[new_rows[start:start + REDUCE_BLOCK_ROWS]])
+                self.moments += (block.T @ block).astype(np.float64)
+            self.rows_seen += len(new_rows)
+            # 기사 수가 축소 차원보다 적으면 고유벡터 일부가 의미 없는 방향이므로 기다림
+            pending = self.rows_seen - self.rows_at_fit
+            if self.rows_seen >= self.dim and (not self.fitted or pending >= self.rows_at_fit * self.refit_fraction):
+                self._fit_pca()
+                refit = True
+        elif not self.fitted:
+            self._fit_random()
+            refit = True
+        self.seen_ids = {str(article_id) for article_id in ids}
+        return {"new_rows": len(new_rows), "refit": refit, "rows_seen": self.rows_seen}
+
+    def _fit_pca(self):
+        eigenvalues, eigenvectors = np.linalg.eigh(self.moments)
+        top = np.argsort(eigenvalues)[::-1][:self.dim]
+        components = eigenvectors[:, top].T
+        # 고유벡터 부호를 고정 (성분 중 절댓값이 가장 큰 값이 양수)
+        signs = np.sign(components[np.arange(self.dim), np.abs(components).argmax(axis=1)])
+        self.components = np.ascontiguousarray(components * signs[:, None], dtype=np.float32)
+        self.explained = float(eigenvalues[top].sum() / max(eigenvalues.sum(), 1e-12))
+        self.rows_at_fit = self.rows_seen
+
+    def _fit_random(self):
+        rng = np.random.default_rng(RANDOM_SEED)
+        density = 1 / np.sqrt(self.input_dim)
+        nonzero = rng.random((self.dim, self.input_dim)) < density
+        signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=(self.dim, self.input_dim))
+        self.components = np.where(nonzero, signs, 0.0).astype(np.float32)
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """(행 수 × dim) 정규화된 float32 투영 벡터 (블록 단위)"""
+        if not self.fitted:
+            raise ValueError("차원 축소기가 아직 학습되지 않았습니다.")
+        out = np.empty((len(vectors), self.dim), dtype=np.float32)
+        for start in range(0, len(vectors), REDUCE_BLOCK_ROWS):
+            out[start:start + REDUCE_BLOCK_ROWS] = unit_rows(
+                unit_rows(vectors[start:start + REDUCE_BLOCK_ROWS]) @ self.components.T
+            )
+        return out
+
+    def describe(self) -> str:
+        text = f"{self.method} {self.input_dim}→{self.dim}차원"
+        if self.explained is not None:
+            text += f", 설명 비율 {self.explained:.1%}"
+        return text
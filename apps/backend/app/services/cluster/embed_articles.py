@@ -1,18 +1,35 @@
 import os
 import json
+import asyncio
 import numpy as np
-from typing import List, Dict, Any
-from openai import OpenAI
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Callable, Iterator, Optional, Set
 from dotenv import load_dotenv
 import sys
-import os
+import argparse
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
 
 # 프로젝트 루트 경로 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
 
-from app.db.supabase_client import supabase_client
+from app.db.repositories import ARTICLE_FIELDS_EMBED, ARTICLE_FIELDS_ID, Cursor, get_repositories
+from app.services.cluster.embedding_backends import (
+    DEFAULT_LOCAL_FIT_DOCS,
+    SUPPORTED_EMBEDDING_BACKENDS,
+    get_embedding_backend,
+)
+from app.services.cluster.embedding_cache import EmbeddingCache, content_hash
+from app.services.cluster.embedding_matrix import EmbeddingMatrix
+from app.services.cluster.embedding_store import DEFAULT_STORE_PATH, SUPPORTED_DTYPES, EmbeddingStore
+from app.services.cluster.text_preparation import TextPreparer, TokenCounter, pool_chunks
+from app.services.cluster.two_tier import (
+    DEFAULT_TWO_TIER_EPS,
+    DEFAULT_TWO_TIER_MARGIN,
+    DEFAULT_TWO_TIER_MIN_SAMPLES,
+    ambiguous_rows,
+    stored_title_vectors,
+)
 
 # .env 파일 로드
 load_dotenv()
@@ -20,111 +37,495 @@ load_dotenv()
 # rich 콘솔
 console = Console()
 
+# 워터마크 직전에 늦게 커밋된 기사를 놓치지 않도록 이만큼 되짚어 읽음 (이미 저장소에 있는 id는 건너뜀)
+WATERMARK_OVERLAP_SECONDS = float(os.getenv("EMBEDDING_WATERMARK_OVERLAP_SECONDS", "300"))
+# 2단계 모드에서 본문을 다시 조회할 때 한 번에 가져올 기사 수
+FULL_TEXT_FETCH_SIZE = 200
+
+def rewind_cursor(watermark: Optional[Cursor], seconds: float = WATERMARK_OVERLAP_SECONDS) -> Optional[Cursor]:
+    """워터마크 (created_at, id)를 seconds만큼 앞당긴 조회 시작 커서를 만듭니다."""
+    if watermark is None:
+        return None
+    value = watermark[0]
+    if value is None:
+        return (None, "")
+    try:
+        rewound = datetime.fromisoformat(value) - timedelta(seconds=seconds)
+    except ValueError:
+        return (value, "")
+    # DB가 돌려준 형식(SQLite는 공백, Postgres는 T 구분)을 유지해야 문자열 비교 순서가 맞음
+    return (rewound.isoformat(sep="T" if "T" in value else " "), "")
+
 class ArticleEmbedder:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.supabase = supabase_client.get_client()
-        self.model = "text-embedding-3-small"
+    def __init__(self, backend: Optional[str] = None, two_tier: Optional[bool] = None):
+        self.repos = get_repositories()
+        # 임베딩 백엔드 (EMBEDDING_BACKEND=openai | local)
+        self.backend = get_embedding_backend(backend)
+        self.model = self.backend.name
+        self.max_pages_in_flight = 4
+        self.cache = EmbeddingCache()
+        # 상용구 제거 + 토큰 예산(EMBEDDING_TOKEN_BUDGET) 안에서 청크로 나누기
+        self.preparer = TextPreparer(TokenCounter(self.model))
+        self.text_stats = {'articles': 0, 'tokens': 0, 'chunks': 0, 'truncated': 0, 'removed_lines': 0}
+        # 2단계 모드: 제목만 먼저 임베딩하고 eps 경계 근처의 모호한 기사만 본문까지 임베딩
+        if two_tier is None:
+            two_tier = os.getenv("EMBEDDING_TWO_TIER", "").lower() in ("1", "true", "yes")
+        self.two_tier = two_tier
+        self.two_tier_eps = DEFAULT_TWO_TIER_EPS
+        self.two_tier_margin = DEFAULT_TWO_TIER_MARGIN
+        self.two_tier_min_samples = DEFAULT_TWO_TIER_MIN_SAMPLES
+        # 덧붙이기 실행에서 저장소 기사들의 제목 벡터 (새 제목의 모호함을 판정할 때 이웃으로 셈)
+        self.stored_titles: Optional[np.ndarray] = None
+        # 마지막으로 임베딩한 기사의 (created_at, id)
+        self.watermark: Optional[Cursor] = None
     
-    def get_articles_without_issue(self) -> List[Dict[str, Any]]:
-        """issue_id가 null인 기사들을 가져옵니다."""
+    def count_articles_without_issue(self) -> int:
+        """issue_id가 null인 기사 수를 조회합니다."""
+        try:
+            return self.repos.articles.count(filters={"issue_id": None})
+        except Exception as e:
+            console.print(f"[bold red]기사 수 조회 중 오류 발생: {e}[/bold red]")
+            return 0
+
+    def iter_articles_without_issue(self, after: Optional[Cursor] = None) -> Iterator[List[Dict[str, Any]]]:
+        """issue_id가 null인 기사들을 (created_at, id) 순서로 after 이후부터 페이지 단위로 가져옵니다.
+
+        임베딩에 필요한 컬럼만 조회합니다 (2단계 모드에서는 본문 없이 제목까지만).
+        """
+        fields = ARTICLE_FIELDS_ID if self.two_tier else ARTICLE_FIELDS_EMBED
         try:
-            response = self.supabase.table("articles").select("*").is_("issue_id", "null").execute()
-            return response.data
+            yield from self.repos.articles.iter_pages(
+                fields, {"issue_id": None}, after=after, order_column="created_at"
+            )
         except Exception as e:
             console.print(f"[bold red]기사 조회 중 오류 발생: {e}[/bold red]")
-            return []
     
     def create_embedding(self, text: str) -> List[float]:
         """텍스트를 임베딩 벡터로 변환합니다."""
         try:
-            response = self.client.embeddings.create(
-                input=text,
-                model=self.model
-            )
-            return response.data[0].embedding
+            embedding = asyncio.run(self.backend.embed([text]))[0]
+            return embedding if embedding is not None else []
         except Exception as e:
             console.print(f"[bold red]임베딩 생성 중 오류 발생: {e}[/bold red]")
             return []
     
-    def process_articles(self) -> List[Dict[str, Any]]:
-        """기사들을 임베딩 벡터로 변환합니다."""
-        articles = self.get_articles_without_issue()
-        console.print(f"[cyan]처리할 기사 수: {len(articles)}[/cyan]")
+    def fit_corpus(self, limit: int = DEFAULT_LOCAL_FIT_DOCS) -> List[str]:
+        """백엔드 학습용 말뭉치: 이슈 배정 여부와 관계없이 기사 최대 limit건의 (상용구를 지운) 제목 + 본문"""
+        texts: List[str] = []
+        for page in self.repos.articles.iter_pages(ARTICLE_FIELDS_EMBED, order_column="created_at"):
+            for article in page:
+                text = self.preparer.prepare(article.get('title') or '', article.get('content_full') or '')
+                if text.chunks:
+                    texts.append(" ".join(text.chunks))
+            if len(texts) >= limit:
+                break
+        return texts[:limit]
+    
+    def fit_backend(self, force: bool = False):
+        """학습이 필요한 백엔드(local)를 임베딩 전에 기사 말뭉치로 학습합니다.
+
+        처음 실행이거나 이전 모델이 작은 말뭉치로 학습됐고 그 뒤로 기사가 늘었으면(또는 force) 다시 학습합니다.
+        모델 이름이 바뀌므로 run()이 저장소를 새로 만듭니다.
+        """
+        try:
+            available = self.repos.articles.count(method="estimated")
+            if not force and not self.backend.needs_fit(available):
+                return
+            texts = self.fit_corpus()
+            if len(texts) < 2:
+                console.print("[bold red]임베딩 모델을 학습할 기사가 부족합니다 (2개 이상 필요).[/bold red]")
+                return
+            self.backend.fit(texts)
+            self.model = self.backend.name
+        except Exception as e:
+            console.print(f"[bold red]임베딩 모델 학습 중 오류 발생: {e}[/bold red]")
+    
+    def prepare_page(self, page: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """기사 페이지에서 임베딩할 청크를 준비합니다 (빈 기사는 제외).
+
+        제목과 상용구를 지운 본문을 토큰 예산 안에서 문장 경계로 나눕니다.
+        """
+        prepared = []
+        for article in page:
+            title = article.get('title') or ''
+            text = self.preparer.prepare(title, article.get('content_full') or '')
+            if not text.chunks:
+                continue
+            
+            self.text_stats['articles'] += 1
+            self.text_stats['tokens'] += text.tokens
+            self.text_stats['chunks'] += len(text.chunks)
+            self.text_stats['truncated'] += int(text.truncated)
+            self.text_stats['removed_lines'] += text.removed_lines
+            prepared.append({
+                'article_id': article['id'],
+                'title': title,
+                'chunks': text.chunks,
+                'chunk_tokens': text.chunk_tokens,
+                'text_length': text.length,
+                'published_at': article.get('published_at'),
+                'category': article.get('category'),
+                'created_at': article.get('created_at')
+            })
+        return prepared
+    
+    def prepare_titles(self, page: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """2단계 모드의 첫 단계: 제목만 임베딩할 항목을 준비합니다 (제목이 빈 기사는 제외)."""
+        prepared = []
+        for article in page:
+            title = (article.get('title') or '').strip()
+            if not title:
+                continue
+            prepared.append({
+                'article_id': article['id'],
+                'title': title,
+                'chunks': [title],
+                'chunk_tokens': [self.preparer.counter.count(title)],
+                'text_length': len(title),
+                'published_at': article.get('published_at'),
+                'category': article.get('category'),
+                'created_at': article.get('created_at')
+            })
+        return prepared
+    
+    async def embed_prepared(
+        self,
+        prepared: List[Dict[str, Any]],
+        on_progress: Optional[Callable[[float], None]] = None
+    ) -> List[Optional[np.ndarray]]:
+        """준비된 항목들의 기사 벡터를 반환합니다 (실패한 항목은 None).
+
+        청크를 한 목록으로 펼쳐 캐시 조회/임베딩 요청을 한 번에 처리하고, 기사별로 청크 벡터를 합칩니다.
+        on_progress는 기사 단위 진행량(청크는 기사의 1/청크 수)을 받으며, 캐시 적중분은 바로, 나머지는 요청 배치가 끝날 때마다 호출됩니다.
+        """
+        texts = [chunk for item in prepared for chunk in item['chunks']]
+        tokens = [count for item in prepared for count in item['chunk_tokens']]
+        weights = [1 / len(item['chunks']) for item in prepared for _ in item['chunks']]
+        # 같은 모델로 같은 텍스트를 임베딩한 적이 있으면 캐시 결과를 사용하고 나머지만 요청
+        if self.backend.cacheable:
+            hashes = [content_hash(text) for text in texts]
+            vectors = self.cache.get_many(self.model, hashes)
+        else:
+            vectors = [None] * len(texts)
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        miss_weight = sum(weights[i] for i in misses)
+        if on_progress:
+            on_progress(sum(weight for weight, vector in zip(weights, vectors) if vector is not None))
+        if misses:
+            # 배치가 끝날 때마다 끝난 청크 수만큼 (요청한 청크의 평균 가중치로) 진행
+            report = (lambda n: on_progress(n * miss_weight / len(misses))) if on_progress else None
+            fetched = await self.backend.embed([texts[i] for i in misses], on_progress=report)
+            if self.backend.cacheable:
+                self.cache.put_many(
+                    self.model,
+                    [hashes[i] for i in misses],
+                    fetched,
+                    [tokens[i] for i in misses]
+                )
+            for i, vector in zip(misses, fetched):
+                vectors[i] = vector
+        # 청크 벡터를 토큰 수 가중 평균해 기사 벡터로 합침 (청크가 하나라도 실패하면 None)
+        embeddings = []
+        offset = 0
+        for item in prepared:
+            count = len(item['chunks'])
+            embeddings.append(pool_chunks(vectors[offset:offset + count], item['chunk_tokens']))
+            offset += count
+        return embeddings
+    
+    async def embed_ambiguous_full_text(
+        self,
+        results: List[Dict[str, Any]],
+        untitled_ids: List[str],
+        progress: Progress
+    ) -> List[Optional[str]]:
+        """2단계 모드의 두 번째 단계: 제목만으로 판정이 모호한 기사와 제목이 빈 기사만 본문까지 임베딩합니다.
+
+        모호함은 새 제목끼리와 저장소 기사의 제목(self.stored_titles) 양쪽의 이웃으로 판정합니다.
+
+        results의 항목은 그 자리에서 본문 벡터로 바뀌고(tier "full", 제목 벡터는 title_embedding에 남김),
+        제목이 빈 기사는 뒤에 덧붙습니다. 본문 임베딩에 실패한 제목 없는 기사의 created_at 목록을 반환합니다.
+        """
+        if results:
+            titles = np.stack([item['embedding'] for item in results]).astype(np.float32, copy=False)
+            ambiguous = np.flatnonzero(ambiguous_rows(
+                titles, self.two_tier_eps, self.two_tier_margin, self.two_tier_min_samples, self.stored_titles
+            ))
+        else:
+            ambiguous = np.array([], dtype=np.int64)
+        targets = [results[i]['article_id'] for i in ambiguous] + list(untitled_ids)
+        by_id = {item['article_id']: item for item in results}
+        failed_at: List[Optional[str]] = []
+        upgraded = 0
         
-        embeddings_data = []
+        task = progress.add_task("[bold blue]모호한 기사 본문 임베딩", total=len(targets))
+        for start in range(0, len(targets), FULL_TEXT_FETCH_SIZE):
+            ids = targets[start:start + FULL_TEXT_FETCH_SIZE]
+            try:
+                articles = await asyncio.to_thread(
+                    self.repos.articles.get_by_ids, ids, (*ARTICLE_FIELDS_EMBED, "created_at")
+                )
+            except Exception as e:
+                # 본문을 못 읽은 기사는 제목 벡터로 남김
+                console.print(f"[bold red]본문 조회 중 오류 발생: {e}[/bold red]")
+                break
+            prepared = self.prepare_page(articles)
+            progress.update(task, advance=len(ids) - len(prepared))
+            embeddings = await self.embed_prepared(prepared, lambda n: progress.update(task, advance=n))
+            for item, embedding in zip(prepared, embeddings):
+                entry = by_id.get(item['article_id'])
+                if embedding is None:
+                    if entry is None:
+                        failed_at.append(item['created_at'])
+                    continue
+                upgraded += 1
+                if entry is None:
+                    # 제목이 없으면 본문 벡터가 제목 벡터 역할도 함
+                    results.append({
+                        'article_id': item['article_id'],
+                        'title': item['title'],
+                        'embedding': embedding,
+                        'title_embedding': embedding,
+                        'text_length': item['text_length'],
+                        'published_at': item['published_at'],
+                        'category': item['category'],
+                        'tier': 'full'
+                    })
+                else:
+                    entry['title_embedding'] = entry['embedding']
+                    entry['embedding'] = embedding
+                    entry['text_length'] = item['text_length']
+                    entry['tier'] = 'full'
+        
+        avoided = len(results) - upgraded
+        stats = self.text_stats
+        avg_tokens = stats['tokens'] / stats['articles'] if stats['articles'] else 0
+        console.print(
+            f"[cyan]2단계 임베딩: 제목 {len(by_id)}건 중 모호한 기사 {len(ambiguous)}건"
+            f"{f', 제목 없는 기사 {len(untitled_ids)}건' if untitled_ids else ''}만 본문 임베딩 "
+            f"(eps {self.two_tier_eps} ± {self.two_tier_margin}, min_samples {self.two_tier_min_samples}"
+            f"{f', 저장소 기사 {len(self.stored_titles)}건과 함께 비교' if self.stored_titles is not None else ''})[/cyan]"
+        )
+        console.print(
+            f"[cyan]본문 임베딩 {avoided}건 생략 ({avoided / len(results) if results else 0:.1%}, "
+            f"약 {avoided * avg_tokens:,.0f}토큰 절약 추정)[/cyan]"
+        )
+        return failed_at
+    
+    async def process_articles_async(
+        self,
+        progress: Progress,
+        task,
+        after: Optional[Cursor] = None,
+        skip_ids: Optional[Set[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """기사 페이지를 읽으면서 임베딩 요청을 동시에 보냅니다.
+
+        한 번에 max_pages_in_flight 페이지까지만 메모리에 올려 두고, 결과는 조회 순서대로 합칩니다.
+        after 이후의 기사만 읽고 skip_ids(이미 임베딩한 기사)는 건너뛰며, 끝나면 self.watermark를 갱신합니다.
+        """
+        pages = self.iter_articles_without_issue(after)
+        skip_ids = skip_ids or set()
+        page_results: Dict[int, List[Dict[str, Any]]] = {}
+        failed_at: List[Optional[str]] = []
+        in_flight = set()
+        
+        untitled_ids: List[str] = []
+        
+        async def embed_page(page_no: int, page: List[Dict[str, Any]]):
+            new_articles = [article for article in page if article['id'] not in skip_ids]
+            if self.two_tier:
+                prepared = self.prepare_titles(new_articles)
+                titled = {item['article_id'] for item in prepared}
+                untitled_ids.extend(article['id'] for article in new_articles if article['id'] not in titled)
+            else:
+                prepared = self.prepare_page(new_articles)
+            progress.update(task, advance=len(page) - len(prepared))
+            embeddings = await self.embed_prepared(prepared, lambda n: progress.update(task, advance=n))
+            # 실패한 기사는 다음 실행에서 다시 읽도록 워터마크를 그 앞으로 돌려 둠
+            failed_at.extend(item['created_at'] for item, embedding in zip(prepared, embeddings) if embedding is None)
+            page_results[page_no] = [
+                {
+                    'article_id': item['article_id'],
+                    'title': item['title'],
+                    'embedding': embedding,
+                    'text_length': item['text_length'],
+                    'published_at': item['published_at'],
+                    'category': item['category'],
+                    **({'tier': 'title'} if self.two_tier else {})
+                }
+                for item, embedding in zip(prepared, embeddings) if embedding is not None
+            ]
+        
+        page_no = 0
+        while True:
+            page = await asyncio.to_thread(next, pages, None)
+            if page is None:
+                break
+            in_flight.add(asyncio.create_task(embed_page(page_no, page)))
+            self.watermark = (page[-1].get('created_at'), page[-1]['id'])
+            page_no += 1
+            if len(in_flight) >= self.max_pages_in_flight:
+                _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        await asyncio.gather(*in_flight)
+        results = [item for no in sorted(page_results) for item in page_results[no]]
+        if self.two_tier:
+            failed_at.extend(await self.embed_ambiguous_full_text(results, untitled_ids, progress))
+        if failed_at:
+            known = [value for value in failed_at if value is not None]
+            self.watermark = (min(known) if len(known) == len(failed_at) else None, "")
+        
+        console.print(f"[cyan]{self.backend.summary()}[/cyan]")
+        stats = self.text_stats
+        if stats['articles']:
+            console.print(
+                f"[cyan]{'본문 ' if self.two_tier else ''}임베딩 입력 {stats['tokens']:,}토큰 (기사당 평균 {stats['tokens'] / stats['articles']:.0f}토큰, "
+                f"청크 {stats['chunks']}개), 예산 초과로 자른 기사 {stats['truncated']}건, "
+                f"지운 상용구 {stats['removed_lines']}줄 "
+                f"(토큰 계산: {'tiktoken' if self.preparer.counter.exact else '추정'})[/cyan]"
+            )
+        if self.backend.cacheable:
+            console.print(
+                f"[cyan]임베딩 캐시 적중 {self.cache.hits}건, 미적중 {self.cache.misses}건 "
+                f"(절약한 비용 약 ${self.cache.saved_dollars(self.model):.4f})[/cyan]"
+            )
+        return results
+    
+    def process_articles(self, after: Optional[Cursor] = None, skip_ids: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """기사들을 임베딩 벡터로 변환합니다."""
+        if after is None:
+            total = self.count_articles_without_issue()
+            console.print(f"[cyan]처리할 기사 수: {total}[/cyan]")
+        else:
+            # 증분 실행은 새 기사 수를 미리 세지 않음 (전체 미배정 기사 COUNT를 피함)
+            total = None
+            console.print(f"[cyan]워터마크 이후 새 기사만 조회합니다 (created_at >= {after[0]})[/cyan]")
         
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
-            TextColumn("{task.completed}/{task.total}"),
+            TextColumn("{task.completed:.0f}/{task.total}"),
             TimeElapsedColumn(),
             console=console
         ) as progress:
-            task = progress.add_task("[bold blue]기사 임베딩 생성", total=len(articles))
+            task = progress.add_task("[bold blue]기사 임베딩 생성", total=total)
+            return asyncio.run(self.process_articles_async(progress, task, after, skip_ids))
+    
+    def save_embeddings(
+        self,
+        embeddings_data: List[Dict[str, Any]],
+        filename: str = DEFAULT_STORE_PATH,
+        dtype: str = None,
+        append: bool = False
+    ):
+        """임베딩 행렬을 .npy로, 기사 메타데이터를 사이드카 JSON으로 저장합니다.
+
+        append이면 기존 저장소 뒤에 덧붙이고(dtype은 기존 저장소를 따름), 아니면 새로 만듭니다.
+        워터마크(self.watermark)도 함께 기록합니다.
+        """
+        dtype = dtype or os.getenv("EMBEDDING_STORE_DTYPE", "float32")
+        store = EmbeddingStore(filename)
+        try:
+            # 양자화는 저장소가 하므로 여기서는 정규화된 float32 행렬로 모음
+            columns = ('title', 'text_length', 'published_at', 'category') + (('tier',) if self.two_tier else ())
+            matrix = EmbeddingMatrix.from_records(embeddings_data, columns=columns)
+            vectors = matrix.vectors
+            items = list(matrix.records())
+            title_vectors = None
+            if self.two_tier:
+                # 본문으로 올린 기사의 제목 벡터는 클러스터링에서 제목끼리 비교할 때 씀
+                full_items = [item for item in embeddings_data if item['tier'] == 'full']
+                title_vectors = EmbeddingMatrix.from_records(full_items, columns=(), vector_key='title_embedding').vectors
+            if append:
+                store.append(vectors, items, model=self.model, watermark=self.watermark, title_vectors=title_vectors)
+            else:
+                store.save(
+                    vectors, items, model=self.model, dtype=dtype, watermark=self.watermark, title_vectors=title_vectors
+                )
             
-            for i, article in enumerate(articles):
-                # title과 content_full을 결합
-                title = article.get('title', '')
-                content_full = article.get('content_full', '')
-                combined_text = f"{title}\n\n{content_full}".strip()
-                
-                if not combined_text:
-                    progress.update(task, advance=1)
-                    continue
-                
-                # 텍스트 길이 제한 (토큰 제한 고려)
-                # 대략적으로 1 토큰 = 4 문자로 계산
-                max_chars = 6000  # 1500 토큰 정도로 제한
-                if len(combined_text) > max_chars:
-                    combined_text = combined_text[:max_chars]
-                    console.print(f"[yellow]텍스트가 너무 길어서 {max_chars}자로 잘렸습니다.[/yellow]")
-                
-                # 임베딩 생성
-                embedding = self.create_embedding(combined_text)
-                
-                if embedding:
-                    embeddings_data.append({
-                        'article_id': article['id'],
-                        'title': title,
-                        'embedding': embedding,
-                        'text_length': len(combined_text)
-                    })
-                    progress.update(task, advance=1)
-                else:
-                    progress.update(task, advance=1)
-        
-        return embeddings_data
+            meta = store.load_meta()
+            console.print(f"[bold green]✅ 임베딩 데이터가 {filename}에 저장되었습니다.[/bold green]")
+            console.print(
+                f"[cyan]새 기사 {len(embeddings_data)}개 추가, 저장소 전체 {meta['count']}개 "
+                f"({meta['dtype']}, {store.matrix_path(meta).stat().st_size / 1024 / 1024:.1f}MB)[/cyan]"
+            )
+            
+        except Exception as e:
+            console.print(f"[bold red]파일 저장 중 오류 발생: {e}[/bold red]")
     
-    def save_embeddings(self, embeddings_data: List[Dict[str, Any]], filename: str = "article_embeddings.json"):
-        """임베딩 데이터를 JSON 파일로 저장합니다."""
+    def export_json(self, embeddings_data: List[Dict[str, Any]], filename: str = "article_embeddings.json"):
+        """디버깅용으로 임베딩 데이터를 JSON 파일로도 저장합니다."""
         try:
             # numpy array를 리스트로 변환
             for item in embeddings_data:
-                item['embedding'] = item['embedding'].tolist() if isinstance(item['embedding'], np.ndarray) else item['embedding']
+                for key in ('embedding', 'title_embedding'):
+                    if isinstance(item.get(key), np.ndarray):
+                        item[key] = item[key].tolist()
             
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(embeddings_data, f, ensure_ascii=False, indent=2)
             
-            console.print(f"[bold green]✅ 임베딩 데이터가 {filename}에 저장되었습니다.[/bold green]")
-            console.print(f"[cyan]총 {len(embeddings_data)}개의 기사 임베딩이 저장되었습니다.[/cyan]")
+            console.print(f"[cyan]디버그용 JSON이 {filename}에 저장되었습니다.[/cyan]")
             
         except Exception as e:
             console.print(f"[bold red]파일 저장 중 오류 발생: {e}[/bold red]")
     
-    def run(self):
-        """전체 임베딩 프로세스를 실행합니다."""
+    def run(
+        self,
+        filename: str = DEFAULT_STORE_PATH,
+        dtype: str = None,
+        export_json: bool = False,
+        full: bool = False,
+        refit: bool = False
+    ):
+        """전체 임베딩 프로세스를 실행합니다.
+
+        저장소가 있으면 워터마크 이후의 새 기사만 임베딩해 덧붙이고,
+        저장소가 없거나 full이거나 모델이 바뀌었으면(로컬 모델을 다시 학습한 경우 포함) 미배정 기사 전체로 새로 만듭니다.
+        """
         console.print("[bold green]=== 기사 임베딩 시작 ===[/bold green]")
+        self.fit_backend(force=refit)
         
-        embeddings_data = self.process_articles()
+        store = EmbeddingStore(filename)
+        meta = store.load_meta() if store.exists() and not full else None
+        if meta and meta.get('model') != self.model:
+            console.print(f"[yellow]임베딩 모델이 바뀌어({meta.get('model')} → {self.model}) 저장소를 새로 만듭니다.[/yellow]")
+            meta = None
+        if meta and meta.get('two_tier', False) != self.two_tier:
+            console.print(f"[yellow]2단계 임베딩 설정이 바뀌어(two_tier={self.two_tier}) 저장소를 새로 만듭니다.[/yellow]")
+            meta = None
         
-        if embeddings_data:
-            self.save_embeddings(embeddings_data)
-            console.print("[bold green]=== 임베딩 완료 ===[/bold green]")
+        if meta:
+            self.watermark = tuple(meta['watermark']) if meta.get('watermark') else None
+            skip_ids = {item['article_id'] for item in meta['items']}
+            if self.two_tier:
+                self.stored_titles = stored_title_vectors(store)
+            embeddings_data = self.process_articles(rewind_cursor(self.watermark), skip_ids)
+            self.save_embeddings(embeddings_data, filename, append=True)
         else:
-            console.print("[bold yellow]처리할 기사가 없거나 오류가 발생했습니다.[/bold yellow]")
+            self.watermark = None
+            self.stored_titles = None
+            embeddings_data = self.process_articles()
+            if not embeddings_data:
+                console.print("[bold yellow]처리할 기사가 없거나 오류가 발생했습니다.[/bold yellow]")
+                return
+            self.save_embeddings(embeddings_data, filename, dtype)
+        
+        if export_json and embeddings_data:
+            self.export_json(embeddings_data)
+        console.print("[bold green]=== 임베딩 완료 ===[/bold green]")
 
 if __name__ == "__main__":
-    embedder = ArticleEmbedder()
-    embedder.run() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="기사 임베딩 생성")
+    parser.add_argument('--output', type=str, default=DEFAULT_STORE_PATH, help='임베딩 저장소(.npy) 경로')
+    parser.add_argument('--dtype', type=str, choices=SUPPORTED_DTYPES, default=None, help='저장할 행렬 dtype')
+    parser.add_argument('--export-json', action='store_true', help='디버깅용 article_embeddings.json도 저장')
+    parser.add_argument('--backend', type=str, choices=SUPPORTED_EMBEDDING_BACKENDS, default=None, help='임베딩 백엔드 (기본값: EMBEDDING_BACKEND)')
+    parser.add_argument('--full', action='store_true', help='워터마크를 무시하고 미배정 기사 전체로 저장소를 새로 만듦')
+    parser.add_argument('--two-tier', action='store_true', default=None, help='제목을 먼저 임베딩하고 모호한 기사만 본문 임베딩 (기본값: EMBEDDING_TWO_TIER)')
+    parser.add_argument('--refit', action='store_true', help='local 백엔드 모델을 기사 말뭉치로 다시 학습 (저장소도 새로 만듦)')
+    args = parser.parse_args()
+    
+    embedder = ArticleEmbedder(backend=args.backend, two_tier=args.two_tier)
+    embedder.run(filename=args.output, dtype=args.dtype, export_json=args.export_json, full=args.full, refit=args.refit)
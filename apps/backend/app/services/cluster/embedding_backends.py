@@ -0,0 +1,288 @@
+"""
+임베딩 백엔드
+
+ArticleEmbedder는 EmbeddingBackend 인터페이스만 사용하며, 백엔드는 EMBEDDING_BACKEND 환경변수로 선택합니다.
+  - openai (기본값): OpenAI text-embedding-3-small (배치 + RPM/TPM 스케줄러)
+  - local: 네트워크 없이 동작하는 문자 n-gram 해싱 + TF-IDF + TruncatedSVD
+
+local 백엔드는 한국어 뉴스에 맞춰 음절 2~3-gram을 사용합니다. n-gram 해싱은 배치 전체를 하나의 코드포인트 배열로
+이어 붙여 NumPy로 한 번에 계산하므로 (문서별 파이썬 루프 없음) 초당 수천 건을 처리할 수 있습니다.
+IDF/SVD는 임베딩 전에 기사 말뭉치(최대 LOCAL_EMBEDDING_FIT_DOCS건)로 따로 학습해 LOCAL_EMBEDDING_MODEL_PATH에
+저장하고 (ArticleEmbedder.fit_backend), 이후 실행은 같은 모델을 불러와 실행 간 벡터가 같은 공간에 있도록 합니다.
+말뭉치가 LOCAL_EMBEDDING_MIN_FIT_DOCS건보다 적었거나 차원이 설정보다 작게 학습된 모델은 기사가 그 기준에 닿거나
+두 배로 늘면 다시 학습합니다. 모델 이름에 학습 결과의 지문이 들어가므로 다시 학습하면 저장소도 새로 만들어집니다.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+from rich.console import Console
+from scipy import sparse
+
+console = Console()
+
+SUPPORTED_EMBEDDING_BACKENDS = ("openai", "local")
+DEFAULT_OPENAI_MODEL = "text-embedding-3-small"
+
+DEFAULT_LOCAL_MODEL_PATH = "local_embedding_model.npz"
+DEFAULT_LOCAL_FEATURES = 2 ** 16
+DEFAULT_LOCAL_DIM = 256
+# 이보다 적은 기사로 학습한 모델은 기사가 더 쌓이면 다시 학습
+DEFAULT_LOCAL_MIN_FIT_DOCS = int(os.getenv("LOCAL_EMBEDDING_MIN_FIT_DOCS", "1000"))
+# 학습에 쓸 최대 기사 수
+DEFAULT_LOCAL_FIT_DOCS = int(os.getenv("LOCAL_EMBEDDING_FIT_DOCS", "20000"))
+# 작게 학습된 모델은 기사가 이 배수로 늘었을 때(또는 min_fit_docs에 도달했을 때) 다시 학습 (저장소 재생성 횟수를 로그로 제한)
+LOCAL_REFIT_GROWTH = 2
+LOCAL_MODEL_PREFIX = "local-char-ngram-svd"
+LOCAL_NGRAM_RANGE = (2, 3)
+
+_WHITESPACE_CODES = np.array([9, 10, 11, 12, 13, 32, 0xA0, 0x3000], dtype=np.uint32)
+# 64비트 곱셈 해시 상수 (오버플로는 2^64 모듈로 연산으로 취급)
+_HASH_BASE = np.uint64(0x100000001B3)
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def char_ngram_counts(texts: List[str], n_features: int, ngram_range=LOCAL_NGRAM_RANGE) -> sparse.csr_matrix:
+    """문자 n-gram 출현 횟수를 n_features 칸으로 해싱한 (문서 수 × n_features) 희소 행렬
+
+    문서들을 구분자(\x00)로 이어 붙인 코드포인트 배열 하나에서 모든 n-gram 해시를 벡터 연산으로 구하고,
+    구분자를 걸치는 n-gram만 버립니다. 공백 문자는 한 칸 공백으로 합칩니다.
+    """
+    joined = "\x00".join(texts).lower()
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+    is_space = np.isin(codes, _WHITESPACE_CODES)
+    keep = ~(is_space & np.concatenate(([True], is_space[:-1])))
+    codes = np.where(is_space, 32, codes)[keep].astype(np.uint64)
+    doc_ids = np.cumsum(codes == 0)
+    separator_prefix = np.concatenate(([0], doc_ids))
+
+    keys = []
+    with np.errstate(over="ignore"):
+        for n in range(ngram_range[0], ngram_range[1] + 1):
+            count = len(codes) - n + 1
+            if count <= 0:
+                continue
+            hashes = codes[:count].copy()
+            for k in range(1, n):
+                hashes = hashes * _HASH_BASE + codes[k:k + count]
+            # n-gram 길이를 섞어 같은 문자로 된 2-gram/3-gram이 같은 칸에 모이지 않게 함
+            hashes = (hashes + np.uint64(n)) * _HASH_MIX
+            valid = separator_prefix[n:n + count] == separator_prefix[:count]
+            columns = ((hashes[valid] >> np.uint64(17)) % np.uint64(n_features)).astype(np.int64)
+            keys.append(doc_ids[:count][valid].astype(np.int64) * n_features + columns)
+
+    # (문서, 칸) 키를 정렬해 세면 CSR의 정렬된 indices/data가 바로 나옴
+    keys, counts = np.unique(np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64), return_counts=True)
+    rows = keys // n_features
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(texts)))))
+    return sparse.csr_matrix(
+        (counts.astype(np.float32), keys % n_features, indptr),
+        shape=(len(texts), n_features),
+    )
+
+
+class EmbeddingBackend(ABC):
+    """텍스트 목록을 임베딩 벡터 목록으로 바꾸는 백엔드"""
+
+    # 임베딩 캐시/저장소 메타데이터에 기록되는 모델 이름
+    name: str
+    # 결과를 임베딩 캐시에 저장할 가치가 있는지 (API 비용이 드는 백엔드만)
+    cacheable: bool = False
+
+    @abstractmethod
+    async def embed(
+        self,
+        texts: List[str],
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> List[Optional[np.ndarray]]:
+        """texts와 같은 순서의 임베딩 목록을 반환합니다. 실패한 항목은 None입니다."""
+
+    def needs_fit(self, available_docs: int) -> bool:
+        """임베딩 전에 기사 말뭉치로 fit()해야 하는지 (available_docs: 학습에 쓸 수 있는 기사 수)"""
+        return False
+
+    def fit(self, texts: List[str]):
+        """기사 말뭉치로 모델을 학습합니다 (학습이 필요한 백엔드만)."""
+
+    def summary(self) -> str:
+        """실행 후 출력할 요약"""
+        return ""
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    cacheable = True
+
+    def __init__(self, model: str = DEFAULT_OPENAI_MODEL):
+        from openai import AsyncOpenAI
+        from app.services.cluster.embedding_scheduler import AsyncEmbeddingScheduler
+        from app.services.cluster.text_preparation import TokenCounter
+
+        self.name = model
+        # 비동기 클라이언트의 자체 재시도는 끄고 스케줄러가 429/retry-after를 직접 처리
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        # 배치 패킹/TPM 계산도 모델 토크나이저로 (tiktoken이 없으면 추정치)
+        self.scheduler = AsyncEmbeddingScheduler(self.client, model, count_tokens=TokenCounter(model).count)
+
+    async def embed(self, texts, on_progress=None):
+        return await self.scheduler.embed(texts, on_progress=on_progress)
+
+    def summary(self) -> str:
+        return (
+            f"임베딩 API 요청 {self.scheduler.request_count}회 "
+            f"(재시도 {self.scheduler.retry_count}회), 실패 {self.scheduler.failed_count}건"
+        )
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """문자 n-gram 해싱 → TF-IDF → TruncatedSVD → L2 정규화"""
+
+    # 학습 전 이름. 학습/로드 후에는 차원과 투영 행렬 지문이 붙음
+    name = LOCAL_MODEL_PREFIX
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        n_features: int = DEFAULT_LOCAL_FEATURES,
+        n_components: int = DEFAULT_LOCAL_DIM,
+        min_fit_docs: int = DEFAULT_LOCAL_MIN_FIT_DOCS,
+    ):
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        self.model_path = Path(model_path or os.getenv("LOCAL_EMBEDDING_MODEL_PATH", DEFAULT_LOCAL_MODEL_PATH))
+        self.n_features = n_features
+        self.n_components = n_components
+        self.min_fit_docs = min_fit_docs
+        # 학습에 쓴 기사 수와 한 번이라도 나온 해시 칸 수
+        self.fit_docs = 0
+        self.vocabulary = 0
+        self.tfidf = TfidfTransformer(sublinear_tf=True)
+        self.components: Optional[np.ndarray] = None
+        self.doc_count = 0
+        self.seconds = 0.0
+        if self.model_path.exists():
+            self.load()
+
+    @property
+    def fitted(self) -> bool:
+        return self.components is not None
+
+    @property
+    def undertrained(self) -> bool:
+        """말뭉치가 min_fit_docs보다 작았거나 (문서/어휘 수 때문에) 설정보다 작은 차원으로 학습됐는지"""
+        return self.fit_docs < self.min_fit_docs or self.components.shape[0] < self.n_components
+
+    def needs_fit(self, available_docs: int) -> bool:
+        if not self.fitted:
+            return True
+        if not self.undertrained:
+            return False
+        target = LOCAL_REFIT_GROWTH * self.fit_docs
+        if self.fit_docs < self.min_fit_docs:
+            target = min(target, self.min_fit_docs)
+        return available_docs >= max(self.fit_docs + 1, target)
+
+    def _model_name(self) -> str:
+        fingerprint = hashlib.sha1(self.components.tobytes()).hexdigest()[:8]
+        return f"{LOCAL_MODEL_PREFIX}-{self.components.shape[0]}d-{fingerprint}"
+
+    def fit(self, texts: List[str]):
+        """기사 말뭉치(기사당 텍스트 하나)로 IDF와 SVD 투영 행렬을 학습하고 저장합니다."""
+        from sklearn.decomposition import TruncatedSVD
+
+        if len(texts) < 2:
+            raise ValueError("로컬 임베딩 모델을 학습하려면 문서가 2개 이상 필요합니다.")
+        counts = char_ngram_counts(texts, self.n_features)
+        vocabulary = int(np.count_nonzero(counts.getnnz(axis=0)))
+        weighted = self.tfidf.fit_transform(counts)
+        # SVD 차원은 문서 수와 어휘 수를 넘을 수 없음
+        n_components = min(self.n_components, len(texts) - 1, vocabulary - 1)
+        svd = TruncatedSVD(n_components=n_components, random_state=0).fit(weighted)
+        self.components = svd.components_.astype(np.float32)
+        self.fit_docs = len(texts)
+        self.vocabulary = vocabulary
+        self.name = self._model_name()
+        self.save()
+        console.print(
+            f"[cyan]로컬 임베딩 모델 학습 완료: 문서 {len(texts)}개, 어휘 {vocabulary}개, "
+            f"{n_components}차원 → {self.model_path} ({self.name})[/cyan]"
+        )
+        if self.undertrained:
+            console.print(
+                f"[yellow]⚠️  학습 말뭉치가 작아(문서 {len(texts)}개, {n_components}/{self.n_components}차원) "
+                f"기사가 더 쌓이면 다시 학습하고 저장소를 새로 만듭니다 (기준 {self.min_fit_docs}건).[/yellow]"
+            )
+
+    def save(self):
+        tmp_path = self.model_path.with_name(self.model_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                idf=self.tfidf.idf_.astype(np.float32),
+                components=self.components,
+                n_features=self.n_features,
+                fit_docs=self.fit_docs,
+                vocabulary=self.vocabulary,
+            )
+        os.replace(tmp_path, self.model_path)
+
+    def load(self):
+        with np.load(self.model_path) as data:
+            if int(data["n_features"]) != self.n_features:
+                raise ValueError(
+                    f"로컬 임베딩 모델의 해시 차원({int(data['n_features'])})이 설정({self.n_features})과 다릅니다: {self.model_path}"
+                )
+            self.tfidf.idf_ = data["idf"].astype(np.float64)
+            self.components = data["components"]
+            # 학습 기사 수를 기록하지 않던 모델은 작게 학습된 것으로 보고 다시 학습 대상으로 둠
+            self.fit_docs = int(data["fit_docs"]) if "fit_docs" in data else 0
+            self.vocabulary = int(data["vocabulary"]) if "vocabulary" in data else 0
+        self.name = self._model_name()
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        """(문서 수 × 차원) 단위벡터 행렬"""
+        weighted = self.tfidf.transform(char_ngram_counts(texts, self.n_features))
+        vectors = np.asarray(weighted @ self.components.T, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _embed_sync(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        if not self.fitted:
+            console.print("[bold red]로컬 임베딩 모델이 학습되지 않았습니다 (embed_articles.py가 임베딩 전에 말뭉치로 학습).[/bold red]")
+            return [None] * len(texts)
+        started = time.perf_counter()
+        vectors = self.transform(texts)
+        self.doc_count += len(texts)
+        self.seconds += time.perf_counter() - started
+        return list(vectors)
+
+    async def embed(self, texts, on_progress=None):
+        if not texts:
+            return []
+        # CPU 연산이므로 이벤트 루프를 막지 않도록 스레드에서 실행 (NumPy/SciPy 연산은 GIL을 놓음)
+        results = await asyncio.to_thread(self._embed_sync, texts)
+        if on_progress:
+            on_progress(len(texts))
+        return results
+
+    def summary(self) -> str:
+        rate = self.doc_count / self.seconds if self.seconds else 0.0
+        return f"로컬 임베딩 {self.doc_count}건, {self.seconds:.2f}초 ({rate:.0f}건/초)"
+
+
+def get_embedding_backend(name: Optional[str] = None) -> EmbeddingBackend:
+    """EMBEDDING_BACKEND(openai | local)에 맞는 백엔드를 만듭니다."""
+    name = (name or os.getenv("EMBEDDING_BACKEND", "openai")).lower()
+    if name == "openai":
+        return OpenAIEmbeddingBackend()
+    if name == "local":
+        return LocalEmbeddingBackend()
+    raise ValueError(
+        f"지원하지 않는 EMBEDDING_BACKEND입니다: {name} (지원: {', '.join(SUPPORTED_EMBEDDING_BACKENDS)})"
+    )
@@ -0,0 +1,43 @@
+"""
+배치 임베딩 요청 묶기
+
+여러 텍스트를 한 번의 embeddings.create 요청으로 묶어 API 왕복 횟수를 줄이도록, 요청당 입력 개수/토큰 한도를
+넘지 않는 배치를 만듭니다. 요청을 보내는 쪽은 embedding_scheduler.AsyncEmbeddingScheduler입니다.
+"""
+
+from typing import Callable, List
+
+# OpenAI embeddings API 요청당 한도
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300_000
+# 여유분을 두고 사용하는 기본값
+DEFAULT_MAX_INPUTS = 256
+DEFAULT_MAX_TOKENS = 250_000
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 보수적으로 토큰 수를 추정합니다 (ASCII 4자당 1토큰, 그 외 문자는 1자당 1토큰)."""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def pack_batches(
+    texts: List[str],
+    max_inputs: int = DEFAULT_MAX_INPUTS,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+) -> List[List[int]]:
+    """입력 개수/토큰 한도를 지키면서 텍스트 인덱스를 순서대로 배치로 묶습니다."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and (len(current) >= max_inputs or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,113 @@
+"""
+임베딩 캐시
+
+(모델, 정규화한 텍스트의 sha256)을 키로 임베딩 벡터를 로컬 SQLite에 저장합니다.
+내용이 바뀌지 않은 기사(예: 지난번 DBSCAN 노이즈로 남은 기사)는 다시 API를 호출하지 않습니다.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_CACHE_PATH = "embedding_cache.sqlite3"
+
+# 1M 토큰당 가격 (USD)
+PRICE_PER_MILLION_TOKENS = {
+    "text-embedding-3-small": 0.02,
+    "text-embedding-3-large": 0.13,
+    "text-embedding-ada-002": 0.10,
+}
+
+# SQLite 바인딩 파라미터 개수 제한을 넘지 않도록 조회를 나눔
+LOOKUP_CHUNK_SIZE = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """유니코드 NFC 정규화 + 공백 정리 (공백만 다른 텍스트는 같은 키가 되도록)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """(model, sha256) → float32 벡터 캐시"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+              model TEXT NOT NULL,
+              text_hash TEXT NOT NULL,
+              dim INTEGER NOT NULL,
+              vector BLOB NOT NULL,
+              tokens INTEGER NOT NULL DEFAULT 0,
+              created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+              PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """hashes와 같은 순서로 캐시된 벡터를 반환합니다 (없으면 None)."""
+        found: Dict[str, tuple] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), LOOKUP_CHUNK_SIZE):
+                chunk = unique[start:start + LOOKUP_CHUNK_SIZE]
+                rows = self.conn.execute(
+                    f"SELECT text_hash, vector, tokens FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                ).fetchall()
+                for text_hash, vector, tokens in rows:
+                    found[text_hash] = (vector, tokens)
+
+        results: List[Optional[np.ndarray]] = []
+        for text_hash in hashes:
+            item = found.get(text_hash)
+            if item is None:
+                self.misses += 1
+                results.append(None)
+            else:
+                self.hits += 1
+                self.saved_tokens += item[1]
+                results.append(np.frombuffer(item[0], dtype=np.float32))
+        return results
+
+    def put_many(self, model: str, hashes: Sequence[str], vectors: Sequence, tokens: Sequence[int]):
+        rows = [
+            (model, text_hash, len(vector), np.asarray(vector, dtype=np.float32).tobytes(), int(n))
+            for text_hash, vector, n in zip(hashes, vectors, tokens)
+            if vector is not None
+        ]
+        if not rows:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector, tokens) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def saved_dollars(self, model: str) -> float:
+        """이번 실행에서 캐시 적중으로 아낀 API 비용 (USD)"""
+        return self.saved_tokens / 1_000_000 * PRICE_PER_MILLION_TOKENS.get(model, 0.0)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,230 @@
+"""
+메모리 안 임베딩 행렬
+
+파이프라인 단계 사이에서 임베딩을 주고받는 기본 형태입니다 (기사 dict 목록 + 파이썬 float 리스트 대신).
+
+  vectors  (기사 수 × 차원) C-연속 float32, 행마다 L2 정규화 → 코사인 유사도 = 내적
+           저장소에서 읽은 float16/int8 행렬은 저장 dtype 그대로(정규화 전, mmap) 둡니다. 코사인 계산은
+           similarity_kernel/quality_metrics/IVF 인덱스가 쓰는 블록만 float32 단위벡터로 바꿔서 합니다.
+  scales   int8 저장소의 벡터별 scale (원래 값 = 코드 × scale, 그 외에는 None). 코사인에는 필요 없음
+  ids      기사 id 배열 (행 순서)
+  columns  행별 메타데이터 열 {"title": ..., "text_length": ..., "published_at": ..., "category": ..., "tier": ...}
+
+id → 행 번호 dict는 처음 필요할 때 만듭니다.
+take()는 연속된 행 범위면 복사 없이 뷰를 돌려주고, 흩어진 행이면 NumPy 규칙대로 그 행들만 복사합니다.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.services.cluster.embedding_quantization import QUANTIZED_DTYPES, unit_rows
+
+# float16/int8(또는 정규화 전) 행렬을 float32 단위벡터로 바꿀 때 한 번에 변환할 행 수
+NORMALIZE_BLOCK_ROWS = 4096
+# 저장소 items에서 행렬 메타데이터 열로 옮길 키
+STORE_COLUMNS = ("title", "text_length", "published_at", "category", "tier")
+
+RowSelector = Union[slice, Sequence[int], np.ndarray]
+
+
+def normalize_rows(vectors: np.ndarray, block_rows: int = NORMALIZE_BLOCK_ROWS) -> np.ndarray:
+    """블록 단위로 float32 단위벡터 행렬을 만듭니다 (입력이 mmap/float16/int8이어도 전체를 float64로 올리지 않음)."""
+    out = np.empty(vectors.shape, dtype=np.float32)
+    for start in range(0, len(vectors), block_rows):
+        out[start:start + block_rows] = unit_rows(vectors[start:start + block_rows])
+    return out
+
+
+def _column(values: Iterable[Any]) -> np.ndarray:
+    values = list(values)
+    array = np.asarray(values)
+    # 고정 길이 유니코드 배열은 가장 긴 제목 길이만큼 칸을 잡으므로 객체 배열로 둠
+    if array.dtype.kind in ("U", "S") or array.dtype == object:
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+    return array
+
+
+class EmbeddingMatrix:
+    """임베딩 행렬(정규화된 float32, 또는 저장 dtype 그대로인 float16/int8) + 기사 id + 행별 메타데이터"""
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        ids: Sequence[str],
+        columns: Optional[Dict[str, Iterable[Any]]] = None,
+        normalized: bool = False,
+        scales: Optional[np.ndarray] = None,
+    ):
+        vectors = np.asarray(vectors) if not isinstance(vectors, np.ndarray) else vectors
+        if vectors.ndim != 2:
+            raise ValueError(f"임베딩 행렬은 2차원이어야 합니다: {vectors.shape}")
+        if len(ids) != len(vectors):
+            raise ValueError(f"벡터 수({len(vectors)})와 id 수({len(ids)})가 다릅니다.")
+        if vectors.dtype.name in QUANTIZED_DTYPES:
+            self.vectors = vectors
+        elif normalized and vectors.dtype == np.float32 and vectors.flags.c_contiguous:
+            self.vectors = vectors
+        else:
+            self.vectors = normalize_rows(vectors)
+        if scales is not None and len(scales) != len(vectors):
+            raise ValueError(f"scale 수({len(scales)})와 벡터 수({len(vectors)})가 다릅니다.")
+        self.scales = scales if vectors.dtype == np.int8 else None
+        self.ids = _column(ids)
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, values in (columns or {}).items():
+            column = _column(values)
+            if len(column) != len(self.ids):
+                raise ValueError(f"메타데이터 열 {name}의 길이({len(column)})가 행 수({len(self.ids)})와 다릅니다.")
+            self.columns[name] = column
+        self._index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def _view(
+        cls, vectors: np.ndarray, ids: np.ndarray, columns: Dict[str, np.ndarray], scales: Optional[np.ndarray] = None
+    ) -> "EmbeddingMatrix":
+        """이미 정규화된(또는 저장 dtype 그대로인) 배열들로 검사/복사 없이 만듭니다."""
+        matrix = cls.__new__(cls)
+        matrix.vectors = vectors
+        matrix.scales = scales
+        matrix.ids = ids
+        matrix.columns = columns
+        matrix._index = None
+        return matrix
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Sequence[Dict[str, Any]],
+        columns: Sequence[str] = ("title", "text_length"),
+        vector_key: str = "embedding",
+    ) -> "EmbeddingMatrix":
+        """{"article_id", "embedding", ...} dict 목록(임베딩 단계 결과, 디버그 JSON)으로 만듭니다.
+
+        임베딩이 비어 있는 항목은 뺍니다.
+        """
+        records = [record for record in records if record.get(vector_key) is not None and len(record[vector_key])]
+        if not records:
+            return cls(np.zeros((0, 0), dtype=np.float32), [], {name: [] for name in columns}, normalized=True)
+        vectors = np.empty((len(records), len(records[0][vector_key])), dtype=np.float32)
+        for i, record in enumerate(records):
+            vectors[i] = record[vector_key]
+        return cls(
+            vectors,
+            [record['article_id'] for record in records],
+            {name: [record.get(name) for record in records] for name in columns},
+        )
+
+    @classmethod
+    def from_store(cls, store) -> Tuple["EmbeddingMatrix", Dict[str, Any]]:
+        """EmbeddingStore를 읽어 (행렬, 저장소 메타데이터)를 반환합니다.
+
+        저장소 행렬은 mmap으로 엽니다. float16/int8은 저장 dtype 그대로(메모리 1/2, 1/4) 두고 int8 scale도 함께 읽으며,
+        float32만 블록 단위로 정규화된 float32로 옮깁니다.
+        """
+        vectors, items, meta = store.load(mmap=True)
+        columns = {name: [item.get(name) for item in items] for name in STORE_COLUMNS if any(name in item for item in items)}
+        scales = store.load_scales(meta) if vectors.dtype == np.int8 else None
+        matrix = cls(vectors, [item["article_id"] for item in items], columns, scales=scales)
+        return matrix, meta
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    @property
+    def quantized(self) -> bool:
+        """float16/int8 저장 dtype 그대로인지 (정규화 전 값이라 코사인 계산 전에 units()가 필요)"""
+        return self.vectors.dtype.name in QUANTIZED_DTYPES
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def units(self, rows: RowSelector = slice(None)) -> np.ndarray:
+        """rows 행의 float32 단위벡터. float32 행렬의 slice면 복사 없는 뷰입니다."""
+        block = self.vectors[rows]
+        return unit_rows(block) if self.quantized else block
+
+    @property
+    def index(self) -> Dict[str, int]:
+        """기사 id → 행 번호"""
+        if self._index is None:
+            self._index = {article_id: row for row, article_id in enumerate(self.ids)}
+        return self._index
+
+    def row(self, article_id: str) -> int:
+        return self.index[article_id]
+
+    def rows(self, article_ids: Iterable[str]) -> np.ndarray:
+        index = self.index
+        return np.fromiter((index[article_id] for article_id in article_ids), dtype=np.int64)
+
+    def column(self, name: str, default: Any = None) -> np.ndarray:
+        """메타데이터 열 (없으면 default로 채운 열)"""
+        if name in self.columns:
+            return self.columns[name]
+        return _column([default] * len(self))
+
+    def take(self, rows: RowSelector) -> "EmbeddingMatrix":
+        """행 부분집합. slice나 연속된 행 번호면 원래 배열의 뷰(복사 없음)이고, 그 외에는 해당 행만 복사합니다."""
+        if not isinstance(rows, slice):
+            rows = np.asarray(rows)
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+            if len(rows) and rows[-1] - rows[0] == len(rows) - 1 and np.all(np.diff(rows) == 1):
+                rows = slice(int(rows[0]), int(rows[-1]) + 1)
+            elif not len(rows):
+                rows = slice(0, 0)
+        return self._view(
+            self.vectors[rows],
+            self.ids[rows],
+            {name: column[rows] for name, column in self.columns.items()},
+            self.scales[rows] if self.scales is not None else None,
+        )
+
+    def with_vectors(self, vectors: np.ndarray) -> "EmbeddingMatrix":
+        """같은 기사 id/메타데이터에 벡터만 바꾼 행렬 (차원 축소 등). 행 수가 같아야 합니다."""
+        if len(vectors) != len(self):
+            raise ValueError(f"벡터 수({len(vectors)})가 행 수({len(self)})와 다릅니다.")
+        return self._view(normalize_rows(vectors), self.ids, self.columns)
+
+    def similarity(self, queries: np.ndarray) -> np.ndarray:
+        """(쿼리 수 × 기사 수) 코사인 유사도. 쿼리는 정규화하지 않아도 됩니다. 양자화 행렬은 블록 단위로 계산합니다."""
+        queries = unit_rows(np.atleast_2d(queries))
+        if not self.quantized:
+            return queries @ self.vectors.T
+        out = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), NORMALIZE_BLOCK_ROWS):
+            stop = min(start + NORMALIZE_BLOCK_ROWS, len(self))
+            out[:, start:stop] = queries @ self.units(slice(start, stop)).T
+        return out
+
+    def most_similar(self, query: Union[str, np.ndarray], k: int = 10) -> List[Tuple[str, float]]:
+        """기사 id 또는 벡터와 코사인 유사도가 가장 높은 k개 (id, 유사도). id로 물으면 자기 자신은 뺍니다."""
+        exclude = None
+        if isinstance(query, str):
+            exclude = self.row(query)
+            query = self.vectors[exclude]
+        scores = self.similarity(query)[0]
+        if exclude is not None:
+            scores[exclude] = -np.inf
+        k = min(k, len(scores) - (exclude is not None))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """행마다 {"article_id", 메타데이터 열...} dict (벡터 제외)"""
+        for row, article_id in enumerate(self.ids):
+            record = {"article_id": article_id}
+            for name, column in self.columns.items():
+                value = column[row]
+                record[name] = value.item() if isinstance(value, np.generic) else value
+            yield record
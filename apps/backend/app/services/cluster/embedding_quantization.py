@@ -0,0 +1,48 @@
+"""
+임베딩 양자화
+
+- float16: 값을 그대로 반정밀도로 저장 (메모리 1/2)
+- int8: 벡터마다 scale = max|x| / 127로 나눈 정수 코드 + float32 scale (메모리 약 1/4)
+
+코사인 거리는 벡터 길이와 무관하므로 int8은 scale 없이 코드만으로 계산할 수 있습니다.
+양자화된 벡터의 코사인 계산은 similarity_kernel이 블록 단위로만 float32로 바꿔 처리합니다.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+QUANTIZED_DTYPES = ("float16", "int8")
+INT8_MAX = 127
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """벡터별 scale로 int8 양자화합니다. (codes, scales)를 반환합니다."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / INT8_MAX
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -INT8_MAX, INT8_MAX).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return codes.astype(np.float32) * scales[:, None]
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """dtype(float32/float16/int8)으로 변환합니다. int8이 아니면 scales는 None입니다."""
+    if dtype == "int8":
+        return quantize_int8(vectors)
+    return np.asarray(vectors, dtype=dtype), None
+
+
+def unit_rows(block: np.ndarray) -> np.ndarray:
+    """블록을 float32로 변환하고 행마다 L2 정규화합니다 (0벡터는 그대로)."""
+    block = np.asarray(block, dtype=np.float32)
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return block / norms
+
+
+def nbytes(vectors: np.ndarray, scales: np.ndarray = None) -> int:
+    return vectors.nbytes + (scales.nbytes if scales is not None else 0)
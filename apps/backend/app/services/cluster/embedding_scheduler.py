@@ -0,0 +1,209 @@
+"""
+비동기 임베딩 스케줄러
+
+배치 요청(embedding_batch.pack_batches)을 동시에 여러 개 보내되,
+분당 요청 수(RPM)/분당 토큰 수(TPM) 예산을 넘지 않도록 조절합니다.
+429 응답을 받으면 retry-after 헤더만큼(없으면 지수 백오프) 모든 워커가 함께 쉬었다가 재시도합니다.
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Callable, List, Optional
+
+import openai
+from rich.console import Console
+
+from app.services.cluster.embedding_batch import (
+    DEFAULT_MAX_INPUTS, DEFAULT_MAX_TOKENS, MAX_INPUTS_PER_REQUEST, MAX_TOKENS_PER_REQUEST,
+    estimate_tokens, pack_batches,
+)
+
+console = Console()
+
+# text-embedding-3-small 기본(Tier 1) 한도 기준, 환경변수로 조정
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "8"))
+DEFAULT_RPM = int(os.getenv("EMBEDDING_RPM", "3000"))
+DEFAULT_TPM = int(os.getenv("EMBEDDING_TPM", "1000000"))
+DEFAULT_MAX_RETRIES = 6
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+RETRYABLE_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class TokenBucket:
+    """분당 한도를 초당 속도로 연속 충전하는 토큰 버킷"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """amount만큼 쓰려면 기다려야 하는 시간(초)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """RPM/TPM 두 버킷과 429 이후 공동 대기 시간을 관리합니다."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.cooldown_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int):
+        async with self._lock:
+            while True:
+                wait = max(
+                    self.cooldown_until - time.monotonic(),
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(tokens),
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+
+    def cool_down(self, seconds: float):
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + seconds)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """429 응답의 retry-after-ms / retry-after 헤더 값을 초 단위로 읽습니다."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def backoff_seconds(attempt: int) -> float:
+    """지수 백오프 + 지터"""
+    delay = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * (2 ** attempt))
+    return delay * (0.5 + random.random() / 2)
+
+
+class AsyncEmbeddingScheduler:
+    """동시성 제한과 RPM/TPM 예산 안에서 배치 임베딩 요청을 보냅니다."""
+
+    def __init__(
+        self,
+        client: openai.AsyncOpenAI,
+        model: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rpm: int = DEFAULT_RPM,
+        tpm: int = DEFAULT_TPM,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        max_inputs: int = DEFAULT_MAX_INPUTS,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+    ):
+        self.client = client
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.max_inputs = min(max_inputs, MAX_INPUTS_PER_REQUEST)
+        # 한 요청이 TPM 전체를 넘으면 영원히 기다리게 되므로 배치 토큰 한도도 TPM 이하로 제한
+        self.max_tokens = min(max_tokens, MAX_TOKENS_PER_REQUEST, tpm)
+        self.count_tokens = count_tokens
+        self.request_count = 0
+        self.retry_count = 0
+        self.failed_count = 0
+        # asyncio 객체는 이벤트 루프에 묶이므로 실행할 때 (루프가 바뀌면 다시) 만듦
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._limiter: Optional[RateLimiter] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def embed(
+        self,
+        texts: List[str],
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> List[Optional[List[float]]]:
+        """texts와 같은 순서의 임베딩 목록을 반환합니다. 실패한 항목은 None입니다."""
+        loop = asyncio.get_running_loop()
+        if self._limiter is None or self._loop is not loop:
+            self._loop = loop
+            self._limiter = RateLimiter(self.rpm, self.tpm)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        batches = pack_batches(texts, self.max_inputs, self.max_tokens, self.count_tokens)
+
+        async def run(batch: List[int]):
+            async with self._semaphore:
+                await self._embed_batch(batch, texts, results)
+            if on_progress:
+                on_progress(len(batch))
+
+        await asyncio.gather(*(run(batch) for batch in batches))
+        return results
+
+    async def _embed_batch(self, indices: List[int], texts: List[str], results: List[Optional[List[float]]]):
+        inputs = [texts[i] for i in indices]
+        tokens = sum(self.count_tokens(text) for text in inputs)
+        for attempt in range(self.max_retries + 1):
+            await self._limiter.acquire(tokens)
+            try:
+                self.request_count += 1
+                response = await self.client.embeddings.create(input=inputs, model=self.model)
+            except openai.RateLimitError as e:
+                delay = retry_after_seconds(e) or backoff_seconds(attempt)
+                self._limiter.cool_down(delay)
+                self.retry_count += 1
+                continue
+            except RETRYABLE_ERRORS:
+                await asyncio.sleep(backoff_seconds(attempt))
+                self.retry_count += 1
+                continue
+            except openai.BadRequestError as e:
+                # 잘못된 입력이 섞여 있으면 배치를 반으로 나눠 문제 항목만 걸러냄
+                if len(indices) > 1:
+                    mid = len(indices) // 2
+                    await self._embed_batch(indices[:mid], texts, results)
+                    await self._embed_batch(indices[mid:], texts, results)
+                else:
+                    self.failed_count += 1
+                    console.print(f"[bold red]임베딩 생성 실패 (입력 {indices[0]}): {e}[/bold red]")
+                return
+            except Exception as e:
+                self.failed_count += len(indices)
+                console.print(f"[bold red]임베딩 배치 요청 중 오류 발생 ({len(indices)}개): {e}[/bold red]")
+                return
+
+            for item in response.data:
+                results[indices[item.index]] = item.embedding
+            return
+
+        self.failed_count += len(indices)
+        console.print(f"[bold red]재시도 {self.max_retries}회 후에도 임베딩 실패 ({len(indices)}개)[/bold red]")
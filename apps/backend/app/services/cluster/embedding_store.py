@@ -0,0 +1,215 @@
+"""
+바이너리 임베딩 저장소
+
+임베딩 행렬은 .npy(float32/float16)로, 기사 id/제목 등 메타데이터는 같은 이름의 .meta.json 사이드카로 저장합니다.
+클러스터링 단계는 np.load(mmap_mode="r")로 행렬을 복사 없이 메모리 매핑해서 읽습니다.
+
+저장소는 실행 사이에 유지되는 "아직 이슈가 없는 기사"의 임베딩 모음입니다.
+임베딩 단계는 워터마크 이후의 새 기사만 append()로 덧붙이고, 기사 업데이트 단계는 이슈가 생긴 기사를 remove_ids()로 뺍니다.
+
+  article_embeddings.npy        (기사 수 × 차원) 행렬, 행 순서 = items 순서
+  article_embeddings.meta.json  {"model", "dtype", "dim", "count", "watermark", "two_tier", "items": [{"article_id", "title", "text_length", "published_at", "category", "tier"}]}
+  article_embeddings.scales.npy dtype가 int8일 때 벡터별 float32 scale (원래 값 = 코드 × scale)
+  article_embeddings.titles.npy 2단계 임베딩 저장소에서 tier가 "full"인 행들의 제목 벡터 (행 순서 = 해당 items 순서)
+
+행렬/scale/제목 파일은 저장할 때마다 세대 번호가 붙은 이름(article_embeddings.g3.npy ...)으로 쓰고, 그 이름을 적은
+.meta.json을 마지막에 한 번에 교체합니다 (generation_files). 읽는 쪽은 항상 한 번의 저장으로 쓴 파일 묶음만 봅니다.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.services.cluster.embedding_quantization import quantize
+from app.services.cluster.generation_files import GenerationFiles
+
+DEFAULT_STORE_PATH = "article_embeddings.npy"
+SIDECAR_SUFFIX = ".meta.json"
+SCALES_SUFFIX = ".scales.npy"
+TITLES_SUFFIX = ".titles.npy"
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+STORE_VERSION = 1
+
+
+class EmbeddingStore:
+    """.npy 행렬 + 메타데이터 사이드카 한 쌍"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.meta_path = self.path.with_name(self.path.stem + SIDECAR_SUFFIX)
+        self.scales_path = self.path.with_name(self.path.stem + SCALES_SUFFIX)
+        self.titles_path = self.path.with_name(self.path.stem + TITLES_SUFFIX)
+        self.generations = GenerationFiles(self.meta_path, [self.path, self.scales_path, self.titles_path])
+
+    @property
+    def files(self) -> List[Path]:
+        """디스크에 있는 저장소 파일 (모든 세대)"""
+        return self.generations.existing()
+
+    def exists(self) -> bool:
+        return self.meta_path.exists()
+
+    def matrix_path(self, meta: Dict[str, Any]) -> Path:
+        """meta 세대의 행렬 파일"""
+        path = self.generations.resolve(meta, self.path)
+        if path is None:
+            raise FileNotFoundError(f"임베딩 행렬 파일이 없습니다: {self.path}")
+        return path
+
+    def save(
+        self,
+        vectors: np.ndarray,
+        items: Sequence[Dict[str, Any]],
+        model: Optional[str] = None,
+        dtype: str = "float32",
+        watermark: Optional[Sequence] = None,
+        title_vectors: Optional[np.ndarray] = None,
+    ):
+        """행렬과 메타데이터를 새로 저장합니다 (기존 내용은 덮어씀).
+
+        title_vectors를 주면 2단계 저장소가 되며, tier가 "full"인 items의 제목 벡터여야 합니다.
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"지원하지 않는 dtype입니다: {dtype}")
+        if len(vectors) != len(items):
+            raise ValueError(f"벡터 수({len(vectors)})와 메타데이터 수({len(items)})가 다릅니다.")
+        matrix, scales = quantize(vectors, dtype)
+        titles = self._quantize_titles(title_vectors, items, dtype, int(matrix.shape[1]))
+        self._write(matrix, scales, items, model, dtype, watermark, titles)
+
+    def append(
+        self,
+        vectors: np.ndarray,
+        items: Sequence[Dict[str, Any]],
+        model: Optional[str] = None,
+        watermark: Optional[Sequence] = None,
+        title_vectors: Optional[np.ndarray] = None,
+    ):
+        """기존 저장소 뒤에 행을 덧붙이고 워터마크를 갱신합니다 (dtype과 2단계 여부는 기존 저장소를 따름)."""
+        old_vectors, old_items, meta = self.load(mmap=True)
+        if model is not None and meta.get("model") != model:
+            raise ValueError(f"임베딩 모델이 다릅니다: 저장소 {meta.get('model')}, 새 벡터 {model}")
+        two_tier = meta.get("two_tier", False)
+        if (title_vectors is not None) != two_tier:
+            raise ValueError("2단계 임베딩 저장소에는 2단계 임베딩만 덧붙일 수 있습니다 (반대도 마찬가지).")
+        dtype = meta["dtype"]
+        old_titles = self.load_titles(meta) if two_tier else None
+        if len(items):
+            if len(vectors[0]) != meta["dim"]:
+                raise ValueError(f"임베딩 차원이 다릅니다: 저장소 {meta['dim']}, 새 벡터 {len(vectors[0])}")
+            new_matrix, new_scales = quantize(vectors, dtype)
+            matrix = np.concatenate([old_vectors, new_matrix])
+            scales = np.concatenate([self.load_scales(meta), new_scales]) if dtype == "int8" else None
+            if two_tier:
+                new_titles = self._quantize_titles(title_vectors, items, dtype, meta["dim"])
+                old_titles = np.concatenate([old_titles, new_titles])
+        else:
+            matrix, scales = old_vectors, self.load_scales(meta)
+        self._write(matrix, scales, [*old_items, *items], meta.get("model"), dtype, watermark, old_titles)
+
+    def remove_ids(self, article_ids: Sequence[str]) -> int:
+        """해당 기사 행을 빼고 다시 저장합니다. 뺀 행 수를 반환합니다."""
+        if not self.exists():
+            return 0
+        vectors, items, meta = self.load(mmap=True)
+        drop = set(article_ids)
+        keep = np.array([item["article_id"] not in drop for item in items], dtype=bool)
+        removed = int(len(items) - keep.sum())
+        if removed:
+            scales = self.load_scales(meta)
+            titles = None
+            if meta.get("two_tier"):
+                is_full = np.array([item.get("tier") == "full" for item in items], dtype=bool)
+                titles = self.load_titles(meta)[keep[is_full]]
+            self._write(
+                vectors[keep],
+                scales[keep] if scales is not None else None,
+                [item for item, kept in zip(items, keep) if kept],
+                meta.get("model"),
+                meta["dtype"],
+                meta.get("watermark"),
+                titles,
+            )
+        return removed
+
+    def article_ids(self) -> Set[str]:
+        """저장소에 이미 있는 기사 id"""
+        return {item["article_id"] for item in self.load_meta()["items"]}
+
+    @staticmethod
+    def _quantize_titles(
+        title_vectors: Optional[np.ndarray], items: Sequence[Dict[str, Any]], dtype: str, dim: int
+    ) -> Optional[np.ndarray]:
+        """제목 벡터를 저장소 dtype으로 바꿉니다. int8은 코드만 남깁니다 (코사인 계산에는 scale이 필요 없음)."""
+        if title_vectors is None:
+            return None
+        full_count = sum(1 for item in items if item.get("tier") == "full")
+        if len(title_vectors) != full_count:
+            raise ValueError(f"제목 벡터 수({len(title_vectors)})와 본문 임베딩 기사 수({full_count})가 다릅니다.")
+        if not full_count:
+            return np.zeros((0, dim), dtype=dtype)
+        return quantize(title_vectors, dtype)[0]
+
+    def _write(
+        self,
+        matrix: np.ndarray,
+        scales: Optional[np.ndarray],
+        items: Sequence[Dict[str, Any]],
+        model: Optional[str],
+        dtype: str,
+        watermark: Optional[Sequence],
+        titles: Optional[np.ndarray] = None,
+    ):
+        """새 세대 파일에 쓴 뒤 메타데이터를 한 번에 교체합니다 (읽는 쪽이 반쯤 쓴 저장소를 보지 않도록)."""
+        matrix = np.ascontiguousarray(matrix)
+        meta = {
+            "version": STORE_VERSION,
+            "model": model,
+            "dtype": dtype,
+            "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+            "count": len(items),
+            "watermark": list(watermark) if watermark is not None else None,
+            "two_tier": titles is not None,
+            "items": list(items),
+        }
+
+        writers = {self.path: lambda f: np.save(f, matrix)}
+        if scales is not None:
+            writers[self.scales_path] = lambda f: np.save(f, scales)
+        if titles is not None:
+            writers[self.titles_path] = lambda f: np.save(f, np.ascontiguousarray(titles))
+        self.generations.commit(meta, writers)
+
+    def load_meta(self) -> Dict[str, Any]:
+        return self.generations.read_meta()
+
+    def load(self, mmap: bool = True) -> Tuple[np.ndarray, List[Dict[str, Any]], Dict[str, Any]]:
+        """(행렬, items, 메타데이터)를 반환합니다. mmap이면 읽기 전용 메모리 매핑입니다.
+
+        int8 저장소는 코드 행렬을 그대로 반환합니다 (코사인 계산에는 scale이 필요 없음).
+        """
+        meta = self.load_meta()
+        vectors = np.load(self.matrix_path(meta), mmap_mode="r" if mmap else None)
+        if len(vectors) != meta["count"]:
+            raise ValueError(
+                f"임베딩 저장소가 손상되었습니다: 행 {len(vectors)}개, 메타데이터 {meta['count']}개 ({self.path})"
+            )
+        return vectors, meta["items"], meta
+
+    def _load_sidecar(self, path: Path, meta: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        # load()에서 받은 meta를 넘겨야 행렬과 같은 세대의 파일을 읽음
+        resolved = self.generations.resolve(meta if meta is not None else self.load_meta(), path)
+        return np.load(resolved) if resolved is not None else None
+
+    def load_scales(self, meta: Optional[Dict[str, Any]] = None) -> Optional[np.ndarray]:
+        """int8 저장소의 벡터별 scale (다른 dtype이면 None). meta는 load()가 돌려준 메타데이터입니다."""
+        return self._load_sidecar(self.scales_path, meta)
+
+    def load_titles(self, meta: Optional[Dict[str, Any]] = None) -> Optional[np.ndarray]:
+        """2단계 저장소에서 tier가 "full"인 행들의 제목 벡터 (2단계 저장소가 아니면 None)"""
+        return self._load_sidecar(self.titles_path, meta)
+
+    def remove(self) -> List[Path]:
+        """저장소 파일(모든 세대)을 지우고 지운 파일 목록을 반환합니다."""
+        return self.generations.remove()
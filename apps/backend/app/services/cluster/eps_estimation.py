@@ -0,0 +1,95 @@
+"""
+k-distance 곡선의 무릎(knee)으로 DBSCAN eps 자동 추정
+
+점마다 k(= min_samples)번째 이웃까지의 코사인 거리를 오름차순으로 늘어놓으면, 클러스터 안의 점들은 낮고
+완만한 구간을, 노이즈는 그 뒤의 가파른 구간을 이룹니다. 두 구간이 꺾이는 무릎의 거리가 "클러스터 점은
+거의 모두 핵심점이 되는" 가장 작은 eps입니다.
+
+무릎은 Kneedle 방식으로 찾습니다: 곡선을 x, y 모두 [0, 1]로 정규화하고 양 끝을 잇는 직선과의 차이
+(x - y)가 가장 큰 점. k-distance는 표본 점(sample_size개)만 질의하되 이웃은 전체 점에서 찾으므로
+곡선 모양은 그대로이고 비용은 n × 표본 수입니다. 이웃 탐색은 클러스터링과 같은 방식(exact | ivf)을 씁니다.
+
+추정값은 [CLUSTER_AUTO_EPS_MIN, CLUSTER_AUTO_EPS_MAX]로 제한해, 데이터가 적거나 곡선이 평평해도
+정기 실행이 터무니없는 eps로 클러스터링하지 않게 합니다.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.services.cluster.neighbor_index import DEFAULT_NEIGHBOR_METHOD, k_distances
+
+DEFAULT_AUTO_EPS = os.getenv("CLUSTER_AUTO_EPS", "").lower() in ("1", "true", "yes")
+DEFAULT_AUTO_EPS_MIN = float(os.getenv("CLUSTER_AUTO_EPS_MIN", "0.05"))
+DEFAULT_AUTO_EPS_MAX = float(os.getenv("CLUSTER_AUTO_EPS_MAX", "0.5"))
+DEFAULT_KDIST_SAMPLE_SIZE = int(os.getenv("CLUSTER_AUTO_EPS_SAMPLE_SIZE", "5000"))
+# 무릎 탐색 전에 곡선을 이 개수의 분위수 점으로 줄임 (작은 요동 제거)
+KNEE_CURVE_POINTS = 200
+
+
+@dataclass
+class EpsEstimate:
+    eps: float
+    k: int
+    # 클리핑 전 무릎 거리와 곡선에서의 위치 (0~1 분위)
+    knee_distance: float
+    knee_quantile: float
+    clipped: bool
+    n_queries: int
+    seconds: float
+    curve: np.ndarray
+
+    def __str__(self) -> str:
+        text = f"eps={self.eps:.4f} (k={self.k}, 무릎 {self.knee_quantile:.0%} 분위 거리 {self.knee_distance:.4f}"
+        if self.clipped:
+            text += ", 범위로 제한"
+        return text + f", 질의 {self.n_queries}개, {self.seconds:.2f}초)"
+
+
+def find_knee(curve: np.ndarray) -> int:
+    """오름차순 곡선에서 무릎의 위치 (Kneedle: 정규화한 x - y가 가장 큰 점)"""
+    if len(curve) < 3 or curve[-1] <= curve[0]:
+        return len(curve) // 2
+    x = np.linspace(0.0, 1.0, len(curve))
+    y = (curve - curve[0]) / (curve[-1] - curve[0])
+    return int(np.argmax(x - y))
+
+
+def knee_distance(distances: np.ndarray) -> Tuple[float, float]:
+    """오름차순 k-distance에서 (무릎의 거리, 곡선에서의 위치 0~1)"""
+    curve = np.quantile(distances, np.linspace(0.0, 1.0, min(KNEE_CURVE_POINTS, len(distances))))
+    knee = find_knee(curve)
+    return float(curve[knee]), knee / max(len(curve) - 1, 1)
+
+
+def estimate_eps(
+    vectors: np.ndarray,
+    min_samples: int,
+    neighbors: str = DEFAULT_NEIGHBOR_METHOD,
+    n_probe: Optional[int] = None,
+    sample_size: int = DEFAULT_KDIST_SAMPLE_SIZE,
+    bounds: Tuple[float, float] = (DEFAULT_AUTO_EPS_MIN, DEFAULT_AUTO_EPS_MAX),
+    random_state: int = 0,
+) -> EpsEstimate:
+    """min_samples번째 이웃의 코사인 k-distance 곡선 무릎을 eps로 고릅니다."""
+    started = time.perf_counter()
+    n = len(vectors)
+    rows = None
+    if 0 < sample_size < n:
+        rows = np.sort(np.random.default_rng(random_state).choice(n, size=sample_size, replace=False))
+    distances = np.sort(k_distances(vectors, min_samples, neighbors, n_probe, rows))
+    knee, quantile = knee_distance(distances)
+    eps = float(np.clip(knee, *bounds))
+    return EpsEstimate(
+        eps=eps,
+        k=min_samples,
+        knee_distance=knee,
+        knee_quantile=quantile,
+        clipped=eps != knee,
+        n_queries=len(distances),
+        seconds=time.perf_counter() - started,
+        curve=distances,
+    )
@@ -13,7 +13,8 @@ from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeEl
 # 프로젝트 루트 경로 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
 
-from app.db.supabase_client import supabase_client
+from app.db.repositories import ARTICLE_FIELDS_ISSUE, get_repositories
+from app.db.spool import OP_INSERT_ISSUES, is_transient_error, write_spool
 
 # .env 파일 로드
 load_dotenv()
@@ -24,7 +25,7 @@ console = Console()
 class IssueGenerator:
     def __init__(self):
         self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.supabase = supabase_client.get_client()
+        self.repos = get_repositories()
     
     def load_cluster_results(self, filename: str = "cluster_results.json") -> List[Dict[str, Any]]:
         """클러스터링 결과를 불러옵니다."""
@@ -54,19 +55,11 @@ class IssueGenerator:
                 console.print(f"[yellow]클러스터 {cluster_id}에 속한 기사가 없습니다.[/yellow]")
                 return []
             
-            # Supabase에서 해당 기사들의 상세 정보 조회
-            response = self.supabase.table("articles").select("*").in_("id", cluster_article_ids).execute()
+            # DB에서 해당 기사들의 상세 정보 조회
+            articles = self.repos.articles.get_by_ids(cluster_article_ids, ARTICLE_FIELDS_ISSUE)
             
-            if response is None:
-                console.print(f"[bold red]클러스터 {cluster_id} 기사 조회 응답이 None입니다.[/bold red]")
-                return []
-            
-            if not hasattr(response, 'data') or response.data is None:
-                console.print(f"[bold red]클러스터 {cluster_id} 기사 조회 데이터가 None입니다.[/bold red]")
-                return []
-            
-            console.print(f"[cyan]클러스터 {cluster_id}에서 {len(response.data)}개 기사 조회 완료[/cyan]")
-            return response.data
+            console.print(f"[cyan]클러스터 {cluster_id}에서 {len(articles)}개 기사 조회 완료[/cyan]")
+            return articles
             
         except Exception as e:
             console.print(f"[bold red]클러스터 {cluster_id} 기사 조회 중 오류 발생: {e}[/bold red]")
@@ -228,14 +221,24 @@ class IssueGenerator:
             return {}
     
     def save_issue_to_supabase(self, issue_data: Dict[str, Any]) -> bool:
-        """이슈를 Supabase에 저장합니다."""
+        """이슈를 DB에 저장합니다. 일시적인 DB 오류면 스풀에 보관하고 복구 후 재전송합니다."""
         try:
-            response = self.supabase.table("issues").insert(issue_data).execute()
+            self.repos.issues.insert(issue_data)
             console.print(f"[bold green]✅ 이슈 저장 완료: {issue_data['title']}[/bold green]")
             return True
         except Exception as e:
             console.print(f"[bold red]이슈 저장 중 오류 발생: {e}[/bold red]")
-            return False
+            if not is_transient_error(e):
+                # 다시 보내도 실패할 오류는 스풀에 넣지 않음 (뒤에 쌓인 재전송을 막지 않도록)
+                return False
+            try:
+                # 이슈 id는 클라이언트에서 만들기 때문에 스풀에 보관해도 매핑은 그대로 사용 가능
+                write_spool.append(OP_INSERT_ISSUES, [issue_data])
+                console.print(f"[yellow]📥 이슈를 스풀에 보관했습니다: {issue_data['title']}[/yellow]")
+                return True
+            except Exception as spool_error:
+                console.print(f"[bold red]이슈 스풀 보관 실패: {spool_error}[/bold red]")
+                return False
     
     def get_cluster_ids(self, cluster_results: List[Dict[str, Any]]) -> List[int]:
         """클러스터 ID 목록을 추출합니다 (노이즈 제외)."""
@@ -0,0 +1,104 @@
+"""
+여러 파일로 된 산출물의 원자적 저장 (세대별 데이터 파일 + 메타데이터 사이드카 한 번의 교체)
+
+데이터 파일은 저장할 때마다 새 세대 이름(article_embeddings.g3.npy, article_embeddings.scales.g3.npy ...)으로 쓰고,
+그 파일 이름들을 적은 메타데이터 사이드카를 마지막에 os.replace 한 번으로 바꿉니다. 읽는 쪽은 메타데이터가
+가리키는 파일만 열기 때문에 저장 도중에 읽거나 저장이 중간에 죽어도 항상 한 세대의 파일 묶음만 봅니다.
+
+직전 세대 파일은 이미 이전 메타데이터를 읽은 쪽을 위해 남기고, 그보다 오래된 세대와 끝나지 않은 저장의 파일은
+다음 저장 때 지웁니다. 세대 정보가 없는 예전 형식의 메타데이터는 기본 경로의 파일을 그대로 가리킵니다 (0세대).
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+Writer = Callable[[BinaryIO], None]
+
+
+def generation_path(path: Path, generation: int) -> Path:
+    """path의 generation세대 파일 경로 (0세대는 path 그대로)"""
+    if generation == 0:
+        return path
+    return path.with_name(f"{path.stem}.g{generation}{path.suffix}")
+
+
+def _generations(path: Path) -> Dict[int, Path]:
+    """디스크에 있는 path의 세대별 파일"""
+    pattern = re.compile(rf"^{re.escape(path.stem)}\.g(\d+){re.escape(path.suffix)}$")
+    found = {0: path} if path.exists() else {}
+    if path.parent.exists():
+        for candidate in path.parent.iterdir():
+            match = pattern.match(candidate.name)
+            if match:
+                found[int(match.group(1))] = candidate
+    return found
+
+
+class GenerationFiles:
+    """메타데이터 사이드카(meta_path)를 커밋 지점으로 쓰는 데이터 파일 묶음"""
+
+    def __init__(self, meta_path: Path, data_paths: List[Path]):
+        self.meta_path = meta_path
+        self.data_paths = data_paths
+
+    def read_meta(self) -> Dict[str, Any]:
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def resolve(meta: Dict[str, Any], path: Path) -> Optional[Path]:
+        """meta 세대의 path 파일 (그 세대에 쓰지 않은 파일이면 None, 예전 형식이면 path)"""
+        if "generation" not in meta:
+            return path if path.exists() else None
+        name = meta["files"].get(path.name)
+        return path.with_name(name) if name else None
+
+    def commit(self, meta: Dict[str, Any], writers: Dict[Path, Writer]):
+        """writers(기본 경로 → 파일 쓰기 함수)를 새 세대 파일로 쓰고 meta를 원자적으로 교체합니다.
+
+        writers에 없는 데이터 파일은 새 세대에 없는 것으로 기록됩니다.
+        """
+        generation = self._next_generation()
+        files = {}
+        for path, write in writers.items():
+            target = generation_path(path, generation)
+            with open(target, "wb") as f:
+                write(f)
+            files[path.name] = target.name
+        meta = {**meta, "generation": generation, "files": files}
+        tmp_meta_path = self.meta_path.with_name(self.meta_path.name + ".tmp")
+        with open(tmp_meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_meta_path, self.meta_path)
+        self._prune(generation - 1)
+
+    def _next_generation(self) -> int:
+        # 끝나지 않은 저장이 남긴 파일보다도 높은 번호를 써서 덮어쓰지 않음
+        current = 0
+        if self.meta_path.exists():
+            current = self.read_meta().get("generation", 0)
+        on_disk = [generation for path in self.data_paths for generation in _generations(path)]
+        return max([current, *on_disk]) + 1
+
+    def _prune(self, keep_from: int):
+        """keep_from세대보다 오래된 파일을 지웁니다."""
+        for path in self.data_paths:
+            for generation, candidate in _generations(path).items():
+                if generation < keep_from:
+                    candidate.unlink(missing_ok=True)
+
+    def existing(self) -> List[Path]:
+        """디스크에 있는 모든 세대의 데이터 파일과 메타데이터"""
+        paths = [candidate for path in self.data_paths for candidate in _generations(path).values()]
+        return paths + ([self.meta_path] if self.meta_path.exists() else [])
+
+    def remove(self) -> List[Path]:
+        """메타데이터를 먼저 지우고(읽는 쪽에는 바로 없는 산출물) 모든 세대의 데이터 파일을 지웁니다."""
+        removed = self.existing()
+        self.meta_path.unlink(missing_ok=True)
+        for path in removed:
+            path.unlink(missing_ok=True)
+        return removed
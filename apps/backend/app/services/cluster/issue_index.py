@@ -0,0 +1,213 @@
+"""
+기존 이슈 중심 벡터 인덱스
+
+이슈마다 소속 기사 단위벡터의 합과 기사 수를 유지합니다. 중심(합을 정규화한 벡터)과의 코사인 유사도가
+임계값 이상인 새 기사는 DBSCAN을 거치지 않고 그 이슈에 바로 배정하며, 배정할 때마다 합에 벡터를 더해
+중심을 O(d)로 갱신합니다 (전체 재계산 없음).
+
+  issue_centroids.npy        (이슈 수 × 차원) float32 벡터 합, 행 순서 = issues 순서
+  issue_centroids.meta.json  {"model", "dim", "issues": [{"issue_id", "count", "updated_at"}]}
+
+행렬은 저장할 때마다 세대 번호가 붙은 이름(issue_centroids.g3.npy)으로 쓰고 .meta.json 교체로 커밋합니다 (generation_files).
+
+오래 갱신되지 않은 이슈는 expire()로 빼서, 지난 사건이 새 기사를 계속 흡수하지 않게 합니다.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.cluster.embedding_quantization import unit_rows
+from app.services.cluster.generation_files import GenerationFiles
+from app.services.cluster.similarity_kernel import SimilarityKernel
+
+DEFAULT_INDEX_PATH = "issue_centroids.npy"
+SIDECAR_SUFFIX = ".meta.json"
+DEFAULT_ASSIGN_THRESHOLD = float(os.getenv("ISSUE_ASSIGN_THRESHOLD", "0.85"))
+DEFAULT_MAX_AGE_HOURS = float(os.getenv("ISSUE_INDEX_MAX_AGE_HOURS", "72"))
+ASSIGN_BLOCK_ROWS = 1024
+INDEX_VERSION = 1
+
+
+class IssueCentroidIndex:
+    """이슈 id → (벡터 합, 기사 수, 마지막 갱신 시각)"""
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        self.meta_path = self.path.with_name(self.path.stem + SIDECAR_SUFFIX)
+        self.generations = GenerationFiles(self.meta_path, [self.path])
+        self.model: Optional[str] = None
+        self.sums = np.zeros((0, 0), dtype=np.float32)
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+        self.issue_ids: List[str] = []
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.updated_at = np.zeros(0, dtype=np.float64)
+        self._rows: Dict[str, int] = {}
+        self.kernel = SimilarityKernel()
+
+    def __len__(self) -> int:
+        return len(self.issue_ids)
+
+    def __contains__(self, issue_id: str) -> bool:
+        return issue_id in self._rows
+
+    @property
+    def dim(self) -> int:
+        return self.sums.shape[1] if len(self) else 0
+
+    def exists(self) -> bool:
+        return self.meta_path.exists()
+
+    def load(self) -> "IssueCentroidIndex":
+        """저장된 인덱스를 읽습니다 (없으면 빈 인덱스 그대로)."""
+        if not self.exists():
+            return self
+        meta = self.generations.read_meta()
+        path = self.generations.resolve(meta, self.path)
+        if path is None:
+            raise FileNotFoundError(f"이슈 인덱스 행렬 파일이 없습니다: {self.path}")
+        sums = np.load(path)
+        if len(sums) != len(meta["issues"]):
+            raise ValueError(f"이슈 인덱스가 손상되었습니다: 행 {len(sums)}개, 메타데이터 {len(meta['issues'])}개 ({self.path})")
+        self.model = meta.get("model")
+        self._set(
+            sums.astype(np.float32, copy=False),
+            [issue["issue_id"] for issue in meta["issues"]],
+            np.array([issue["count"] for issue in meta["issues"]], dtype=np.int64),
+            np.array([issue["updated_at"] for issue in meta["issues"]], dtype=np.float64),
+        )
+        return self
+
+    def save(self):
+        """새 세대 파일에 쓴 뒤 메타데이터를 한 번에 교체합니다."""
+        meta = {
+            "version": INDEX_VERSION,
+            "model": self.model,
+            "dim": self.dim,
+            "issues": [
+                {"issue_id": issue_id, "count": int(count), "updated_at": float(updated_at)}
+                for issue_id, count, updated_at in zip(self.issue_ids, self.counts, self.updated_at)
+            ],
+        }
+        self.generations.commit(meta, {self.path: lambda f: np.save(f, np.ascontiguousarray(self.sums))})
+
+    def _set(self, sums: np.ndarray, issue_ids: List[str], counts: np.ndarray, updated_at: np.ndarray):
+        self.sums = sums
+        self.issue_ids = issue_ids
+        self.counts = counts
+        self.updated_at = updated_at
+        self.centroids = unit_rows(sums) if len(sums) else np.zeros_like(sums)
+        self._rows = {issue_id: row for row, issue_id in enumerate(issue_ids)}
+
+    def reset(self, model: Optional[str] = None):
+        """모든 이슈를 비웁니다 (임베딩 모델이 바뀌면 중심을 비교할 수 없으므로)."""
+        self.model = model
+        self._set(np.zeros((0, 0), dtype=np.float32), [], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+
+    def add_issues(self, issues: Dict[str, np.ndarray], now: Optional[float] = None):
+        """새 이슈들(이슈 id → 소속 기사 벡터)을 추가합니다. 이미 있는 이슈면 벡터를 더합니다."""
+        now = time.time() if now is None else now
+        new_ids, new_sums, new_counts = [], [], []
+        for issue_id, vectors in issues.items():
+            vectors = unit_rows(np.atleast_2d(vectors))
+            if not len(vectors):
+                continue
+            if issue_id in self._rows:
+                self._update(np.full(len(vectors), self._rows[issue_id]), vectors, now)
+                continue
+            new_ids.append(issue_id)
+            new_sums.append(vectors.sum(axis=0))
+            new_counts.append(len(vectors))
+        if not new_ids:
+            return
+        if len(self) and self.dim != len(new_sums[0]):
+            raise ValueError(f"임베딩 차원이 다릅니다: 인덱스 {self.dim}, 새 벡터 {len(new_sums[0])}")
+        sums = np.stack(new_sums).astype(np.float32)
+        self._set(
+            np.concatenate([self.sums, sums]) if len(self) else sums,
+            self.issue_ids + new_ids,
+            np.concatenate([self.counts, new_counts]),
+            np.concatenate([self.updated_at, np.full(len(new_ids), now)]),
+        )
+
+    def _update(self, rows: np.ndarray, vectors: np.ndarray, now: float):
+        """배정된 벡터를 이슈 합에 더하고 바뀐 중심만 다시 정규화합니다 (기사당 O(d))."""
+        np.add.at(self.sums, rows, vectors)
+        np.add.at(self.counts, rows, 1)
+        touched = np.unique(rows)
+        self.updated_at[touched] = now
+        self.centroids[touched] = unit_rows(self.sums[touched])
+
+    def nearest(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """행마다 (가장 가까운 이슈 행 번호, 코사인 유사도). 이슈가 없으면 (-1, -inf)."""
+        n = len(vectors)
+        if not len(self):
+            return np.full(n, -1, dtype=np.int64), np.full(n, -np.inf, dtype=np.float32)
+        distances, best = self.kernel.top_k(vectors, 1, corpus=self.centroids)
+        return best[:, 0], 1.0 - distances[:, 0]
+
+    def assign(
+        self,
+        vectors: np.ndarray,
+        article_ids: Sequence[str],
+        threshold: float = DEFAULT_ASSIGN_THRESHOLD,
+    ) -> Dict[str, Tuple[List[str], np.ndarray]]:
+        """가장 가까운 이슈 중심과의 유사도가 threshold 이상인 기사를 그 이슈에 배정합니다.
+
+        인덱스는 바꾸지 않습니다. 반환값은 이슈 id → (배정된 기사 id 목록, 그 기사들의 단위벡터)이며,
+        DB에 실제로 연결된 기사만 add_issues()로 중심에 더합니다 (연결에 실패한 기사가 중심에 남지 않도록).
+        """
+        matched: Dict[int, Tuple[List[str], List[np.ndarray]]] = {}
+        if not len(self):
+            return {}
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"임베딩 차원이 다릅니다: 인덱스 {self.dim}, 새 벡터 {vectors.shape[1]}")
+        for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+            block = unit_rows(vectors[start:start + ASSIGN_BLOCK_ROWS])
+            best, similarity = self.nearest(block)
+            accepted = np.flatnonzero(similarity >= threshold)
+            for issue_row in np.unique(best[accepted]):
+                rows = accepted[best[accepted] == issue_row]
+                ids, blocks = matched.setdefault(int(issue_row), ([], []))
+                ids.extend(article_ids[start + row] for row in rows)
+                blocks.append(block[rows])
+        return {
+            self.issue_ids[issue_row]: (ids, np.concatenate(blocks))
+            for issue_row, (ids, blocks) in matched.items()
+        }
+
+    def remove(self, issue_ids: Sequence[str]) -> int:
+        """이슈들을 인덱스에서 뺍니다. 뺀 이슈 수를 반환합니다."""
+        drop = set(issue_ids)
+        keep = np.array([issue_id not in drop for issue_id in self.issue_ids], dtype=bool)
+        removed = int(len(keep) - keep.sum())
+        if removed:
+            self._set(
+                self.sums[keep],
+                [issue_id for issue_id, kept in zip(self.issue_ids, keep) if kept],
+                self.counts[keep],
+                self.updated_at[keep],
+            )
+        return removed
+
+    def expire(self, max_age_hours: float = DEFAULT_MAX_AGE_HOURS, now: Optional[float] = None) -> int:
+        """max_age_hours 동안 기사가 배정되지 않은 이슈를 뺍니다 (0 이하면 빼지 않음)."""
+        if max_age_hours <= 0 or not len(self):
+            return 0
+        now = time.time() if now is None else now
+        stale = [
+            issue_id for issue_id, updated_at in zip(self.issue_ids, self.updated_at)
+            if now - updated_at > max_age_hours * 3600
+        ]
+        return self.remove(stale)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "issues": len(self),
+            "articles": int(self.counts.sum()),
+            "model": self.model,
+            "dim": self.dim,
+        }
@@ -0,0 +1,247 @@
+"""
+근사 최근접 이웃(IVF) 인덱스로 만드는 eps 반경 이웃 그래프
+
+sklearn DBSCAN(metric='cosine')은 브루트포스라 이웃 질의가 O(n²)입니다. IVFIndex는 단위벡터를
+구면 k-means로 √n개 정도의 리스트로 나누고, 각 점을 그 점과 중심이 가까운 n_probe개 리스트의 점들과만
+비교합니다. 계산은 리스트 단위로 뒤집어, 리스트마다 "그 리스트를 고른 점들 × 리스트의 점들" 블록의 정확한
+코사인 거리를 행렬곱으로 구합니다. 비교 횟수는 대략 n × n_probe × (n / 리스트 수)입니다.
+
+찾은 간선은 양방향으로 합치므로 (i가 j를 찾았거나 j가 i를 찾았으면 간선) 리스트 경계의 재현율이 올라갑니다.
+결과는 DBSCAN(metric='precomputed')에 바로 넣을 수 있는 희소 거리 행렬이며 대각선 0을 명시적으로 저장합니다.
+
+같은 벡터 배열로 k-distance(eps 자동 추정)와 이웃 그래프를 차례로 만들면 ivf_index()가 인덱스를 한 번만 만듭니다.
+"""
+
+import os
+import time
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+from app.services.cluster.embedding_quantization import QUANTIZED_DTYPES, unit_rows
+from app.services.cluster.similarity_kernel import SimilarityKernel, cosine_radius_graph
+
+SUPPORTED_NEIGHBOR_METHODS = ("exact", "ivf")
+DEFAULT_NEIGHBOR_METHOD = os.getenv("CLUSTER_NEIGHBORS", "exact")
+DEFAULT_N_PROBE = int(os.getenv("IVF_N_PROBE", "8"))
+KMEANS_ITERATIONS = 10
+# k-means 학습 표본 크기 = 리스트 수 × 이 값
+KMEANS_POINTS_PER_LIST = 40
+ASSIGN_BLOCK_ROWS = 8192
+# 이보다 적은 행은 브루트포스가 더 빠르므로 ivf를 요청해도 정확한 그래프를 만듦
+IVF_MIN_ROWS = 2000
+# 코사인 거리의 최댓값 (k-distance 초기값)
+MAX_COSINE_DISTANCE = 2.0
+
+
+def _as_units(vectors: np.ndarray) -> np.ndarray:
+    """float32는 그대로, float16/int8은 저장 dtype 그대로 둠 (쓰는 블록만 _block_units로 정규화)"""
+    if vectors.dtype.name in QUANTIZED_DTYPES or (vectors.dtype == np.float32 and vectors.flags.c_contiguous):
+        return vectors
+    return unit_rows(vectors)
+
+
+def _block_units(block: np.ndarray) -> np.ndarray:
+    return unit_rows(block) if block.dtype.name in QUANTIZED_DTYPES else block
+
+
+class IVFIndex:
+    """구면 k-means 역색인 (inverted file) 코사인 인덱스"""
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        n_lists: Optional[int] = None,
+        n_probe: int = DEFAULT_N_PROBE,
+        random_state: int = 0,
+    ):
+        # ivf_index()가 같은 입력인지 확인할 원래 배열
+        self.source = vectors
+        self.vectors = _as_units(vectors)
+        n = len(self.vectors)
+        self.n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+        self.n_probe = n_probe
+        self.kernel = SimilarityKernel()
+        rng = np.random.default_rng(random_state)
+
+        started = time.perf_counter()
+        self.centroids = self._train(rng)
+        self.assignment = self._assign(self.centroids)
+        order = np.argsort(self.assignment, kind="stable")
+        counts = np.bincount(self.assignment, minlength=self.n_lists)
+        self.order = order
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.build_seconds = time.perf_counter() - started
+
+    def _assign(self, centroids: np.ndarray) -> np.ndarray:
+        assignment = np.empty(len(self.vectors), dtype=np.int64)
+        for start in range(0, len(self.vectors), ASSIGN_BLOCK_ROWS):
+            block = _block_units(self.vectors[start:start + ASSIGN_BLOCK_ROWS])
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assignment
+
+    def _train(self, rng: np.random.Generator) -> np.ndarray:
+        n = len(self.vectors)
+        sample_size = min(n, self.n_lists * KMEANS_POINTS_PER_LIST)
+        sample = _block_units(self.vectors[np.sort(rng.choice(n, size=sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, size=self.n_lists, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            # 빈 리스트는 임의의 표본 점으로 다시 시작
+            sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = (sums / norms[:, None]).astype(np.float32)
+        return centroids
+
+    def members(self, list_no: int) -> np.ndarray:
+        return self.order[self.offsets[list_no]:self.offsets[list_no + 1]]
+
+    def probes(self, n_probe: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """점(rows, 기본 전체)마다 중심이 가장 가까운 n_probe개 리스트 번호 (점 수 × n_probe)"""
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        probes = np.empty((len(vectors), n_probe), dtype=np.int64)
+        for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+            similarity = _block_units(vectors[start:start + ASSIGN_BLOCK_ROWS]) @ self.centroids.T
+            if n_probe < self.n_lists:
+                top = np.argpartition(-similarity, n_probe - 1, axis=1)[:, :n_probe]
+            else:
+                top = np.broadcast_to(np.arange(self.n_lists), similarity.shape)
+            probes[start:start + len(similarity)] = top
+        return probes
+
+    def radius_graph(self, eps: float, n_probe: Optional[int] = None) -> sparse.csr_matrix:
+        """코사인 거리가 eps 이하인 (근사) 이웃 쌍의 희소 거리 행렬"""
+        n = len(self.vectors)
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+
+        # (점, 고른 리스트) 쌍을 리스트 번호로 묶어 리스트별 질의 점 목록을 만듦
+        probes = self.probes(n_probe)
+        probing_lists = probes.ravel()
+        probing_points = np.repeat(np.arange(n), n_probe)
+        by_list = np.argsort(probing_lists, kind="stable")
+        probing_points = probing_points[by_list]
+        starts = np.concatenate(([0], np.cumsum(np.bincount(probing_lists, minlength=self.n_lists))))
+
+        rows, cols, data = [], [], []
+        for list_no in range(self.n_lists):
+            candidates = self.members(list_no)
+            queries = probing_points[starts[list_no]:starts[list_no + 1]]
+            if not len(candidates) or not len(queries):
+                continue
+            # 리스트가 한쪽으로 몰려도 커널이 메모리 상한에 맞춰 (질의 × 후보) 블록을 나눔
+            graph = self.kernel.radius_graph(self.vectors[queries], eps, self.vectors[candidates]).tocoo()
+            rows.append(queries[graph.row])
+            cols.append(candidates[graph.col])
+            data.append(graph.data)
+
+        rows = np.concatenate(rows + [np.arange(n)])
+        cols = np.concatenate(cols + [np.arange(n)])
+        data = np.concatenate(data + [np.zeros(n, dtype=np.float32)])
+        # 양방향으로 합치고 중복 간선은 하나만 남김 (csr 변환 시 중복이 더해지지 않도록)
+        keys = np.concatenate([rows * n + cols, cols * n + rows])
+        values = np.concatenate([data, data])
+        keys, first = np.unique(keys, return_index=True)
+        values = values[first]
+        values[keys // n == keys % n] = 0.0
+        # 0 거리(중복 기사, 대각선)도 이웃이므로 명시적으로 저장되도록 csr를 직접 만듦
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(keys // n, minlength=n))))
+        return sparse.csr_matrix((values.astype(np.float32), keys % n, indptr), shape=(n, n))
+
+    def k_distances(self, k: int, n_probe: Optional[int] = None, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """점(rows, 기본 전체)마다 k번째로 가까운 (근사) 이웃까지의 코사인 거리. 자기 자신을 첫 이웃으로 셉니다.
+
+        radius_graph와 같이 리스트 단위로 돌며, 점마다 지금까지 찾은 가장 가까운 k개 거리를 유지합니다.
+        """
+        rows = np.arange(len(self.vectors)) if rows is None else np.asarray(rows)
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probes = self.probes(n_probe, rows)
+        probing_lists = probes.ravel()
+        # 질의 점은 rows 안의 위치로 다룸
+        probing_points = np.repeat(np.arange(len(rows)), n_probe)[np.argsort(probing_lists, kind="stable")]
+        starts = np.concatenate(([0], np.cumsum(np.bincount(probing_lists, minlength=self.n_lists))))
+
+        best = np.full((len(rows), k), MAX_COSINE_DISTANCE, dtype=np.float32)
+        for list_no in range(self.n_lists):
+            candidates = self.members(list_no)
+            queries = probing_points[starts[list_no]:starts[list_no + 1]]
+            if not len(candidates) or not len(queries):
+                continue
+            # 리스트 안에서의 k개를 구해 지금까지의 k개와 합침 (점마다 리스트를 한 번씩만 고르므로 queries는 서로 다름)
+            distances, _ = self.kernel.top_k(
+                self.vectors[rows[queries]], k, self.vectors[candidates], return_indices=False
+            )
+            merged = np.concatenate([best[queries], distances], axis=1)
+            best[queries] = np.partition(merged, k - 1, axis=1)[:, :k]
+        return best.max(axis=1)
+
+
+_last_index: Optional[IVFIndex] = None
+
+
+def ivf_index(vectors: np.ndarray, **kwargs) -> IVFIndex:
+    """IVFIndex를 만듭니다. 기본 인자로 같은 배열(같은 객체)에 다시 부르면 마지막 인덱스를 재사용합니다."""
+    global _last_index
+    if kwargs:
+        return IVFIndex(vectors, **kwargs)
+    if _last_index is None or _last_index.source is not vectors:
+        _last_index = IVFIndex(vectors)
+    return _last_index
+
+
+def exact_k_distances(vectors: np.ndarray, k: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """점(rows, 기본 전체)마다 k번째로 가까운 점까지의 정확한 코사인 거리 (자기 자신 포함, 블록 단위)"""
+    kernel = SimilarityKernel()
+    if rows is None:
+        distances, _ = kernel.top_k(vectors, k, return_indices=False)
+    else:
+        # 질의 점도 대상에 있으므로 자기 자신(거리 0)이 첫 이웃으로 들어감
+        distances, _ = kernel.top_k(vectors[np.asarray(rows)], k, corpus=vectors, return_indices=False)
+    return distances[:, -1]
+
+
+def k_distances(
+    vectors: np.ndarray,
+    k: int,
+    method: str = DEFAULT_NEIGHBOR_METHOD,
+    n_probe: Optional[int] = None,
+    rows: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """method(exact | ivf)로 점(rows, 기본 전체)마다 k번째 이웃까지의 코사인 거리를 구합니다.
+
+    DBSCAN의 min_samples처럼 자기 자신을 첫 이웃으로 세므로, k = min_samples면 핵심점이 되는 최소 eps입니다.
+    """
+    if method == "exact" or (method == "ivf" and len(vectors) < IVF_MIN_ROWS):
+        return exact_k_distances(vectors, k, rows)
+    if method == "ivf":
+        return ivf_index(vectors).k_distances(min(k, len(vectors)), n_probe, rows)
+    raise ValueError(
+        f"지원하지 않는 이웃 탐색 방식입니다: {method} (지원: {', '.join(SUPPORTED_NEIGHBOR_METHODS)})"
+    )
+
+
+def radius_neighbors_graph(vectors: np.ndarray, eps: float, method: str = DEFAULT_NEIGHBOR_METHOD, **kwargs) -> sparse.csr_matrix:
+    """method(exact | ivf)로 eps 이웃 희소 거리 행렬을 만듭니다. kwargs는 IVFIndex 인자와 n_probe입니다."""
+    n_probe = kwargs.pop("n_probe", None)
+    if method == "exact" or (method == "ivf" and len(vectors) < IVF_MIN_ROWS):
+        return cosine_radius_graph(vectors, eps)
+    if method == "ivf":
+        return ivf_index(vectors, **kwargs).radius_graph(eps, n_probe)
+    raise ValueError(
+        f"지원하지 않는 이웃 탐색 방식입니다: {method} (지원: {', '.join(SUPPORTED_NEIGHBOR_METHODS)})"
+    )
+
+
+def edge_recall(approximate: sparse.csr_matrix, exact: sparse.csr_matrix) -> float:
+    """정확한 그래프의 (대각선 제외) 간선 중 근사 그래프가 찾은 비율"""
+    exact = sparse.triu(exact, k=1, format="coo")
+    if not exact.nnz:
+        return 1.0
+    approximate = sparse.triu(approximate, k=1, format="coo")
+    n = exact.shape[0]
+    found = np.isin(exact.row.astype(np.int64) * n + exact.col, approximate.row.astype(np.int64) * n + approximate.col)
+    return float(found.mean())
@@ -0,0 +1,218 @@
+"""
+적응형 DBSCAN 파라미터 탐색 (eps 스위프 + successive halving)
+
+grid search는 (eps, min_samples) 조합마다 DBSCAN을 다시 돌리고 전체 기사로 품질 지표를 계산합니다. 여기서는
+
+1) eps 스위프: min_samples마다 최대 eps 이웃 그래프 하나로 모든 eps의 라벨을 만듭니다.
+   점 i가 핵심점이 되는 eps는 i의 min_samples번째 이웃 거리(core_eps, 자기 자신 포함)이고, 두 핵심점을 잇는 간선은
+   eps ≥ max(거리, core_eps[i], core_eps[j])부터 살아 있습니다. 간선을 이 값의 오름차순으로 한 번만 훑으며,
+   eps를 키울 때마다 새로 살아난 간선으로 기존 연결 요소를 합칩니다 (요소 단위로 축약한 그래프의 연결 요소).
+   핵심점의 클러스터와 노이즈는 DBSCAN과 같고, 경계점은 eps 안의 가장 가까운 핵심점의 클러스터에 붙습니다
+   (sklearn은 탐색 순서상 먼저 닿은 클러스터라, 두 클러스터 사이의 경계점만 다를 수 있음).
+2) successive halving: 모든 후보를 작은 표본 기사로 채점해 상위 1/factor만 남기고(잘린 점수보다 tolerance 이내로
+   뒤진 후보도 함께 남김), 표본을 factor배 늘려 다시 채점합니다. 라벨은 항상 전체 기사로 만든 것이고 표본은 채점에만
+   씁니다. 마지막 단계는 전체 기사로, 남은 후보만 실제 DBSCAN으로 다시 돌려 grid search와 같은 라벨/점수로 비교합니다
+   (동점이면 grid와 같은 조합 순서로 앞선 쪽).
+
+표본 점수는 잡음이 있어 grid search의 최적 조합이 앞 단계에서 떨어질 수 있으므로, 결과는 grid search와 같다고
+보장되지 않습니다 (그래서 CLUSTER_SEARCH 기본값은 grid). 마지막에 고른 조합의 점수는 grid와 같은 방식으로 계산한 값입니다.
+
+평가한 모든 점은 SearchPoint로 trace에 남습니다.
+"""
+
+import math
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+SUPPORTED_SEARCH_METHODS = ("adaptive", "grid")
+DEFAULT_SEARCH_METHOD = os.getenv("CLUSTER_SEARCH", "grid")
+DEFAULT_HALVING_FACTOR = int(os.getenv("CLUSTER_SEARCH_HALVING_FACTOR", "3"))
+DEFAULT_MIN_SEARCH_ROWS = int(os.getenv("CLUSTER_SEARCH_MIN_ROWS", "1000"))
+# 중간 단계에서 잘린 점수보다 이만큼 이내로 뒤진 후보도 다음 단계로 넘김 (표본 잡음으로 근소한 차이의 후보를 잃지 않도록)
+DEFAULT_SEARCH_TOLERANCE = float(os.getenv("CLUSTER_SEARCH_TOLERANCE", "0.01"))
+
+
+@dataclass
+class SearchPoint:
+    rung: int
+    # 채점에 쓴 기사 수 (마지막 단계는 전체)
+    rows: int
+    eps: float
+    min_samples: int
+    # 전체 기사 기준 클러스터/노이즈 수
+    n_clusters: int
+    n_noise: int
+    score: Optional[float]
+    # 실제 DBSCAN 라벨로 평가했는지 (아니면 eps 스위프 라벨)
+    refit: bool = False
+    kept: bool = False
+
+
+class EpsSweep:
+    """최대 eps 희소 거리 그래프 하나로 여러 (eps, min_samples)의 DBSCAN 라벨을 만듭니다.
+
+    그래프는 대칭이고 DBSCAN(metric='precomputed')과 같이 저장된 값(자기 자신 포함)만 이웃으로 셉니다.
+    """
+
+    def __init__(self, graph: sparse.spmatrix):
+        coo = sparse.coo_matrix(graph)
+        self.n = graph.shape[0]
+        # sklearn처럼 eps(파이썬 float)와 float64로 비교
+        data = coo.data.astype(np.float64)
+        # 행 → 거리 순으로 정렬 (행 번호 + [0, 0.5)로 줄인 거리를 키로 한 번에 정렬, lexsort보다 훨씬 빠름)
+        span = float(np.ptp(data)) if len(data) else 0.0
+        key = coo.row + (data - (data.min() if len(data) else 0.0)) * (0.5 / max(span, 1e-12))
+        order = np.argsort(key)
+        self.rows = coo.row[order].astype(np.int64)
+        self.cols = coo.col[order].astype(np.int64)
+        self.data = data[order]
+        self.counts = np.bincount(self.rows, minlength=self.n)
+        self.starts = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+        # 연결 요소는 대칭인 간선의 한쪽(i < j)만으로 충분
+        self.upper = np.flatnonzero(self.rows < self.cols)
+
+    def core_distances(self, min_samples: int) -> np.ndarray:
+        """점마다 핵심점이 되는 최소 eps (이웃이 min_samples개보다 적으면 inf)"""
+        core_eps = np.full(self.n, np.inf)
+        enough = self.counts >= min_samples
+        core_eps[enough] = self.data[self.starts[enough] + min_samples - 1]
+        return core_eps
+
+    def sweep(self, eps_values: Sequence[float], min_samples: int) -> Iterator[Tuple[float, np.ndarray]]:
+        """eps 오름차순으로 (eps, 라벨)을 내놓습니다. 연결 요소는 eps를 키우며 이어서 합칩니다."""
+        eps_values = sorted(eps_values)
+        if not eps_values:
+            return
+        max_eps = eps_values[-1]
+        core_eps = self.core_distances(min_samples)
+
+        # 두 핵심점을 잇는 간선이 살아나는 eps
+        rows, cols = self.rows[self.upper], self.cols[self.upper]
+        activation = np.maximum(self.data[self.upper], np.maximum(core_eps[rows], core_eps[cols]))
+        alive = activation <= max_eps
+        order = np.argsort(activation[alive], kind="stable")
+        rows, cols, activation = rows[alive][order], cols[alive][order], activation[alive][order]
+
+        # 경계점 후보: 행이 아직 핵심점이 아닐 때 이미 닿을 수 있는 핵심 이웃 (행 → 거리 순서 유지)
+        reach = np.maximum(self.data, core_eps[self.cols])
+        links = np.flatnonzero((reach <= max_eps) & (reach < core_eps[self.rows]))
+        border = (self.rows[links], self.cols[links], reach[links], core_eps[self.rows[links]])
+
+        component = np.arange(self.n)
+        merged = 0
+        for eps in eps_values:
+            stop = int(np.searchsorted(activation, eps, side="right"))
+            if stop > merged:
+                # 새 간선만 기존 요소 번호로 축약해 합침
+                new_links = sparse.coo_matrix(
+                    (np.ones(stop - merged, dtype=np.int8), (component[rows[merged:stop]], component[cols[merged:stop]])),
+                    shape=(self.n, self.n),
+                )
+                _, renumber = connected_components(new_links, directed=False)
+                component = renumber[component]
+                merged = stop
+            yield eps, self._labels(eps, core_eps <= eps, component, border)
+
+    def _labels(self, eps: float, core: np.ndarray, component: np.ndarray, border: Tuple[np.ndarray, ...]) -> np.ndarray:
+        labels = np.full(self.n, -1, dtype=np.int64)
+        labels[core] = component[core]
+        # 핵심점이 아닌 점은 eps 안의 가장 가까운 핵심점(행 안에서 거리순 첫 번째)의 클러스터로
+        rows, cols, reach, row_core_eps = border
+        usable = (reach <= eps) & (row_core_eps > eps)
+        border_rows, first = np.unique(rows[usable], return_index=True)
+        labels[border_rows] = component[cols[usable][first]]
+        clustered = labels >= 0
+        labels[clustered] = np.unique(labels[clustered], return_inverse=True)[1]
+        return labels
+
+
+def halving_schedule(n: int, n_candidates: int, factor: int, min_rows: int) -> List[int]:
+    """단계별 채점 기사 수 (마지막은 n). 표본이 min_rows보다 작아지거나 후보보다 단계가 많아지면 멈춥니다."""
+    sizes = [n]
+    while sizes[0] // factor >= min_rows and factor ** len(sizes) <= n_candidates:
+        sizes.insert(0, sizes[0] // factor)
+    return sizes
+
+
+def _count(labels: np.ndarray) -> Tuple[int, int]:
+    return int(labels.max()) + 1 if len(labels) else 0, int((labels == -1).sum())
+
+
+def adaptive_search(
+    graph: sparse.spmatrix,
+    vectors: np.ndarray,
+    eps_list: Sequence[float],
+    min_samples_list: Sequence[int],
+    score: Callable[[np.ndarray, np.ndarray], Optional[float]],
+    refit: Callable[[float, int], np.ndarray],
+    factor: int = DEFAULT_HALVING_FACTOR,
+    min_rows: int = DEFAULT_MIN_SEARCH_ROWS,
+    n_jobs: int = 1,
+    random_state: int = 0,
+    tolerance: float = DEFAULT_SEARCH_TOLERANCE,
+) -> Tuple[Optional[SearchPoint], Optional[np.ndarray], List[SearchPoint], List[int]]:
+    """eps 스위프 + successive halving으로 score가 가장 높은 (eps, min_samples)를 찾습니다.
+
+    score(벡터, 라벨)는 높을수록 좋은 점수나 None(평가 불가), refit(eps, min_samples)은 실제 DBSCAN 라벨입니다.
+    반환값은 (최고 점, 그 라벨, 평가한 모든 점, 단계별 채점 기사 수)입니다.
+    """
+    from joblib import Parallel, delayed
+
+    if factor < 2:
+        raise ValueError(f"halving factor는 2 이상이어야 합니다: {factor}")
+    n = len(vectors)
+    # grid search와 같은 조합 순서 (동점 처리용)
+    candidates = [(float(eps), int(min_samples)) for eps in eps_list for min_samples in min_samples_list]
+    sizes = halving_schedule(n, len(candidates), factor, min_rows)
+
+    swept: Dict[Tuple[float, int], np.ndarray] = {}
+    if len(sizes) > 1:
+        sweep = EpsSweep(graph)
+        for min_samples in dict.fromkeys(ms for _, ms in candidates):
+            eps_values = [eps for eps, ms in candidates if ms == min_samples]
+            for eps, labels in sweep.sweep(eps_values, min_samples):
+                swept[(eps, min_samples)] = labels.astype(np.int32)
+
+    permutation = np.random.default_rng(random_state).permutation(n)
+    trace: List[SearchPoint] = []
+    alive = candidates
+    best_point, best_labels = None, None
+    for rung, size in enumerate(sizes):
+        final = size == n
+        rows = np.sort(permutation[:size])
+
+        def evaluate(candidate):
+            eps, min_samples = candidate
+            labels = refit(eps, min_samples) if final else swept[candidate]
+            subset = labels if final else labels[rows]
+            value = score(vectors if final else vectors[rows], subset)
+            return SearchPoint(rung, size, eps, min_samples, *_count(labels), value, refit=final), labels
+
+        results = Parallel(n_jobs=n_jobs, prefer="threads")(delayed(evaluate)(candidate) for candidate in alive)
+        trace.extend(point for point, _ in results)
+        scored = [(point, labels) for point, labels in results if point.score is not None]
+        if final:
+            for point, labels in scored:
+                if best_point is None or point.score > best_point.score:
+                    best_point, best_labels = point, labels
+            if best_point is not None:
+                best_point.kept = True
+            break
+        # 점수 내림차순, 동점이면 조합 순서대로 상위 1/factor와 그 경계 점수에서 tolerance 이내인 후보만 다음 단계로
+        keep = max(1, math.ceil(len(alive) / factor))
+        ranked = sorted(scored, key=lambda item: -item[0].score)
+        if len(ranked) > keep:
+            cutoff = ranked[keep - 1][0].score - tolerance
+            ranked = ranked[:keep] + [item for item in ranked[keep:] if item[0].score >= cutoff]
+        for point, _ in ranked:
+            point.kept = True
+        survivors = {(point.eps, point.min_samples) for point, _ in ranked}
+        alive = [candidate for candidate in alive if candidate in survivors]
+        if not alive:
+            break
+    return best_point, best_labels, trace, sizes
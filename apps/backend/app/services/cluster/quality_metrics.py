@@ -0,0 +1,294 @@
+"""
+클러스터링 품질 지표
+
+모든 함수는 EmbeddingMatrix.vectors를 받습니다. float32는 행마다 L2 정규화된 벡터이고, 저장소 dtype 그대로인
+float16/int8은 쓰는 행(블록)만 float32 단위벡터로 바꿔 계산합니다. 단위벡터에서는 코사인 거리 1 - x·y의
+클러스터 평균이 1 - x·(클러스터 합)/|C|이므로, (n × n) 거리 행렬 없이 클러스터별 벡터 합만으로 정확히 계산합니다.
+
+  silhouette          정확한 코사인 실루엣. 행 청크 × 클러스터 수만큼의 메모리만 사용 (O(n·k·d))
+  silhouette-sampled  라벨별 층화 표본의 실루엣 평균과 신뢰구간 (표본 점의 실루엣은 전체 데이터 기준으로 정확히 계산)
+  intra-cosine        클러스터 안 기사 쌍의 평균 코사인 유사도 (노이즈 제외, 클러스터 크기 가중, O(n·d))
+  dbcv-lite           밀도 기반 검증(DBCV)의 근사: 클러스터 내부 MST 최대 간선(희박도)과
+                      가까운 클러스터까지의 최소 거리(분리도)를 클러스터별 표본으로 계산
+
+실루엣은 sklearn silhouette_score와 같이 노이즈(-1)도 하나의 라벨로 취급합니다.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy import sparse, stats
+from scipy.sparse.csgraph import minimum_spanning_tree
+
+from app.services.cluster.embedding_quantization import QUANTIZED_DTYPES, unit_rows
+
+QUALITY_METRICS = ("silhouette", "silhouette-sampled", "intra-cosine", "dbcv-lite")
+DEFAULT_SAMPLE_SIZE = 2000
+DEFAULT_CONFIDENCE = 0.95
+# 실루엣 청크의 (행 수 × 클러스터 수) 상한 (float32 기준 약 64MB)
+MAX_CHUNK_ELEMENTS = 16 * 1024 * 1024
+DBCV_MAX_POINTS = 64
+DBCV_CANDIDATES = 5
+# 양자화 벡터의 클러스터 합을 구할 때 한 번에 float32로 바꿀 행 수
+SUM_BLOCK_ROWS = 4096
+
+
+@dataclass
+class QualityScore:
+    metric: str
+    value: float
+    ci: Optional[Tuple[float, float]] = None
+    sample_size: Optional[int] = None
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        text = f"{self.metric} {self.value:.4f}"
+        if self.ci is not None:
+            text += f" ({DEFAULT_CONFIDENCE:.0%} CI {self.ci[0]:.4f} ~ {self.ci[1]:.4f}, 표본 {self.sample_size}개)"
+        return text
+
+
+def _label_index(labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(라벨 값, 행별 라벨 번호 0..k-1, 라벨별 크기)"""
+    unique, index, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    return unique, index.ravel(), counts
+
+
+def _units(vectors: np.ndarray, rows=slice(None)) -> np.ndarray:
+    """rows 행의 float32 단위벡터 (float32 입력은 이미 정규화되어 있으므로 그대로)"""
+    block = vectors[rows]
+    return unit_rows(block) if block.dtype.name in QUANTIZED_DTYPES else block
+
+
+def cluster_sums(vectors: np.ndarray, index: np.ndarray, k: int) -> np.ndarray:
+    """라벨 번호별 벡터 합 (k × d). 지시 희소 행렬과의 곱이라 벡터를 복사하지 않습니다.
+
+    양자화 벡터는 SUM_BLOCK_ROWS행씩 단위벡터로 바꿔 더합니다.
+    """
+    indicator = sparse.csr_matrix(
+        (np.ones(len(index), dtype=np.float32), (index, np.arange(len(index)))),
+        shape=(k, len(index)),
+    )
+    if vectors.dtype.name not in QUANTIZED_DTYPES:
+        return np.asarray(indicator @ vectors, dtype=np.float32)
+    sums = np.zeros((k, vectors.shape[1]), dtype=np.float32)
+    for start in range(0, len(vectors), SUM_BLOCK_ROWS):
+        stop = min(start + SUM_BLOCK_ROWS, len(vectors))
+        sums += np.asarray(indicator[:, start:stop] @ _units(vectors, slice(start, stop)), dtype=np.float32)
+    return sums
+
+
+def _check_labels(n: int, k: int):
+    if not 2 <= k <= n - 1:
+        raise ValueError(f"라벨 수({k})는 2 이상 {n - 1} 이하여야 실루엣을 계산할 수 있습니다.")
+
+
+def silhouette_samples_cosine(
+    vectors: np.ndarray,
+    labels: np.ndarray,
+    rows: Optional[np.ndarray] = None,
+    sums: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """rows(기본: 전체) 점들의 코사인 실루엣 값. 비교 대상은 항상 전체 데이터입니다."""
+    n = len(vectors)
+    _, index, counts = _label_index(labels)
+    k = len(counts)
+    _check_labels(n, k)
+    if sums is None:
+        sums = cluster_sums(vectors, index, k)
+    rows = np.arange(n) if rows is None else np.asarray(rows)
+
+    chunk_rows = max(1, min(4096, MAX_CHUNK_ELEMENTS // k))
+    sizes = counts.astype(np.float32)
+    out = np.empty(len(rows), dtype=np.float32)
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        points = _units(vectors, chunk)
+        own = index[chunk]
+        local = np.arange(len(chunk))
+        similarity = points @ sums.T
+        own_size = counts[own]
+        # 자기 클러스터: 자기 자신을 뺀 나머지와의 평균 거리
+        self_similarity = np.einsum("ij,ij->i", points, points)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a = 1.0 - (similarity[local, own] - self_similarity) / (own_size - 1)
+        # 다른 클러스터: 평균 거리가 가장 작은 클러스터
+        mean_distance = 1.0 - similarity / sizes
+        mean_distance[local, own] = np.inf
+        b = mean_distance.min(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            score = (b - a) / np.maximum(a, b)
+        # sklearn과 같이 크기 1인 클러스터의 점은 0
+        score[own_size == 1] = 0.0
+        out[start:start + len(chunk)] = np.nan_to_num(score)
+    return out
+
+
+def chunked_silhouette(vectors: np.ndarray, labels: np.ndarray) -> float:
+    """정확한 코사인 실루엣 평균 (메모리는 청크 크기로 제한)"""
+    return float(silhouette_samples_cosine(vectors, labels).mean())
+
+
+def sampled_silhouette(
+    vectors: np.ndarray,
+    labels: np.ndarray,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    confidence: float = DEFAULT_CONFIDENCE,
+    random_state: int = 0,
+) -> QualityScore:
+    """라벨별 층화 표본으로 실루엣 평균과 신뢰구간을 추정합니다.
+
+    라벨마다 크기에 비례해(최소 2개) 뽑고, 층별 평균/분산을 크기로 가중해 합칩니다 (유한 모집단 보정 포함).
+    """
+    n = len(vectors)
+    _, index, counts = _label_index(labels)
+    k = len(counts)
+    _check_labels(n, k)
+    rng = np.random.default_rng(random_state)
+    sums = cluster_sums(vectors, index, k)
+
+    order = np.argsort(index, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    allocation = np.minimum(counts, np.maximum(2, np.round(sample_size * counts / n).astype(int)))
+    strata = [
+        rng.choice(order[start:start + count], size=take, replace=False)
+        for start, count, take in zip(starts, counts, allocation)
+    ]
+    rows = np.concatenate(strata)
+    values = silhouette_samples_cosine(vectors, labels, rows=rows, sums=sums)
+
+    weights = counts / n
+    mean = 0.0
+    variance = 0.0
+    offset = 0
+    for weight, count, take in zip(weights, counts, allocation):
+        stratum = values[offset:offset + take].astype(np.float64)
+        offset += take
+        mean += weight * stratum.mean()
+        if take > 1 and take < count:
+            variance += weight ** 2 * stratum.var(ddof=1) / take * (1 - take / count)
+    half_width = stats.norm.ppf((1 + confidence) / 2) * np.sqrt(variance)
+    return QualityScore(
+        "silhouette-sampled", float(mean), (float(mean - half_width), float(mean + half_width)), len(rows)
+    )
+
+
+def intra_cluster_cosine(vectors: np.ndarray, labels: np.ndarray) -> float:
+    """클러스터 안 서로 다른 기사 쌍의 평균 코사인 유사도 (노이즈와 크기 1 클러스터 제외, 크기 가중)
+
+    단위벡터 합 S에 대해 쌍별 유사도 합은 (|S|² - Σ|x|²) / 2이므로 O(n·d)입니다.
+    """
+    clustered = labels != -1
+    if not clustered.any():
+        raise ValueError("클러스터에 속한 기사가 없습니다.")
+    _, index, counts = _label_index(labels[clustered])
+    points = vectors[clustered]
+    sums = cluster_sums(points, index, len(counts))
+    if points.dtype.name in QUANTIZED_DTYPES:
+        # 단위벡터의 |x|²는 1 (0벡터만 0)
+        squared = np.any(points != 0, axis=1).astype(np.float64)
+    else:
+        squared = np.einsum("ij,ij->i", points, points)
+    self_similarity = np.bincount(index, weights=squared, minlength=len(counts))
+    valid = counts > 1
+    if not valid.any():
+        raise ValueError("기사가 2개 이상인 클러스터가 없습니다.")
+    pair_mean = (np.einsum("ij,ij->i", sums, sums) - self_similarity)[valid] / (counts * (counts - 1))[valid]
+    return float(np.average(pair_mean, weights=counts[valid]))
+
+
+def dbcv_lite(
+    vectors: np.ndarray,
+    labels: np.ndarray,
+    max_points: int = DBCV_MAX_POINTS,
+    candidates: int = DBCV_CANDIDATES,
+    random_state: int = 0,
+) -> float:
+    """DBCV 근사값 (-1 ~ 1, 높을수록 좋음)
+
+    원래 DBCV의 상호 도달 거리 대신 코사인 거리를 쓰고, 클러스터마다 최대 max_points개 표본으로
+    희박도(내부 MST 최대 간선)와 분리도(중심이 가까운 candidates개 클러스터 표본까지의 최소 거리)를 잽니다.
+    노이즈는 점수 0으로 전체 평균에 들어가 노이즈가 많을수록 점수가 낮아집니다.
+    """
+    n = len(vectors)
+    clustered = np.flatnonzero(labels != -1)
+    unique, index, counts = _label_index(labels[clustered])
+    k = len(unique)
+    if k < 2:
+        raise ValueError("DBCV를 계산하려면 클러스터가 2개 이상 필요합니다.")
+    rng = np.random.default_rng(random_state)
+
+    order = clustered[np.argsort(index, kind="stable")]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    samples: Dict[int, np.ndarray] = {}
+    for c, (start, count) in enumerate(zip(starts, counts)):
+        members = order[start:start + count]
+        if count > max_points:
+            members = rng.choice(members, size=max_points, replace=False)
+        samples[c] = _units(vectors, members)
+
+    sparseness = np.zeros(k)
+    for c, points in samples.items():
+        if len(points) < 2:
+            continue
+        distances = np.maximum(1.0 - points @ points.T, 0.0)
+        np.fill_diagonal(distances, 0.0)
+        tree = minimum_spanning_tree(distances)
+        sparseness[c] = tree.data.max() if tree.nnz else 0.0
+
+    centroids = cluster_sums(vectors[clustered], index, k)
+    centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    similarity = centroids @ centroids.T
+    np.fill_diagonal(similarity, -np.inf)
+    take = min(candidates, k - 1)
+    nearest = np.argpartition(-similarity, take - 1, axis=1)[:, :take]
+
+    separation = np.empty(k)
+    for c in range(k):
+        separation[c] = min(
+            float(np.maximum(1.0 - samples[c] @ samples[other].T, 0.0).min()) for other in nearest[c]
+        )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        validity = (separation - sparseness) / np.maximum(separation, sparseness)
+    validity = np.nan_to_num(validity)
+    return float(np.sum(counts * validity) / n)
+
+
+def evaluate(
+    metric: str,
+    vectors: np.ndarray,
+    labels: np.ndarray,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+) -> QualityScore:
+    """metric(QUALITY_METRICS 중 하나)으로 점수를 계산합니다. 높을수록 좋은 클러스터링입니다."""
+    started = time.perf_counter()
+    labels = np.asarray(labels)
+    if metric == "silhouette":
+        score = QualityScore(metric, chunked_silhouette(vectors, labels))
+    elif metric == "silhouette-sampled":
+        score = sampled_silhouette(vectors, labels, sample_size)
+    elif metric == "intra-cosine":
+        score = QualityScore(metric, intra_cluster_cosine(vectors, labels))
+    elif metric == "dbcv-lite":
+        score = QualityScore(metric, dbcv_lite(vectors, labels))
+    else:
+        raise ValueError(f"지원하지 않는 품질 지표입니다: {metric} (지원: {', '.join(QUALITY_METRICS)})")
+    score.seconds = time.perf_counter() - started
+    return score
+
+
+def score_labels(
+    vectors: np.ndarray, labels: np.ndarray, metric: str, sample_size: int = DEFAULT_SAMPLE_SIZE
+) -> Optional[QualityScore]:
+    """evaluate와 같지만 클러스터가 2개 미만이거나 계산할 수 없으면 None입니다."""
+    labels = np.asarray(labels)
+    n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
+    if n_clusters < 2 or n_clusters == len(vectors):
+        return None
+    try:
+        return evaluate(metric, vectors, labels, sample_size)
+    except ValueError:
+        return None
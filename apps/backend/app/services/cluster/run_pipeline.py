@@ -3,9 +3,10 @@
 기사 클러스터링 및 이슈 생성 파이프라인
 
 1. 임베딩 벡터화 (OpenAI)
-2. DBSCAN 클러스터링
-3. 이슈 생성 및 저장
-4. 기사 issue_id 업데이트
+2. 기존 이슈 배정 (이슈 중심 벡터와 가까운 기사는 바로 연결)
+3. 남은 기사 DBSCAN 클러스터링
+4. 이슈 생성 및 저장
+5. 기사 issue_id 업데이트
 """
 
 import os
@@ -23,9 +24,12 @@ import subprocess
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
 
 from embed_articles import ArticleEmbedder
+from assign_articles import IssueAssigner
 from cluster_articles import ArticleClusterer
 from generate_issues import IssueGenerator
 from update_articles import ArticleUpdater
+from app.db.spool import SpoolReplayer, write_spool
+from app.services.cluster.embedding_store import EmbeddingStore
 
 # rich 콘솔
 console = Console()
@@ -49,11 +53,10 @@ def check_environment():
     """필요한 환경변수와 설정을 확인합니다."""
     console.print("[bold yellow]환경 설정 확인 중...[/bold yellow]")
     
-    required_env_vars = [
-        "OPENAI_API_KEY",
-        "SUPABASE_URL", 
-        "SUPABASE_ANON_KEY"
-    ]
+    required_env_vars = ["OPENAI_API_KEY"]
+    # 로컬 SQLite 백엔드(DB_BACKEND=sqlite)에서는 Supabase 설정이 필요 없음
+    if os.getenv("DB_BACKEND", "supabase").lower() == "supabase":
+        required_env_vars += ["SUPABASE_URL", "SUPABASE_ANON_KEY"]
     
     missing_vars = []
     for var in required_env_vars:
@@ -68,8 +71,15 @@ def check_environment():
     console.print("[bold green]✅ 환경 설정 확인 완료[/bold green]")
     return True
 
-def run_pipeline():
-    """전체 파이프라인을 실행합니다."""
+def scheduled_cluster_args(extra_args=None):
+    """전체 파이프라인의 클러스터링 인자: eps를 직접 주지 않았으면 k-distance 곡선에서 자동으로 고릅니다."""
+    extra_args = list(extra_args or [])
+    if not any(arg == '--eps' or arg.startswith('--eps=') or arg == '--auto-eps' for arg in extra_args):
+        extra_args.append('--auto-eps')
+    return extra_args
+
+def run_pipeline(cluster_args=None):
+    """전체 파이프라인을 실행합니다. cluster_args는 클러스터링 단계에 넘길 추가 인자입니다."""
     start_time = time.time()
     
     console.print(Panel(
@@ -83,18 +93,27 @@ def run_pipeline():
     if not check_environment():
         return False
     
+    drain_write_spool()
+    
     pipeline_steps = [
         (1, "임베딩 벡터화", run_embedding_step),
-        (2, "DBSCAN 클러스터링", run_clustering_step),
-        (3, "이슈 생성", run_issue_generation_step),
-        (4, "기사 업데이트", run_article_update_step)
+        (2, "기존 이슈 배정", run_assignment_step),
+        (3, "DBSCAN 클러스터링", run_clustering_step),
+        (4, "이슈 생성", run_issue_generation_step),
+        (5, "기사 업데이트", run_article_update_step)
     ]
     
     for step_num, title, step_func in pipeline_steps:
+        if step_func is run_clustering_step and not has_unassigned_articles():
+            console.print("[bold green]✅ 모든 기사가 기존 이슈에 배정되어 클러스터링 이후 단계를 건너뜁니다.[/bold green]")
+            break
         print_step_header(step_num, title)
         
         try:
-            success = step_func()
+            if step_func is run_clustering_step:
+                success = step_func(extra_args=scheduled_cluster_args(cluster_args))
+            else:
+                success = step_func()
             print_step_footer(step_num, success)
             
             if not success:
@@ -120,6 +139,17 @@ def run_pipeline():
     
     return True
 
+def drain_write_spool():
+    """이전 DB 장애로 스풀에 남은 쓰기를 먼저 반영합니다 (실패해도 파이프라인은 계속 진행)."""
+    if not write_spool.has_pending():
+        return
+    console.print("[bold yellow]📥 스풀에 남은 DB 쓰기를 재전송합니다...[/bold yellow]")
+    try:
+        applied = SpoolReplayer().drain()
+        console.print(f"[bold green]✅ 스풀 재전송 완료: {applied}[/bold green]")
+    except Exception as e:
+        console.print(f"[yellow]⚠️  스풀 재전송 실패 (다음 실행에서 재시도): {e}[/yellow]")
+
 def run_embedding_step():
     """1단계: 임베딩 벡터화"""
     try:
@@ -139,7 +169,7 @@ def run_embedding_step():
             embedder.run()
             
             # 결과 파일 확인
-            if os.path.exists("article_embeddings.json"):
+            if EmbeddingStore().exists():
                 progress.update(task, completed=1, total=1)
                 console.print("[bold green]✅ 임베딩 결과 파일 생성 완료[/bold green]")
                 return True
@@ -151,8 +181,23 @@ def run_embedding_step():
         console.print(f"[bold red]❌ 임베딩 단계에서 오류 발생: {e}[/bold red]")
         return False
 
+def run_assignment_step():
+    """2단계: 기존 이슈 배정"""
+    try:
+        IssueAssigner().run()
+        return True
+    except Exception as e:
+        # 배정이 실패해도 모든 기사가 저장소에 남아 있으므로 클러스터링으로 계속 진행
+        console.print(f"[yellow]⚠️  기존 이슈 배정 중 오류 발생 (모든 기사를 클러스터링합니다): {e}[/yellow]")
+        return True
+
+def has_unassigned_articles() -> bool:
+    """임베딩 저장소에 아직 이슈가 없는 기사가 남아 있는지 확인합니다."""
+    store = EmbeddingStore()
+    return store.exists() and store.load_meta()['count'] > 0
+
 def run_clustering_step(extra_args=None):
-    """2단계: DBSCAN 클러스터링 (추가 인자 지원)"""
+    """3단계: DBSCAN 클러스터링 (추가 인자 지원)"""
     try:
         # cluster_articles.py를 서브프로세스로 실행
         cmd = [sys.executable, os.path.join(os.path.dirname(__file__), 'cluster_articles.py')]
@@ -171,7 +216,7 @@ def run_clustering_step(extra_args=None):
         return False
 
 def run_issue_generation_step():
-    """3단계: 이슈 생성"""
+    """4단계: 이슈 생성"""
     try:
         generator = IssueGenerator()
         
@@ -202,7 +247,7 @@ def run_issue_generation_step():
         return False
 
 def run_article_update_step():
-    """4단계: 기사 업데이트"""
+    """5단계: 기사 업데이트"""
     try:
         updater = ArticleUpdater()
         
@@ -228,7 +273,7 @@ def run_article_update_step():
         return False
 
 def cleanup_files():
-    """임시 파일들을 정리합니다."""
+    """임시 파일들을 정리합니다 (임베딩 저장소는 증분 임베딩을 위해 남겨 둠)."""
     temp_files = [
         "article_embeddings.json",
         "cluster_results.json", 
@@ -247,8 +292,8 @@ def cleanup_files():
 
 def main():
     parser = argparse.ArgumentParser(description="기사 클러스터링 및 이슈 생성 파이프라인")
-    parser.add_argument('--step', type=str, choices=['embedding', 'clustering', 'issue', 'update'], help='실행할 파이프라인 단계')
-    # 나머지 인자는 clustering 단계에서만 사용하므로 parse_known_args로 받음
+    parser.add_argument('--step', type=str, choices=['embedding', 'assign', 'clustering', 'issue', 'update'], help='실행할 파이프라인 단계')
+    # 나머지 인자는 clustering 단계(전체 실행 포함)에서만 사용하므로 parse_known_args로 받음
     args, unknown = parser.parse_known_args()
 
     try:
@@ -256,21 +301,25 @@ def main():
             print_step_header(1, "임베딩 벡터화")
             run_embedding_step()
             print_step_footer(1, True)
+        elif args.step == 'assign':
+            print_step_header(2, "기존 이슈 배정")
+            run_assignment_step()
+            print_step_footer(2, True)
         elif args.step == 'clustering':
-            print_step_header(2, "DBSCAN 클러스터링")
+            print_step_header(3, "DBSCAN 클러스터링")
             run_clustering_step(extra_args=unknown)
-            print_step_footer(2, True)
+            print_step_footer(3, True)
         elif args.step == 'issue':
-            print_step_header(3, "이슈 생성")
+            print_step_header(4, "이슈 생성")
             run_issue_generation_step()
-            print_step_footer(3, True)
+            print_step_footer(4, True)
         elif args.step == 'update':
-            print_step_header(4, "기사 업데이트")
+            print_step_header(5, "기사 업데이트")
             run_article_update_step()
-            print_step_footer(4, True)
+            print_step_footer(5, True)
         else:
             # 전체 파이프라인 실행
-            run_pipeline()
+            run_pipeline(cluster_args=unknown)
     except KeyboardInterrupt:
         console.print(Panel(
             "[bold yellow]⚠️  사용자에 의해 파이프라인이 중단되었습니다.[/bold yellow]",
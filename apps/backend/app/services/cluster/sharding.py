@@ -0,0 +1,197 @@
+"""
+published_at 시간 창(+ 선택적으로 category)별 분할 클러스터링
+
+한 번의 DBSCAN에 모든 날짜/분야 기사를 넣으면 비용이 n²으로 늘고, 관계없는 날의 기사끼리 이웃을 다툽니다.
+분할 모드는 published_at을 window_hours 단위 창으로 나누고 양쪽으로 overlap_hours씩 겹쳐 샤드를 만든 뒤
+(category 분할을 켜면 분야마다 따로), 샤드들을 프로세스 풀에서 클러스터링하고 겹친 구간에서 합칩니다.
+
+합치는 규칙: 어떤 기사가 한 샤드에서 핵심점이면 전체 데이터에서도 핵심점입니다 (전체 이웃 ⊇ 샤드 이웃).
+그러므로 그 기사가 속한 모든 샤드의 클러스터는 단일 DBSCAN에서도 같은 클러스터이며, union-find로 합칩니다.
+경계점으로만 나타난 기사는 클러스터를 잇지 않고, 처음 나타난 (시간순) 샤드의 클러스터에 붙습니다.
+핵심점 개념이 없는 엔진(hdbscan, knn, leiden)은 클러스터에 속한 모든 기사를 핵심점으로 봅니다.
+
+단일 실행과의 차이는 이웃 사슬이 (창 + 겹침) 길이보다 길게 이어지는 클러스터와, 서로 다른 창의 핵심점
+사이에서만 성립하는 연결(겹침 구간 밖)에서만 생깁니다. 결과는 샤드 순서와 기사 행 순서만으로 정해지므로
+작업자 수와 관계없이 같습니다.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.cluster.two_tier import MixedTier
+
+DEFAULT_SHARD = os.getenv("CLUSTER_SHARD", "").lower() in ("1", "true", "yes")
+DEFAULT_BY_CATEGORY = os.getenv("CLUSTER_SHARD_BY_CATEGORY", "").lower() in ("1", "true", "yes")
+DEFAULT_WINDOW_HOURS = float(os.getenv("CLUSTER_SHARD_WINDOW_HOURS", "48"))
+DEFAULT_OVERLAP_HOURS = float(os.getenv("CLUSTER_SHARD_OVERLAP_HOURS", "12"))
+DEFAULT_WORKERS = int(os.getenv("CLUSTER_SHARD_WORKERS", str(os.cpu_count() or 1)))
+UNKNOWN_TIME = "시간 없음"
+
+# 샤드 하나를 클러스터링하는 함수: (벡터, MixedTier 또는 None) -> (라벨, 핵심점 마스크)
+ShardFit = Callable[[np.ndarray, Optional[MixedTier]], Tuple[np.ndarray, np.ndarray]]
+
+
+@dataclass
+class Shard:
+    key: str
+    rows: np.ndarray
+
+
+def parse_timestamps(values: Sequence[Optional[str]]) -> np.ndarray:
+    """ISO 8601 문자열을 UTC epoch 초로 바꿉니다 (없거나 읽을 수 없으면 nan)."""
+    seconds = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        if not value:
+            continue
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        seconds[i] = parsed.timestamp()
+    return seconds
+
+
+def make_shards(
+    published_at: Sequence[Optional[str]],
+    window_hours: float = DEFAULT_WINDOW_HOURS,
+    overlap_hours: float = DEFAULT_OVERLAP_HOURS,
+    categories: Optional[Sequence[Optional[str]]] = None,
+) -> List[Shard]:
+    """(category,) 시간 창별 샤드 목록. 창 경계는 epoch 기준으로 고정되어 실행마다 같습니다.
+
+    창 [start, start + window)의 샤드는 [start - overlap, start + window + overlap) 안의 기사를 모두 포함합니다.
+    published_at이 없는 기사는 어느 창의 기사와도 묶일 수 있으므로 같은 분야의 모든 샤드에 넣습니다
+    (분야에 시간 있는 기사가 없으면 따로 한 샤드).
+    """
+    if window_hours <= 0:
+        raise ValueError(f"시간 창은 0보다 커야 합니다: {window_hours}")
+    seconds = parse_timestamps(published_at)
+    window = window_hours * 3600
+    overlap = max(overlap_hours, 0) * 3600
+    groups = np.zeros(len(seconds), dtype=np.int64)
+    group_names = [""]
+    if categories is not None:
+        group_names, groups = np.unique(np.array([category or "" for category in categories], dtype=object), return_inverse=True)
+        groups = groups.ravel()
+
+    shards = []
+    for group, name in enumerate(group_names):
+        prefix = f"{name} / " if categories is not None else ""
+        in_group = groups == group
+        timed = in_group & ~np.isnan(seconds)
+        unknown = np.flatnonzero(in_group & np.isnan(seconds))
+        if timed.any():
+            first = int(np.floor(seconds[timed].min() / window))
+            last = int(np.floor(seconds[timed].max() / window))
+            for k in range(first, last + 1):
+                start = k * window
+                inside = timed & (seconds >= start - overlap) & (seconds < start + window + overlap)
+                rows = np.flatnonzero(inside)
+                if len(rows):
+                    label = datetime.fromtimestamp(start, tz=timezone.utc).strftime("%Y-%m-%d %H시")
+                    shards.append(Shard(f"{prefix}{label}", np.union1d(rows, unknown)))
+        elif len(unknown):
+            shards.append(Shard(f"{prefix}{UNKNOWN_TIME}", unknown))
+    return shards
+
+
+class UnionFind:
+    """작은 번호가 대표가 되는 union-find (합치는 순서와 관계없이 결과가 같음)"""
+
+    def __init__(self, n: int):
+        self.parent = np.arange(n)
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def merge_shard_labels(
+    n: int,
+    shards: Sequence[Shard],
+    results: Sequence[Tuple[np.ndarray, np.ndarray]],
+) -> np.ndarray:
+    """샤드별 (라벨, 핵심점 마스크)를 전체 행 라벨로 합칩니다 (노이즈 -1, 클러스터는 첫 기사 행 순서로 0부터)."""
+    offsets = np.cumsum([0] + [int(labels.max()) + 1 if len(labels) else 0 for labels, _ in results])
+    rows, nodes, cores = [], [], []
+    for shard, (labels, core), offset in zip(shards, results, offsets):
+        clustered = labels != -1
+        rows.append(shard.rows[clustered])
+        nodes.append(labels[clustered] + offset)
+        cores.append(core[clustered])
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    nodes = np.concatenate(nodes) if nodes else np.zeros(0, dtype=np.int64)
+    cores = np.concatenate(cores) if cores else np.zeros(0, dtype=bool)
+
+    # 행별로 묶되 샤드 순서를 유지 (안정 정렬)
+    order = np.argsort(rows, kind="stable")
+    rows, nodes, cores = rows[order], nodes[order], cores[order]
+    union_find = UnionFind(int(offsets[-1]))
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.zeros(0, dtype=np.int64)
+    ends = np.r_[starts[1:], len(rows)]
+    chosen = np.empty(len(starts), dtype=np.int64)
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        if end - start > 1 and cores[start:end].any():
+            for node in nodes[start + 1:end]:
+                union_find.union(int(nodes[start]), int(node))
+        # 핵심점으로 나온 샤드의 클러스터를 우선, 없으면 처음 나온 샤드의 클러스터
+        core_hits = np.flatnonzero(cores[start:end])
+        chosen[i] = nodes[start + core_hits[0]] if len(core_hits) else nodes[start]
+
+    labels = np.full(n, -1, dtype=np.int64)
+    if not len(starts):
+        return labels
+    roots = np.array([union_find.find(int(node)) for node in chosen])
+    # 첫 기사 행 순서로 0, 1, 2... 를 다시 매김
+    _, first, inverse = np.unique(roots, return_index=True, return_inverse=True)
+    relabel = np.empty(len(first), dtype=np.int64)
+    relabel[np.argsort(first, kind="stable")] = np.arange(len(first))
+    labels[rows[starts]] = relabel[inverse.ravel()]
+    return labels
+
+
+def cluster_sharded(
+    vectors: np.ndarray,
+    shards: Sequence[Shard],
+    fit: ShardFit,
+    min_samples: int,
+    mixed: Optional[MixedTier] = None,
+    workers: int = DEFAULT_WORKERS,
+) -> np.ndarray:
+    """샤드마다 fit을 실행하고(workers > 1이면 프로세스 풀) 결과를 merge_shard_labels로 합칩니다.
+
+    fit은 프로세스 사이에 넘길 수 있어야 하므로 모듈 최상위 함수나 ClusteringEngine.fit 같은 메서드여야 합니다.
+    """
+    # min_samples보다 작은 샤드는 모두 노이즈이므로 계산하지 않음
+    pending = [i for i, shard in enumerate(shards) if len(shard.rows) >= min_samples]
+    results = [
+        (np.full(len(shard.rows), -1, dtype=np.int64), np.zeros(len(shard.rows), dtype=bool)) for shard in shards
+    ]
+    jobs = [
+        (vectors[shards[i].rows], mixed.subset(shards[i].rows) if mixed is not None else None)
+        for i in pending
+    ]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            # map은 제출 순서대로 결과를 돌려주므로 작업자 수와 관계없이 결과가 같음
+            fitted = list(pool.map(fit, *zip(*jobs)))
+    else:
+        fitted = [fit(shard_vectors, shard_mixed) for shard_vectors, shard_mixed in jobs]
+    for i, result in zip(pending, fitted):
+        results[i] = result
+    return merge_shard_labels(len(vectors), shards, results)
@@ -0,0 +1,250 @@
+"""
+메모리 상한이 있는 블록 단위 코사인 유사도 커널
+
+(n × n) 코사인 행렬을 한 번에 만들지 않고 질의 행 블록 × 대상 열 블록(float32)씩 계산해 아래 결과만 남깁니다.
+
+  radius_graph  코사인 거리가 eps 이하인 쌍만 담은 희소 거리 행렬 (DBSCAN metric='precomputed' 입력)
+  top_k         행마다 가장 가까운 k개 (거리, 인덱스). 열 블록마다 지금까지의 k개와 합쳐 스트리밍으로 유지
+
+블록 크기는 memory_mb(동시에 계산하는 블록들의 임시 배열 합의 상한)로 정합니다. workers > 1이면 행 블록을
+스레드 풀에서 나눠 계산하고(행렬곱과 NumPy 연산은 GIL을 놓음), workers = 1이면 BLAS 자체 스레드만 씁니다.
+float16/int8 벡터는 블록마다 float32 단위벡터로 바꾸므로 전체 행렬을 float로 복사하지 않습니다.
+
+호출마다 블록 크기, 시간, 최대 메모리(블록 임시 배열 × 작업자 수 + 결과 배열, 바이트 계산)를 last_stats에 남깁니다.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.services.cluster.embedding_quantization import QUANTIZED_DTYPES, unit_rows
+
+DEFAULT_MEMORY_MB = float(os.getenv("CLUSTER_KERNEL_MEMORY_MB", "256"))
+DEFAULT_KERNEL_WORKERS = int(os.getenv("CLUSTER_KERNEL_WORKERS", "1"))
+# 블록의 (행, 열) 쌍 하나가 쓰는 임시 메모리: float32 거리 + bool 마스크
+RADIUS_BYTES_PER_PAIR = 5
+# float32 거리 + 이전 k개와 합친 float32 후보 + argpartition 결과 int64
+TOP_K_BYTES_PER_PAIR = 16
+MIN_BLOCK_ROWS = 16
+MAX_BLOCK_ROWS = 4096
+# 단위벡터로 볼 노름 오차
+UNIT_NORM_TOLERANCE = 1e-3
+
+
+@dataclass
+class KernelStats:
+    operation: str
+    rows: int
+    cols: int
+    block_rows: int
+    block_cols: int
+    blocks: int
+    workers: int
+    seconds: float
+    peak_bytes: int
+    output_bytes: int
+
+    def __str__(self) -> str:
+        return (
+            f"{self.operation} {self.rows}×{self.cols}: 블록 {self.block_rows}×{self.block_cols} {self.blocks}개, "
+            f"작업자 {self.workers}개, {self.seconds:.2f}초, 최대 메모리 {self.peak_bytes / 1024 / 1024:.1f}MB"
+        )
+
+
+class _UnitRows:
+    """행 범위를 float32 단위벡터로 꺼내는 래퍼 (양자화 벡터만 블록마다 변환)"""
+
+    def __init__(self, vectors: np.ndarray):
+        if vectors.dtype.name in QUANTIZED_DTYPES:
+            self.vectors = vectors
+            self.converted = False
+        else:
+            self.vectors = _unit_float32(vectors)
+            self.converted = True
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def block(self, start: int, stop: int) -> np.ndarray:
+        block = self.vectors[start:stop]
+        return block if self.converted else unit_rows(block)
+
+
+def _unit_float32(vectors: np.ndarray) -> np.ndarray:
+    """이미 정규화된 C-연속 float32면 그대로, 아니면 정규화한 복사본 (EmbeddingMatrix.vectors는 복사 없음)"""
+    if vectors.dtype == np.float32 and vectors.flags.c_contiguous and len(vectors):
+        norms = np.einsum("ij,ij->i", vectors, vectors)
+        if np.all(np.abs(norms - 1.0) <= UNIT_NORM_TOLERANCE):
+            return vectors
+    return unit_rows(vectors)
+
+
+def _cosine_distances(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """(len(left) × len(right)) 코사인 거리. 행렬곱 결과 배열 하나만 잡고 그 자리에서 거리로 바꿉니다."""
+    distances = left @ right.T
+    np.subtract(1.0, distances, out=distances)
+    return np.maximum(distances, 0.0, out=distances)
+
+
+def _zero_diagonal(distances: np.ndarray, row_start: int, col_start: int, value: float):
+    """자기 자신끼리(전역 행 = 전역 열)인 칸을 value로 채웁니다."""
+    rows = np.arange(distances.shape[0])
+    cols = rows + row_start - col_start
+    inside = (cols >= 0) & (cols < distances.shape[1])
+    distances[rows[inside], cols[inside]] = value
+
+
+class SimilarityKernel:
+    """블록 단위 코사인 커널. memory_mb는 동시에 계산 중인 블록 임시 배열의 상한입니다 (결과 배열 제외)."""
+
+    def __init__(self, memory_mb: float = DEFAULT_MEMORY_MB, workers: int = DEFAULT_KERNEL_WORKERS):
+        if memory_mb <= 0:
+            raise ValueError(f"메모리 상한은 0보다 커야 합니다: {memory_mb}")
+        self.memory_mb = memory_mb
+        self.workers = max(1, workers)
+        self.last_stats: Optional[KernelStats] = None
+
+    def block_shape(self, n_rows: int, n_cols: int, bytes_per_pair: int) -> Tuple[int, int]:
+        """(블록 행 수, 블록 열 수). 열이 많으면 열도 나눠 블록 하나가 상한 / 작업자 수를 넘지 않게 합니다."""
+        pairs = max(1, int(self.memory_mb * 1024 * 1024 / (bytes_per_pair * self.workers)))
+        block_rows = int(np.clip(pairs // max(n_cols, 1), MIN_BLOCK_ROWS, MAX_BLOCK_ROWS))
+        block_rows = max(1, min(block_rows, n_rows))
+        block_cols = max(1, min(n_cols, pairs // block_rows))
+        return block_rows, block_cols
+
+    def _run(self, n_rows: int, block_rows: int, work: Callable[[int], object]) -> List[object]:
+        """행 블록 시작 위치마다 work를 실행해 순서대로 돌려줍니다."""
+        starts = range(0, n_rows, block_rows)
+        if self.workers > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                return list(pool.map(work, starts))
+        return [work(start) for start in starts]
+
+    def radius_graph(
+        self,
+        queries: np.ndarray,
+        eps: float,
+        corpus: Optional[np.ndarray] = None,
+    ) -> sparse.csr_matrix:
+        """(질의 수 × 대상 수) 코사인 거리 eps 이하 쌍의 희소 거리 행렬
+
+        corpus가 없으면 queries끼리 비교하고, 대각선(자기 자신, 거리 0)을 명시적으로 저장합니다.
+        """
+        started = time.perf_counter()
+        left = _UnitRows(queries)
+        right = left if corpus is None else _UnitRows(corpus)
+        n_rows, n_cols = len(left), len(right)
+        block_rows, block_cols = self.block_shape(n_rows, n_cols, RADIUS_BYTES_PER_PAIR)
+
+        def work(row_start: int):
+            block = left.block(row_start, row_start + block_rows)
+            rows, cols, data = [], [], []
+            for col_start in range(0, n_cols, block_cols):
+                distances = _cosine_distances(block, right.block(col_start, col_start + block_cols))
+                if corpus is None:
+                    # 부동소수점 오차로 자기 자신과의 거리가 eps를 넘지 않도록 0으로 고정
+                    _zero_diagonal(distances, row_start, col_start, 0.0)
+                r, c = np.nonzero(distances <= eps)
+                rows.append(r + row_start)
+                cols.append(c + col_start)
+                data.append(distances[r, c])
+            rows, cols, data = np.concatenate(rows), np.concatenate(cols), np.concatenate(data)
+            if block_cols < n_cols:
+                # 열 블록이 여러 개면 행 순서로 다시 모음 (csr는 행별로 연속이어야 함)
+                order = np.argsort(rows, kind="stable")
+                rows, cols, data = rows[order], cols[order], data[order]
+            return rows, cols, data
+
+        pieces = self._run(n_rows, block_rows, work)
+        rows = np.concatenate([piece[0] for piece in pieces]) if pieces else np.zeros(0, dtype=np.int64)
+        cols = np.concatenate([piece[1] for piece in pieces]) if pieces else np.zeros(0, dtype=np.int64)
+        data = np.concatenate([piece[2] for piece in pieces]) if pieces else np.zeros(0, dtype=np.float32)
+        # 0 거리(중복 기사, 대각선)도 이웃이므로 명시적으로 저장되도록 csr를 직접 만듦 (행 순서로 이미 정렬됨)
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n_rows))))
+        graph = sparse.csr_matrix((data.astype(np.float32, copy=False), cols, indptr), shape=(n_rows, n_cols))
+        output_bytes = graph.data.nbytes + graph.indices.nbytes + graph.indptr.nbytes
+        self._record(
+            "radius_graph", n_rows, n_cols, block_rows, block_cols, started,
+            RADIUS_BYTES_PER_PAIR, output_bytes + rows.nbytes + cols.nbytes,
+        )
+        return graph
+
+    def top_k(
+        self,
+        queries: np.ndarray,
+        k: int,
+        corpus: Optional[np.ndarray] = None,
+        exclude_self: bool = False,
+        return_indices: bool = True,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """행마다 코사인 거리가 가장 작은 k개의 (거리, 인덱스), 거리 오름차순
+
+        corpus가 없으면 queries끼리 비교하며, exclude_self면 자기 자신을 뺍니다.
+        return_indices=False면 거리만 유지해 더 빠르고 인덱스 자리는 None입니다.
+        """
+        started = time.perf_counter()
+        left = _UnitRows(queries)
+        right = left if corpus is None else _UnitRows(corpus)
+        n_rows, n_cols = len(left), len(right)
+        k = min(k, n_cols - (exclude_self and corpus is None))
+        if k <= 0:
+            raise ValueError("비교할 대상이 없습니다.")
+        block_rows, block_cols = self.block_shape(n_rows, n_cols, TOP_K_BYTES_PER_PAIR)
+        out_distances = np.empty((n_rows, k), dtype=np.float32)
+        out_indices = np.empty((n_rows, k), dtype=np.int64) if return_indices else None
+
+        def work(row_start: int):
+            block = left.block(row_start, row_start + block_rows)
+            best = np.full((len(block), k), np.inf, dtype=np.float32)
+            best_indices = np.zeros((len(block), k), dtype=np.int64) if return_indices else None
+            for col_start in range(0, n_cols, block_cols):
+                distances = _cosine_distances(block, right.block(col_start, col_start + block_cols))
+                if corpus is None:
+                    _zero_diagonal(distances, row_start, col_start, np.inf if exclude_self else 0.0)
+                merged = np.concatenate([best, distances], axis=1)
+                if not return_indices:
+                    best = np.partition(merged, k - 1, axis=1)[:, :k]
+                    continue
+                chosen = np.argpartition(merged, k - 1, axis=1)[:, :k]
+                previous = np.take_along_axis(best_indices, np.minimum(chosen, k - 1), axis=1)
+                best_indices = np.where(chosen < k, previous, chosen - k + col_start)
+                best = np.take_along_axis(merged, chosen, axis=1)
+            order = np.argsort(best, axis=1, kind="stable")
+            out_distances[row_start:row_start + len(block)] = np.take_along_axis(best, order, axis=1)
+            if return_indices:
+                out_indices[row_start:row_start + len(block)] = np.take_along_axis(best_indices, order, axis=1)
+
+        self._run(n_rows, block_rows, work)
+        output_bytes = out_distances.nbytes + (out_indices.nbytes if return_indices else 0)
+        self._record("top_k", n_rows, n_cols, block_rows, block_cols, started, TOP_K_BYTES_PER_PAIR, output_bytes)
+        return out_distances, out_indices
+
+    def _record(
+        self, operation: str, n_rows: int, n_cols: int, block_rows: int, block_cols: int,
+        started: float, bytes_per_pair: int, output_bytes: int,
+    ):
+        row_blocks = -(-n_rows // block_rows) if n_rows else 0
+        col_blocks = -(-n_cols // block_cols) if n_cols else 0
+        workers = min(self.workers, max(row_blocks, 1))
+        self.last_stats = KernelStats(
+            operation=operation,
+            rows=n_rows,
+            cols=n_cols,
+            block_rows=block_rows,
+            block_cols=block_cols,
+            blocks=row_blocks * col_blocks,
+            workers=workers,
+            seconds=time.perf_counter() - started,
+            peak_bytes=int(workers * block_rows * block_cols * bytes_per_pair + output_bytes),
+            output_bytes=int(output_bytes),
+        )
+
+
+def cosine_radius_graph(vectors: np.ndarray, eps: float, kernel: Optional[SimilarityKernel] = None) -> sparse.csr_matrix:
+    """코사인 거리가 eps 이하인 쌍만 담은 (n × n) 희소 거리 행렬 (대각선 0을 명시적으로 저장)"""
+    return (kernel or SimilarityKernel()).radius_graph(vectors, eps)
@@ -0,0 +1,202 @@
+"""
+임베딩 입력 텍스트 준비
+
+1. 기사 본문에서 기자 바이라인, 저작권 문구, 사진 설명, 관련기사 링크 같은 상용구를 지웁니다.
+2. 모델 토크나이저(tiktoken, 없으면 보수적 추정)로 실제 토큰 수를 세어 기사당 토큰 예산 안으로 자릅니다.
+3. 긴 기사는 문장 경계에서 청크로 나누고, 청크 임베딩을 토큰 수 가중 평균(pool_chunks)해 기사 하나의 벡터로 만듭니다.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.cluster.embedding_batch import estimate_tokens
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성: 없으면 estimate_tokens로 셈
+    tiktoken = None
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("EMBEDDING_TOKEN_BUDGET", "2048"))
+DEFAULT_CHUNK_TOKENS = int(os.getenv("EMBEDDING_CHUNK_TOKENS", "1024"))
+# text-embedding-3-* 입력 하나의 최대 토큰 수
+MODEL_MAX_INPUT_TOKENS = 8191
+FALLBACK_ENCODING = "cl100k_base"
+
+# 줄 전체를 지우는 상용구
+_BOILERPLATE_LINE_PATTERNS = [
+    # 저작권/재배포 금지: 문구가 줄 앞쪽 40자 안에 있고 "~다."로 끝나지 않는 80자 이하의 꼬리말 줄만
+    # (본문 문장 속 "저작권자", "무단 전재" 등은 남김)
+    r"^(?=.{0,80}$)(?!.*다[.!?\"'”’]*$).{0,40}?(무단\s*전재|재배포\s*금지|저작권자|copyright|ⓒ|©|all rights reserved)",
+    # 기자 바이라인: "홍길동 기자", "[홍길동 기자]", "홍길동 기자 hong@example.com"
+    r"^[\[(<]?\s*[가-힣]{2,4}\s*(기자|특파원|선임기자|객원기자|논설위원|인턴기자)\s*[\])>]?\s*(\S+@\S+)?\s*$",
+    # 사진/영상 설명: "[사진=연합뉴스]", "▲ ...", "사진 제공=..."
+    r"^\s*[\[(<]?\s*(사진|영상|그래픽|자료사진|이미지)\s*(제공)?\s*[=:|/]",
+    r"^\s*[▲△▷]",
+    r"/\s*(연합뉴스|뉴시스|뉴스1)\s*$",
+    # 관련기사/구독 유도 링크
+    r"^\s*(▶|☞|■\s*관련|관련\s*기사)",
+]
+_BOILERPLATE_LINE = re.compile("|".join(f"(?:{p})" for p in _BOILERPLATE_LINE_PATTERNS), re.IGNORECASE)
+
+# 줄 안에서 지우는 상용구
+_INLINE_PATTERNS = re.compile(
+    r"|".join([
+        # 연합뉴스식 첫머리 "(서울=연합뉴스) 홍길동 기자 = "
+        r"\([^()]{1,20}=[^()]{1,20}\)\s*([가-힣]{2,4}\s*(기자|특파원)\s*=?)?",
+        # 이메일
+        r"[\w.+-]+@[\w-]+(\.[\w-]+)+",
+        # 본문 중 "[사진=...]" 캡션
+        r"[\[(<]\s*(사진|영상|그래픽)\s*[=:][^\])>]*[\])>]",
+    ])
+)
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+_SPACES = re.compile(r"[ \t 　]+")
+
+
+class TokenCounter:
+    """모델 토크나이저로 토큰을 세고 자릅니다. tiktoken이 없으면 estimate_tokens 기준으로 동작합니다."""
+
+    def __init__(self, model: Optional[str] = None):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(FALLBACK_ENCODING)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return estimate_tokens(text)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """앞에서부터 max_tokens 토큰까지만 남깁니다."""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            # 토큰 경계가 한글 음절 중간이면 깨진 문자가 생기므로 버림
+            return self.encoding.decode(tokens[:max_tokens]).rstrip("�")
+        # estimate_tokens와 같은 비용(ASCII 1/4, 그 외 1)으로 누적해 자를 위치를 찾음
+        costs = np.fromiter((0.25 if ord(ch) < 128 else 1.0 for ch in text), dtype=np.float64, count=len(text))
+        cut = int(np.searchsorted(np.cumsum(costs), max_tokens, side="right"))
+        return text[:cut]
+
+
+def strip_boilerplate(text: str) -> Tuple[str, int]:
+    """상용구를 지운 본문과 지운 줄 수를 반환합니다."""
+    kept = []
+    removed = 0
+    for line in text.splitlines():
+        line = _SPACES.sub(" ", _INLINE_PATTERNS.sub(" ", line)).strip()
+        if not line:
+            continue
+        if _BOILERPLATE_LINE.search(line):
+            removed += 1
+            continue
+        kept.append(line)
+    return "\n".join(kept), removed
+
+
+@dataclass
+class PreparedText:
+    chunks: List[str] = field(default_factory=list)
+    chunk_tokens: List[int] = field(default_factory=list)
+    truncated: bool = False
+    removed_lines: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return sum(self.chunk_tokens)
+
+    @property
+    def length(self) -> int:
+        return sum(len(chunk) for chunk in self.chunks)
+
+
+class TextPreparer:
+    """기사 제목/본문을 토큰 예산에 맞는 임베딩 입력 청크로 바꿉니다."""
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    ):
+        self.counter = counter
+        self.token_budget = token_budget
+        self.chunk_tokens = min(chunk_tokens, token_budget, MODEL_MAX_INPUT_TOKENS)
+
+    def prepare(self, title: str, content: str) -> PreparedText:
+        content, removed = strip_boilerplate(content or "")
+        text = f"{(title or '').strip()}\n\n{content}".strip()
+        prepared = PreparedText(removed_lines=removed)
+        if not text:
+            return prepared
+
+        remaining = self.token_budget
+        current: List[str] = []
+        current_tokens = 0
+
+        def flush():
+            nonlocal current, current_tokens
+            if current:
+                prepared.chunks.append(" ".join(current))
+                prepared.chunk_tokens.append(current_tokens)
+            current, current_tokens = [], 0
+
+        for sentence in _SENTENCE_BREAK.split(text):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if remaining <= 0:
+                prepared.truncated = True
+                break
+            tokens = self.counter.count(sentence)
+            if tokens > remaining:
+                # 예산의 마지막 부분은 문장 중간에서라도 채움
+                sentence = self.counter.truncate(sentence, remaining)
+                tokens = self.counter.count(sentence)
+                prepared.truncated = True
+            for piece, piece_tokens in self._split(sentence, tokens):
+                if current_tokens + piece_tokens > self.chunk_tokens:
+                    flush()
+                current.append(piece)
+                current_tokens += piece_tokens
+            remaining -= tokens
+        flush()
+        return prepared
+
+    def _split(self, sentence: str, tokens: int) -> Iterator[Tuple[str, int]]:
+        """청크 하나보다 긴 문장은 chunk_tokens 단위로 나눕니다."""
+        while tokens > self.chunk_tokens:
+            head = self.counter.truncate(sentence, self.chunk_tokens)
+            if not head:
+                return
+            yield head, self.counter.count(head)
+            sentence = sentence[len(head):].strip()
+            tokens = self.counter.count(sentence)
+        if sentence:
+            yield sentence, tokens
+
+
+def pool_chunks(vectors: Sequence[Optional[Sequence[float]]], weights: Sequence[int]) -> Optional[np.ndarray]:
+    """청크 임베딩을 토큰 수로 가중 평균하고 L2 정규화합니다. 하나라도 실패했으면 None입니다."""
+    if not vectors or any(vector is None for vector in vectors):
+        return None
+    if len(vectors) == 1:
+        return np.asarray(vectors[0], dtype=np.float32)
+    matrix = np.asarray(vectors, dtype=np.float32)
+    pooled = np.average(matrix, axis=0, weights=np.asarray(weights, dtype=np.float64)).astype(np.float32)
+    norm = np.linalg.norm(pooled)
+    return pooled / norm if norm else pooled
@@ -0,0 +1,123 @@
+"""
+2단계(제목 → 본문) 임베딩
+
+여러 언론사가 같은 사건을 다룬 기사는 제목만으로도 대부분 묶입니다. 2단계 모드에서는
+1. 모든 새 기사의 제목만 임베딩하고,
+2. 제목만으로 DBSCAN 판정이 갈리지 않는 "모호한" 기사만 본문까지 임베딩합니다.
+   eps - margin 안에 이웃이 min_samples개 이상이면 확실한 핵심점, eps + margin 안에 이웃이 없으면 확실한 노이즈로 보고,
+   그 밖의 기사(이웃이 eps 경계 근처에만 있는 기사)가 모호한 기사입니다.
+   이웃은 이번 실행의 새 제목끼리뿐 아니라 저장소에 이미 있는 기사의 제목 벡터(stored_title_vectors)에서도 셉니다.
+
+저장소에는 기사별로 tier("title" | "full")가 기록되고, 본문으로 올린 기사의 제목 벡터는 사이드카에 따로 남습니다.
+클러스터링은 두 기사 모두 본문 벡터가 있으면 본문끼리, 아니면 제목끼리의 거리를 사용합니다 (mixed_tier_graph).
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+from app.services.cluster.neighbor_index import radius_neighbors_graph
+from app.services.cluster.similarity_kernel import SimilarityKernel, cosine_radius_graph
+
+DEFAULT_TWO_TIER_EPS = float(os.getenv("EMBEDDING_TWO_TIER_EPS", "0.15"))
+DEFAULT_TWO_TIER_MARGIN = float(os.getenv("EMBEDDING_TWO_TIER_MARGIN", "0.05"))
+DEFAULT_TWO_TIER_MIN_SAMPLES = int(os.getenv("EMBEDDING_TWO_TIER_MIN_SAMPLES", "5"))
+
+
+@dataclass
+class MixedTier:
+    """본문 벡터로 올린 행 번호와 그 행들의 제목 벡터 (같은 순서)"""
+
+    full_rows: np.ndarray
+    title_vectors: np.ndarray
+
+    def full_mask(self, n: int) -> np.ndarray:
+        mask = np.zeros(n, dtype=bool)
+        mask[self.full_rows] = True
+        return mask
+
+    def subset(self, rows: np.ndarray) -> "MixedTier":
+        """정렬된 행 번호 rows만 남긴 부분 행렬 기준의 MixedTier (행 번호는 rows 안의 위치)"""
+        positions = np.searchsorted(self.full_rows, rows)
+        positions = np.minimum(positions, max(len(self.full_rows) - 1, 0))
+        is_full = (self.full_rows[positions] == rows) if len(self.full_rows) else np.zeros(len(rows), dtype=bool)
+        return MixedTier(np.flatnonzero(is_full), self.title_vectors[positions[is_full]])
+
+    def titles(self, vectors: np.ndarray) -> np.ndarray:
+        """모든 행의 제목 벡터 (본문으로 올린 행만 title_vectors로 바꾼 vectors의 사본, dtype 유지)"""
+        titles = np.array(vectors)
+        if len(self.full_rows):
+            titles[self.full_rows] = self.title_vectors
+        return titles
+
+
+def stored_title_vectors(store) -> Optional[np.ndarray]:
+    """EmbeddingStore에 있는 모든 기사의 제목 벡터 (2단계 저장소가 아니면 None)"""
+    vectors, items, meta = store.load(mmap=True)
+    if not meta.get("two_tier"):
+        return None
+    full_rows = np.flatnonzero([item.get("tier") == "full" for item in items])
+    return MixedTier(full_rows, store.load_titles(meta)).titles(vectors)
+
+
+def ambiguous_rows(
+    title_vectors: np.ndarray,
+    eps: float,
+    margin: float = DEFAULT_TWO_TIER_MARGIN,
+    min_samples: int = DEFAULT_TWO_TIER_MIN_SAMPLES,
+    stored_titles: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """제목 벡터만으로는 핵심점/노이즈 판정이 확실하지 않은 행 (bool 마스크)
+
+    이웃은 title_vectors끼리와 stored_titles(저장소 기사의 제목 벡터) 양쪽에서 셉니다.
+    DBSCAN과 같이 min_samples에는 자기 자신도 셉니다.
+    """
+    n = len(title_vectors)
+    graph = cosine_radius_graph(title_vectors, eps + margin).tocoo()
+    others = graph.row != graph.col
+    near = np.bincount(graph.row[others], minlength=n)
+    clear = np.bincount(graph.row[others & (graph.data <= eps - margin)], minlength=n)
+    if stored_titles is not None and len(stored_titles):
+        stored = SimilarityKernel().radius_graph(title_vectors, eps + margin, stored_titles).tocoo()
+        near += np.bincount(stored.row, minlength=n)
+        clear += np.bincount(stored.row[stored.data <= eps - margin], minlength=n)
+    settled = (clear + 1 >= min_samples) | (near == 0)
+    return ~settled
+
+
+def mixed_tier_graph(
+    vectors: np.ndarray,
+    mixed: MixedTier,
+    eps: float,
+    neighbors: str = "exact",
+    n_probe: Optional[int] = None,
+) -> sparse.csr_matrix:
+    """제목/본문 벡터가 섞인 저장소의 eps 이웃 희소 거리 행렬 (DBSCAN metric='precomputed' 입력용)
+
+    두 행 모두 본문 벡터가 있으면 본문끼리, 아니면 제목끼리의 코사인 거리를 씁니다.
+    제목/본문 벡터를 서로 비교하지 않으므로 두 종류의 거리 분포가 달라도 섞이지 않습니다.
+    neighbors="ivf"면 두 그래프 모두 IVF 근사 이웃 탐색으로 만듭니다.
+    """
+    n = len(vectors)
+    is_full = mixed.full_mask(n)
+
+    title_graph = radius_neighbors_graph(mixed.titles(vectors), eps, neighbors, n_probe=n_probe).tocoo()
+    keep = ~(is_full[title_graph.row] & is_full[title_graph.col])
+
+    full_graph = None
+    if len(mixed.full_rows):
+        full_graph = radius_neighbors_graph(vectors[mixed.full_rows], eps, neighbors, n_probe=n_probe).tocoo()
+    rows = [title_graph.row[keep]]
+    cols = [title_graph.col[keep]]
+    data = [title_graph.data[keep]]
+    if full_graph is not None:
+        rows.append(mixed.full_rows[full_graph.row])
+        cols.append(mixed.full_rows[full_graph.col])
+        data.append(full_graph.data)
+    return sparse.csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n, n),
+    )
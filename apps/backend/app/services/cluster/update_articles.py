@@ -9,7 +9,11 @@ from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeEl
 # 프로젝트 루트 경로 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
 
-from app.db.supabase_client import supabase_client
+from app.db.repositories import get_repositories
+from app.db.spool import OP_SET_ISSUE, is_transient_error, write_spool
+from app.services.cluster.embedding_matrix import EmbeddingMatrix
+from app.services.cluster.embedding_store import EmbeddingStore
+from app.services.cluster.issue_index import IssueCentroidIndex
 
 # .env 파일 로드
 load_dotenv()
@@ -19,7 +23,7 @@ console = Console()
 
 class ArticleUpdater:
     def __init__(self):
-        self.supabase = supabase_client.get_client()
+        self.repos = get_repositories()
     
     def load_cluster_issue_mapping(self, filename: str = "cluster_issue_mapping.json") -> Dict[int, str]:
         """클러스터 ID와 이슈 ID 매핑을 불러옵니다."""
@@ -66,28 +70,76 @@ class ArticleUpdater:
         
         try:
             # 배치 업데이트 수행
-            response = self.supabase.table("articles").update({
-                "issue_id": issue_id
-            }).in_("id", article_ids).execute()
+            self.repos.articles.set_issue_id(article_ids, issue_id)
             
             console.print(f"[bold green]✅ {len(article_ids)}개 기사 업데이트 완료[/bold green]")
             return True
             
         except Exception as e:
             console.print(f"[bold red]기사 업데이트 중 오류 발생: {e}[/bold red]")
+            if not is_transient_error(e):
+                # 다시 보내도 실패할 오류는 스풀에 넣지 않음 (뒤에 쌓인 재전송을 막지 않도록)
+                return False
+            return self.spool_issue_link(article_ids, issue_id)
+    
+    def spool_issue_link(self, article_ids: List[str], issue_id: str) -> bool:
+        """기사-이슈 연결을 스풀에 보관합니다 (SpoolReplayer가 이슈 저장 이후 순서대로 재전송)."""
+        try:
+            write_spool.append(OP_SET_ISSUE, [{"ids": article_ids, "issue_id": issue_id}])
+            console.print(f"[yellow]📥 {len(article_ids)}개 기사 연결을 스풀에 보관했습니다.[/yellow]")
+            return True
+        except Exception as e:
+            console.print(f"[bold red]기사 연결 스풀 보관 실패: {e}[/bold red]")
             return False
     
     def verify_issue_exists(self, issue_id: str) -> bool:
         """이슈가 실제로 존재하는지 확인합니다."""
         try:
-            response = self.supabase.table("issues").select("id").eq("id", issue_id).execute()
-            exists = len(response.data) > 0
+            exists = self.repos.issues.exists(issue_id)
             console.print(f"[cyan]이슈 {issue_id} 존재 확인: {exists}[/cyan]")
             return exists
         except Exception as e:
             console.print(f"[bold red]이슈 확인 중 오류 발생: {e}[/bold red]")
             return False
     
+    def prune_embedding_store(self, article_ids: List[str]):
+        """이슈가 생긴 기사를 임베딩 저장소에서 뺍니다 (다음 클러스터링에는 미배정 기사만 남도록)."""
+        if not article_ids:
+            return
+        try:
+            removed = EmbeddingStore().remove_ids(article_ids)
+            if removed:
+                console.print(f"[cyan]임베딩 저장소에서 이슈가 생긴 기사 {removed}개를 정리했습니다.[/cyan]")
+        except Exception as e:
+            console.print(f"[bold red]임베딩 저장소 정리 중 오류 발생: {e}[/bold red]")
+    
+    def index_new_issues(self, issue_articles: Dict[str, List[str]]):
+        """새로 만든 이슈의 중심 벡터를 이슈 인덱스에 추가합니다 (다음 실행부터 새 기사를 바로 배정하도록).
+
+        저장소에서 기사를 빼기 전에 호출해야 소속 기사 벡터를 읽을 수 있습니다.
+        """
+        if not issue_articles:
+            return
+        try:
+            store = EmbeddingStore()
+            if not store.exists():
+                return
+            matrix, meta = EmbeddingMatrix.from_store(store)
+            index = IssueCentroidIndex().load()
+            if index.model is not None and index.model != meta.get('model'):
+                index.reset(meta.get('model'))
+            index.model = meta.get('model')
+            known = matrix.index
+            issues = {
+                issue_id: matrix.vectors[matrix.rows(article_id for article_id in article_ids if article_id in known)]
+                for issue_id, article_ids in issue_articles.items()
+            }
+            index.add_issues(issues)
+            index.save()
+            console.print(f"[cyan]이슈 인덱스에 새 이슈 {len(issue_articles)}개의 중심 벡터를 추가했습니다 (총 {len(index)}개).[/cyan]")
+        except Exception as e:
+            console.print(f"[bold red]이슈 인덱스 갱신 중 오류 발생: {e}[/bold red]")
+    
     def run(self):
         """전체 기사 업데이트 프로세스를 실행합니다."""
         console.print("[bold green]=== 기사 issue_id 업데이트 시작 ===[/bold green]")
@@ -100,6 +152,8 @@ class ArticleUpdater:
         
         total_updated = 0
         total_articles = 0
+        assigned_ids: List[str] = []
+        issue_articles: Dict[str, List[str]] = {}
         
         with Progress(
             SpinnerColumn(),
@@ -115,10 +169,13 @@ class ArticleUpdater:
                 # 문자열을 정수로 변환
                 cluster_id = int(cluster_id_str)
                 
-                # 이슈 존재 확인
+                # 이슈 존재 확인 (스풀에 보관된 이슈면 기사 연결도 스풀로 보냄)
+                issue_spooled = False
                 if not self.verify_issue_exists(issue_id):
-                    progress.update(task, advance=1)
-                    continue
+                    issue_spooled = write_spool.has_pending_issue(issue_id)
+                    if not issue_spooled:
+                        progress.update(task, advance=1)
+                        continue
                 
                 # 클러스터에 속한 기사 ID 목록 가져오기
                 article_ids = self.get_articles_by_cluster(cluster_id)
@@ -128,12 +185,21 @@ class ArticleUpdater:
                     continue
                 
                 # 기사들의 issue_id 업데이트
-                if self.update_articles_issue_id(article_ids, issue_id):
+                if issue_spooled:
+                    linked = self.spool_issue_link(article_ids, issue_id)
+                else:
+                    linked = self.update_articles_issue_id(article_ids, issue_id)
+                if linked:
                     total_updated += len(article_ids)
+                    assigned_ids.extend(article_ids)
+                    issue_articles[issue_id] = article_ids
                 
                 total_articles += len(article_ids)
                 progress.update(task, advance=1)
         
+        self.index_new_issues(issue_articles)
+        self.prune_embedding_store(assigned_ids)
+        
         console.print(f"[bold green]=== 기사 업데이트 완료 ===[/bold green]")
         console.print(f"[cyan]총 {total_updated}/{total_articles}개 기사가 업데이트되었습니다.[/cyan]")
         
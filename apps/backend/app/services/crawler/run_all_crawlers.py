@@ -5,6 +5,7 @@ from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
+from apps.backend.app.db.spool import SpoolReplayer
 
 # 실행할 크롤러 모듈명 (파일명 기준)
 CRAWLER_MODULES = [
@@ -37,6 +38,16 @@ async def run_crawler(module_name):
 
 async def main():
     results = []
+    # DB 장애로 스풀에 쌓인 쓰기를 크롤링하는 동안 백그라운드에서 재전송
+    replayer = SpoolReplayer()
+    replayer.start_background()
+    try:
+        await run_all(results)
+    finally:
+        await asyncio.to_thread(replayer.stop)
+    print_summary(results)
+
+async def run_all(results):
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -50,6 +61,8 @@ async def main():
             progress.update(task, advance=1, description=f"({i}/{len(CRAWLER_MODULES)}) {module_name}")
             result = await run_crawler(module_name)
             results.append(result)
+
+def print_summary(results):
     # 요약 테이블 출력
     table = Table(title="크롤러 실행 결과 요약")
     table.add_column("크롤러", style="cyan")
@@ -0,0 +1,104 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..db.repositories import Repositories, get_repositories
+
+DEFAULT_STATS_TTL_SECONDS = 60.0
+
+
+class TTLCache:
+    """만료 시간이 있는 간단한 인메모리 캐시 (프로세스 단위)"""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_STATS_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._items: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        # invalidate()마다 증가. 계산 중에 무효화되면 그 결과(무효화 전 데이터일 수 있음)는 캐시하지 않음
+        self._generation = 0
+
+    def get_or_compute(self, key: Any, compute: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item and item[0] > now:
+                return item[1]
+            generation = self._generation
+        value = compute()
+        with self._lock:
+            if self._generation == generation:
+                self._items[key] = (now + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._items.clear()
+
+
+class StatsService:
+    """
+    기사 수/집계 통계 서비스
+
+    행을 내려받아 세지 않고 DB의 COUNT / GROUP BY 결과만 가져오며,
+    결과는 TTL 동안 캐시합니다. 기사 저장 시 invalidate()로 캐시를 비웁니다.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_STATS_TTL_SECONDS):
+        self.cache = TTLCache(ttl_seconds)
+        self._repos: Optional[Repositories] = None
+
+    @property
+    def repos(self) -> Repositories:
+        if self._repos is None:
+            self._repos = get_repositories()
+        return self._repos
+
+    def get_article_count(self, method: str = "exact", category: Optional[str] = None) -> int:
+        """기사 수 (method: exact | estimated)"""
+        filters = {"category": category} if category else None
+        return self.cache.get_or_compute(
+            ("count", method, category),
+            lambda: self.repos.articles.count(method=method, filters=filters),
+        )
+
+    def get_category_counts(self) -> Dict[Optional[str], int]:
+        """카테고리별 기사 수"""
+        return self.cache.get_or_compute(("group", "category"), lambda: self.repos.articles.group_counts("category"))
+
+    def get_bias_counts(self) -> Dict[Optional[str], int]:
+        """bias(left/center/right)별 기사 수"""
+        return self.cache.get_or_compute(("group", "bias"), lambda: self.repos.articles.group_counts("bias"))
+
+    def get_outlet_counts(self) -> Dict[str, int]:
+        """언론사 이름별 기사 수 (media_id가 없거나 모르는 언론사는 id 그대로 표시)
+
+        이름이 같은 언론사 행이 여러 개면(중복 생성) 기사 수를 합칩니다.
+        """
+        def compute() -> Dict[str, int]:
+            counts = self.repos.articles.group_counts("media_id")
+            names = {media["id"]: media["name"] for media in self.repos.media_outlets.list_all()}
+            by_name: Dict[str, int] = {}
+            for media_id, n in counts.items():
+                name = names.get(media_id, media_id or "unknown")
+                by_name[name] = by_name.get(name, 0) + n
+            return by_name
+
+        return self.cache.get_or_compute(("group", "outlet"), compute)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """대시보드/API용 통계 묶음"""
+        return {
+            "total_articles": self.get_article_count(),
+            "by_category": self.get_category_counts(),
+            "by_outlet": self.get_outlet_counts(),
+            "by_bias": self.get_bias_counts(),
+        }
+
+    def invalidate(self):
+        """기사 저장 등으로 통계가 바뀌었을 때 캐시를 비웁니다."""
+        self.cache.invalidate()
+
+
+# 싱글톤 인스턴스 (DB 연결은 첫 조회 시 생성)
+stats_service = StatsService()
@@ -64,4 +64,23 @@ CREATE TABLE IF NOT EXISTS bookmarks (
   issue_id UUID NOT NULL REFERENCES issues(id) ON DELETE CASCADE,
   created_at TIMESTAMP DEFAULT now(),
   PRIMARY KEY (user_id, issue_id)
-);
\ No newline at end of file
+);
+
+-- 기사 집계 함수 (StatsService에서 category / media_id / bias별 기사 수 조회에 사용)
+CREATE OR REPLACE FUNCTION article_group_counts(group_column TEXT)
+RETURNS TABLE(value TEXT, count BIGINT)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+  IF group_column NOT IN ('category', 'media_id', 'bias') THEN
+    RAISE EXCEPTION 'unsupported group column: %', group_column;
+  END IF;
+  RETURN QUERY EXECUTE format('SELECT %I::TEXT, COUNT(*) FROM articles GROUP BY 1', group_column);
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_articles_category ON articles(category);
+CREATE INDEX IF NOT EXISTS idx_articles_media_id ON articles(media_id);
+CREATE INDEX IF NOT EXISTS idx_articles_bias ON articles(bias);
+CREATE INDEX IF NOT EXISTS idx_articles_published_at_id ON articles(published_at NULLS FIRST, id);
+-- 증분 임베딩: 아직 이슈가 없는 기사를 (created_at, id) 워터마크 이후부터 조회
+CREATE INDEX IF NOT EXISTS idx_articles_unassigned_created_at_id ON articles(created_at NULLS FIRST, id) WHERE issue_id IS NULL;
\ No newline at end of file